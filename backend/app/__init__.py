@@ -1,29 +1,33 @@
 from flask import Flask
 from .config import Config
-from .extensions import db, migrate, jwt, cors, mail
-from .routes.auth import auth_bp
-from .routes.patient import patient_bp
-from .routes.doctor import doctor_bp
-from .routes.queue import queue_bp
-from .routes.appointment import appointment_bp
+from .extensions import db, migrate, jwt, cors
+from .routes import register_blueprints, LazyBlueprints
+from .cli import register_cli
+from .metrics import init_metrics
+from .query_log import init_query_log
+from .profiler import init_profiler
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
 
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     from flask_cors import CORS
     CORS(app, origins=["http://localhost:3000"], supports_credentials=True)
-    mail.init_app(app)  # Initialize Flask-Mail
+    # Flask-Mail prothom email pathanor shomoy setup hoy (extensions.LazyMail)
    
    
-   # Register blueprints for different routes
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
-    app.register_blueprint(patient_bp, url_prefix="/api/patient")
-    app.register_blueprint(doctor_bp, url_prefix="/api/doctor")
-    app.register_blueprint(queue_bp, url_prefix="/api/queue")
-    app.register_blueprint(appointment_bp, url_prefix="/api/appointment")
+   # Register blueprints for different routes (LAZY_BLUEPRINTS hole first request e)
+    if app.config.get("LAZY_BLUEPRINTS"):
+        app.wsgi_app = LazyBlueprints(app, app.wsgi_app)
+    else:
+        register_blueprints(app)
+
+    register_cli(app)
+    init_metrics(app, db)
+    init_query_log(app, db)
+    init_profiler(app)
     
     return app
\ No newline at end of file
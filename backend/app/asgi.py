@@ -0,0 +1,178 @@
+"""
+ASGI serving mode.
+
+`create_asgi_app(flask_app)` wraps the Flask app with asgiref's WsgiToAsgi,
+so every existing endpoint runs unchanged on a thread pool, and serves
+GET /api/queue/<id>/stream natively on the event loop as Server-Sent Events.
+Stream connections do not hold a thread: one poller task per process loads
+all watched queue entries with a single query every QUEUE_STREAM_INTERVAL_SECONDS
+(positions come from the in-memory index) and pushes changes to each
+connection's asyncio queue.
+
+asgiref is an optional dependency, needed only here:
+
+    pip install asgiref uvicorn
+    uvicorn asgi:app --workers 4
+"""
+import asyncio
+import json
+import re
+
+from app.extensions import db
+from app.models import Queue
+from app.routes.queue import queue_position_data
+
+STREAM_PATH = re.compile(r"^/api/queue/(\d+)/stream/?$")
+KEEPALIVE_SECONDS = 15
+# Same origins create_app allows through flask-cors
+ALLOWED_ORIGINS = {b"http://localhost:3000"}
+
+
+class QueueStreamHub:
+    """Fans out queue position snapshots to every open stream"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.subscribers = {}
+        self.last = {}
+        self._task = None
+
+    def _snapshots(self, queue_ids):
+        # Runs on a worker thread, the only place the stream touches the DB
+        with self.flask_app.app_context():
+            return {q.id: queue_position_data(q) for q in Queue.query.filter(Queue.id.in_(queue_ids))}
+
+    async def snapshot(self, queue_id):
+        return (await asyncio.to_thread(self._snapshots, [queue_id])).get(queue_id)
+
+    def subscribe(self, queue_id):
+        inbox = asyncio.Queue(maxsize=16)
+        self.subscribers.setdefault(queue_id, set()).add(inbox)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        return inbox
+
+    def unsubscribe(self, queue_id, inbox):
+        subscribers = self.subscribers.get(queue_id)
+        if subscribers is not None:
+            subscribers.discard(inbox)
+            if not subscribers:
+                del self.subscribers[queue_id]
+                self.last.pop(queue_id, None)
+
+    async def _poll(self):
+        interval = self.flask_app.config.get("QUEUE_STREAM_INTERVAL_SECONDS", 2)
+        while self.subscribers:
+            await asyncio.sleep(interval)
+            queue_ids = list(self.subscribers)
+            if not queue_ids:
+                break
+            try:
+                snapshots = await asyncio.to_thread(self._snapshots, queue_ids)
+            except Exception:
+                self.flask_app.logger.exception("Queue stream poll failed")
+                continue
+            for queue_id in queue_ids:
+                data = snapshots.get(queue_id, {"queue_id": queue_id, "status": "deleted"})
+                if data == self.last.get(queue_id):
+                    continue
+                self.last[queue_id] = data
+                for inbox in list(self.subscribers.get(queue_id, ())):
+                    if inbox.full():
+                        inbox.get_nowait()  # Slow client, keep only the newest
+                    inbox.put_nowait(data)
+
+
+def _event(data):
+    return f"event: position\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class AsgiApp:
+    def __init__(self, flask_app):
+        try:
+            from asgiref.wsgi import WsgiToAsgi
+        except ImportError as e:
+            raise RuntimeError("ASGI mode needs asgiref: pip install asgiref") from e
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.hub = QueueStreamHub(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = STREAM_PATH.match(scope["path"])
+            if match:
+                return await self.stream_queue(int(match.group(1)), scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        from app.services.appointment_sweeper import start_sweeper
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                start_sweeper(self.flask_app)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await asyncio.to_thread(self._dispose)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _dispose(self):
+        with self.flask_app.app_context():
+            db.engine.dispose()
+
+    async def stream_queue(self, queue_id, scope, receive, send):
+        headers = [(b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]
+        origin = dict(scope["headers"]).get(b"origin")
+        if origin in ALLOWED_ORIGINS:
+            headers += [(b"access-control-allow-origin", origin), (b"access-control-allow-credentials", b"true")]
+
+        data = await self.hub.snapshot(queue_id)
+        if data is None:
+            await send({"type": "http.response.start", "status": 404,
+                        "headers": headers + [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": json.dumps({"msg": "Queue entry not found"}).encode()})
+            return
+
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": headers + [(b"content-type", b"text/event-stream")]})
+        await send({"type": "http.response.body", "body": _event(data), "more_body": True})
+        if data["status"] != "waiting":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        inbox = self.hub.subscribe(queue_id)
+        disconnected = asyncio.create_task(self._wait_disconnect(receive))
+        try:
+            while True:
+                getter = asyncio.create_task(inbox.get())
+                done, _ = await asyncio.wait({getter, disconnected}, timeout=KEEPALIVE_SECONDS,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    getter.cancel()
+                    return
+                if getter not in done:
+                    getter.cancel()
+                    await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+                    continue
+                if getter.result() == data:
+                    continue  # Already sent this one on connect
+                data = getter.result()
+                await send({"type": "http.response.body", "body": _event(data), "more_body": True})
+                # Served, canceled or deleted: nothing more to wait for
+                if data.get("status") != "waiting":
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+        finally:
+            disconnected.cancel()
+            self.hub.unsubscribe(queue_id, inbox)
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+
+def create_asgi_app(flask_app):
+    return AsgiApp(flask_app)
@@ -0,0 +1,201 @@
+# Flask CLI commands (`flask queue ...`)
+from datetime import date
+
+import click
+from flask.cli import AppGroup
+
+queue_cli = AppGroup("queue", help="Queue maintenance commands")
+appointments_cli = AppGroup("appointments", help="Appointment maintenance commands")
+backfill_cli = AppGroup("backfill", help="Resumable batch data migrations")
+notifications_cli = AppGroup("notifications", help="Notification maintenance commands")
+analytics_cli = AppGroup("analytics", help="Operational reports over queue and appointment history")
+patients_cli = AppGroup("patients", help="Patient maintenance commands")
+
+
+@queue_cli.command("archive")
+@click.option("--before", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Archive service days before this date (default: today)")
+@click.option("--batch-size", default=5000, show_default=True)
+def archive_queue(before, batch_size):
+    """Move closed queue days into queue_history"""
+    from app.services.queue_archive import archive_closed_days
+
+    cutoff = before.date() if before else date.today()
+    moved = archive_closed_days(before=cutoff, batch_size=batch_size)
+    click.echo(f"Archived {moved} queue rows before {cutoff.isoformat()}")
+
+
+@appointments_cli.command("sweep")
+def sweep_appointments():
+    """Mark past-due scheduled appointments as expired"""
+    from flask import current_app
+    from app.services.appointment_sweeper import run_configured_sweep
+
+    swept = run_configured_sweep(current_app)
+    click.echo(f"Expired {swept} appointments")
+
+
+@click.command("seed")
+@click.option("--doctors", default=100, show_default=True)
+@click.option("--patients", default=10000, show_default=True)
+@click.option("--appointments", default=100000, show_default=True)
+@click.option("--queue", "queue_entries", default=5000, show_default=True)
+@click.option("--seed", default=42, show_default=True, help="Random seed, same seed gives the same data")
+@click.option("--chunk-size", default=10000, show_default=True)
+@click.option("--days", default=365, show_default=True, help="Appointment history length in days")
+@click.option("--future-days", default=30, show_default=True)
+@click.option("--queue-days", default=1, show_default=True, help="Spread queue entries over this many days")
+@click.option("--doctor-skew", default=1.0, show_default=True, help="Zipf exponent of doctor popularity, 0 = uniform")
+@click.option("--cancel-rate", default=0.1, show_default=True)
+@click.option("--no-show-rate", default=0.1, show_default=True)
+def seed_command(doctors, patients, appointments, queue_entries, seed, chunk_size, days, future_days,
+                 queue_days, doctor_skew, cancel_rate, no_show_rate):
+    """Bulk insert synthetic users, doctors, patients, appointments and queue entries"""
+    import time
+    from flask import current_app
+    from app.services.daily_stats import rebuild
+    from app.services.seed import seed_database
+
+    counts = seed_database(
+        doctors=doctors, patients=patients, appointments=appointments, queue=queue_entries, seed=seed,
+        chunk_size=chunk_size, days=days, future_days=future_days, queue_days=queue_days,
+        doctor_skew=doctor_skew, cancel_rate=cancel_rate, no_show_rate=no_show_rate,
+        working_hours=current_app.config.get("DEFAULT_WORKING_HOURS"),
+        slot_minutes=current_app.config.get("DEFAULT_SLOT_MINUTES", 30),
+        log=click.echo,
+    )
+    click.echo("Seeded " + ", ".join(f"{table}={rows}" for table, rows in counts.items()))
+    # Bulk inserts skip the signals that keep daily_stats current
+    started = time.perf_counter()
+    rows = rebuild()
+    click.echo(f"Rebuilt {rows} daily_stats rows in {time.perf_counter() - started:.2f}s")
+
+
+@backfill_cli.command("list")
+def list_backfills():
+    """Show registered backfills and their checkpoints"""
+    from app.extensions import db
+    from app.models import BackfillCheckpoint
+    from app.services.backfill import BACKFILLS
+
+    for name, backfill in BACKFILLS.items():
+        checkpoint = db.session.get(BackfillCheckpoint, name)
+        if checkpoint is None:
+            state = "never run"
+        elif checkpoint.completed_at:
+            state = f"completed {checkpoint.completed_at:%Y-%m-%d %H:%M} ({checkpoint.rows_done} rows)"
+        else:
+            state = f"stopped after id {checkpoint.last_id} ({checkpoint.rows_done} rows)"
+        click.echo(f"{name:20} {backfill.description} [{state}]")
+
+
+@backfill_cli.command("run")
+@click.argument("name")
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Compute changes without writing them")
+@click.option("--reset", is_flag=True, help="Ignore the checkpoint and start from the first row")
+def run_backfill(name, batch_size, dry_run, reset):
+    """Run a backfill, resuming from its checkpoint"""
+    from app.services.backfill import BACKFILLS
+
+    if name not in BACKFILLS:
+        raise click.BadParameter(f"Unknown backfill, choose from: {', '.join(BACKFILLS)}")
+    changed = BACKFILLS[name]().run(batch_size=batch_size, dry_run=dry_run, reset=reset, progress=click.echo)
+    click.echo(f"{name}: {changed} rows {'would change' if dry_run else 'changed'}")
+
+
+@notifications_cli.command("recount")
+def recount_notifications():
+    """Rebuild unread counters from the notification table"""
+    from app.services.notifications import rebuild_counters
+
+    users = rebuild_counters()
+    click.echo(f"Rebuilt unread counters for {users} users")
+
+
+@analytics_cli.command("report")
+@click.argument("report", type=click.Choice(["throughput", "wait-times", "no-show", "peak-hours"]))
+@click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First day (default: --days ago)")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last day, inclusive (default: today)")
+@click.option("--days", default=30, show_default=True)
+@click.option("--doctor-id", type=int, default=None)
+def analytics_report(report, start, end, days, doctor_id):
+    """Print a report as JSON"""
+    import json
+    import time
+    from datetime import timedelta
+    from app.services.analytics import REPORTS, default_range, np
+
+    first, stop = default_range(days)
+    first = start.date() if start else first
+    stop = end.date() + timedelta(days=1) if end else stop
+    started = time.perf_counter()
+    data = REPORTS[report](first, stop, doctor_id)
+    click.echo(json.dumps(data, indent=2))
+    click.echo(f"{report} {first}..{stop - timedelta(days=1)} in {time.perf_counter() - started:.2f}s "
+               f"({'numpy' if np is not None else 'pure python'})", err=True)
+
+
+@analytics_cli.command("rebuild-daily")
+@click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First day (default: all)")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last day, inclusive (default: all)")
+def rebuild_daily_stats(start, end):
+    """Recompute the daily_stats rollup from queue, queue_history and appointments"""
+    import time
+    from datetime import timedelta
+    from app.services.daily_stats import rebuild
+
+    started = time.perf_counter()
+    rows = rebuild(start.date() if start else None, end.date() + timedelta(days=1) if end else None)
+    click.echo(f"Rebuilt {rows} daily_stats rows in {time.perf_counter() - started:.2f}s")
+
+
+@click.command("export")
+@click.argument("table", type=click.Choice(["appointments", "queue", "queue_history", "patients", "doctors"]))
+@click.option("--output", "-o", default=None, help="File to write (default: <table>.<format>)")
+@click.option("--format", "fmt", type=click.Choice(["parquet", "csv"]), default=None,
+              help="Default: parquet if pyarrow is installed, else csv")
+@click.option("--columns", default=None, help="Comma separated column list (default: all)")
+@click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First day")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last day, inclusive")
+@click.option("--chunk-size", type=int, default=None, help="Rows per chunk / row group (default: EXPORT_CHUNK_SIZE)")
+def export_command(table, output, fmt, columns, start, end, chunk_size):
+    """Stream a table to Parquet or CSV in bounded memory"""
+    import time
+    from datetime import timedelta
+    from app.services.export import Export
+
+    try:
+        export = Export(
+            table, fmt, [c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            start.date() if start else None, end.date() + timedelta(days=1) if end else None, chunk_size,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    output = output or export.filename
+    started = time.perf_counter()
+    with open(output, "wb") as f:
+        for data in export:
+            f.write(data)
+    click.echo(f"Exported {export.rows} {table} rows to {output} in {time.perf_counter() - started:.2f}s")
+
+
+@patients_cli.command("dedupe")
+@click.option("--min-score", default=0.6, show_default=True, help="Keep pairs scoring at least this (0..1)")
+def dedupe_patients(min_score):
+    """Find likely duplicate patients and store them for review (replaces the previous run)"""
+    from app.services.patient_dedupe import find_duplicates
+
+    found = find_duplicates(min_score=min_score, log=click.echo)
+    click.echo(f"Stored {found} possible duplicate pairs, review them at GET /api/patient/duplicates")
+
+
+def register_cli(app):
+    app.cli.add_command(queue_cli)
+    app.cli.add_command(appointments_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(backfill_cli)
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(export_command)
+    app.cli.add_command(patients_cli)
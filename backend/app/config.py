@@ -22,8 +22,62 @@ class Config:
     MAIL_USERNAME = os.environ.get("MAIL_USERNAME")  # Your email address
     MAIL_PASSWORD = os.environ.get("MAIL_PASSWORD")  # Your email app password
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER") or os.environ.get("MAIL_USERNAME")
+    MAIL_SUPPRESS_SEND = os.environ.get("MAIL_SUPPRESS_SEND", "false").lower() in ["true", "on", "1"]
     
     # 2FA Settings
     VERIFICATION_CODE_EXPIRY_MINUTES = int(os.environ.get("VERIFICATION_CODE_EXPIRY_MINUTES", 10))
     MAX_LOGIN_ATTEMPTS = int(os.environ.get("MAX_LOGIN_ATTEMPTS", 5))
-    ACCOUNT_LOCKOUT_MINUTES = int(os.environ.get("ACCOUNT_LOCKOUT_MINUTES", 30))
\ No newline at end of file
+    ACCOUNT_LOCKOUT_MINUTES = int(os.environ.get("ACCOUNT_LOCKOUT_MINUTES", 30))
+    
+    # Queue routing
+    QUEUE_DEFAULT_SERVICE_MINUTES = int(os.environ.get("QUEUE_DEFAULT_SERVICE_MINUTES", 10))
+    QUEUE_INDEX_TTL_SECONDS = int(os.environ.get("QUEUE_INDEX_TTL_SECONDS", 60))
+    
+    # Appointment slots (working_hours na thakle ei ghonta gulo)
+    DEFAULT_WORKING_HOURS = os.environ.get("DEFAULT_WORKING_HOURS", "09:00-12:00,14:00-18:00,19:00-21:00")
+    DEFAULT_SLOT_MINUTES = int(os.environ.get("DEFAULT_SLOT_MINUTES", 30))
+    SLOT_INDEX_TTL_SECONDS = int(os.environ.get("SLOT_INDEX_TTL_SECONDS", 60))
+    
+    # Appointment expiry sweeper (interval 0 = background thread off, `flask appointments sweep` cron e chalano jay)
+    APPOINTMENT_SWEEP_INTERVAL_SECONDS = int(os.environ.get("APPOINTMENT_SWEEP_INTERVAL_SECONDS", 300))
+    APPOINTMENT_SWEEP_BATCH_SIZE = int(os.environ.get("APPOINTMENT_SWEEP_BATCH_SIZE", 1000))
+    APPOINTMENT_EXPIRY_GRACE_MINUTES = int(os.environ.get("APPOINTMENT_EXPIRY_GRACE_MINUTES", 30))
+    
+    # Metrics (/metrics Prometheus format). Gunicorn er moto multi-process e ekta shared dir dite hobe
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ["true", "on", "1"]
+    METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 1.0))
+    
+    # SQL instrumentation: slow query log, N+1 detection (DEVELOPMENT_MODE e warning, production e shudhu counter)
+    SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "true").lower() in ["true", "on", "1"]
+    SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", 200))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", 10))
+    SQL_STATS_MAX_SHAPES = int(os.environ.get("SQL_STATS_MAX_SHAPES", 500))
+    
+    # Sampling profiler (admin X-Profile: 1 header, continuous mode HZ > 0 hole). Off thakle kono hook e nai
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ["true", "on", "1"]
+    PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+    PROFILE_CONTINUOUS_HZ = float(os.environ.get("PROFILE_CONTINUOUS_HZ", 0))
+    PROFILE_MAX_STACKS = int(os.environ.get("PROFILE_MAX_STACKS", 5000))
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")
+    
+    # Route module gulo first request e import hobe, CLI/seed process e load hoy na
+    LAZY_BLUEPRINTS = os.environ.get("LAZY_BLUEPRINTS", "true").lower() in ["true", "on", "1"]
+    
+    # ASGI mode: queue SSE stream koto second por por DB check korbe; email background thread e pathano
+    QUEUE_STREAM_INTERVAL_SECONDS = float(os.environ.get("QUEUE_STREAM_INTERVAL_SECONDS", 2))
+    MAIL_SEND_ASYNC = os.environ.get("MAIL_SEND_ASYNC", "false").lower() in ["true", "on", "1"]
+    MAIL_SEND_WORKERS = int(os.environ.get("MAIL_SEND_WORKERS", 4))
+    
+    # Patient dashboard summary cache (per user, write hole invalidate hoy)
+    PATIENT_SUMMARY_TTL_SECONDS = int(os.environ.get("PATIENT_SUMMARY_TTL_SECONDS", 30))
+    
+    # Analytics report row gulo eto row er chunk e DB theke ashe (memory bounded)
+    ANALYTICS_CHUNK_SIZE = int(os.environ.get("ANALYTICS_CHUNK_SIZE", 50000))
+    
+    # Export e eto id er chunk ekbare pore lekha hoy (Parquet row group size)
+    EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 50000))
+    
+    # Bulk import: eto row ek INSERT e (savepoint e), response e max eto row error
+    IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", 2000))
+    IMPORT_MAX_ERRORS = int(os.environ.get("IMPORT_MAX_ERRORS", 1000))
\ No newline at end of file
@@ -9,6 +9,28 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+_executor = None
+
+def _send_in_background(app, msg):
+    with app.app_context():
+        try:
+            mail.send(msg)
+        except Exception as e:
+            logger.error(f"Background email to {msg.recipients} failed: {str(e)}")
+
+def deliver(msg):
+    """Send now, or hand the SMTP round trip to a background thread when
+    MAIL_SEND_ASYNC is set so the request does not wait on it"""
+    global _executor
+    app = current_app._get_current_object()
+    if not app.config.get("MAIL_SEND_ASYNC"):
+        mail.send(msg)
+        return
+    if _executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _executor = ThreadPoolExecutor(max_workers=app.config.get("MAIL_SEND_WORKERS", 4), thread_name_prefix="mail")
+    _executor.submit(_send_in_background, app, msg)
+
 def send_verification_email(user_email, verification_code, username):
     """Send verification code email to user"""
     try:
@@ -186,7 +208,7 @@ def send_verification_email(user_email, verification_code, username):
             html=html_body
         )
         
-        mail.send(msg)
+        deliver(msg)
         logger.info(f"Verification email sent successfully to {user_email}")
         return True
         
@@ -236,7 +258,7 @@ def send_account_locked_email(user_email, username, unlock_time):
             html=html_body
         )
         
-        mail.send(msg)
+        deliver(msg)
         logger.info(f"Account locked notification sent to {user_email}")
         return True
         
@@ -415,12 +437,13 @@ def send_password_reset_email(user_email, reset_code, username):
         # Create and send email
         msg = Message(
             subject="Password Reset - Hospital Queue System",
+            sender=current_app.config['MAIL_DEFAULT_SENDER'],
             recipients=[user_email],
             html=html_content,
             body=text_content
         )
         
-        mail.send(msg)
+        deliver(msg)
         logger.info(f"Password reset email sent successfully to {user_email}")
         return True, "Password reset email sent successfully"
         
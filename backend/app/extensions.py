@@ -1,12 +1,50 @@
 # Database, migrate, JWT er setup ekhane
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_mail import Mail
+
+
+class _LazyMigrateGroup(click.Group):
+    """`flask db` that sets up Flask-Migrate only when one of its commands runs"""
+
+    def __init__(self, lazy, app, db):
+        super().__init__("db", help="Perform database migrations.")
+        self.lazy, self.app, self.db = lazy, app, db
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Parse and run with the real Flask-Migrate group from here on
+        return self.lazy.load(self.app, self.db).make_context(info_name, args, parent=parent, **extra)
+
+
+class LazyMigrate:
+    # flask_migrate import korlei alembic load hoy (~100ms), server ar onno CLI command er lagena
+    def init_app(self, app, db):
+        app.cli.add_command(_LazyMigrateGroup(self, app, db))
+
+    def load(self, app, db):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_group
+        if "migrate" not in app.extensions:
+            Migrate(app, db)
+        return db_group
+
+
+class LazyMail:
+    # flask_mail import korle email/smtplib stack load hoy, shudhu prothom email pathanor shomoy dorkar
+    def load(self, app):
+        from flask_mail import Mail
+        if "mail" not in app.extensions:
+            Mail().init_app(app)
+        return app.extensions["mail"]
+
+    def send(self, message):
+        from flask import current_app
+        self.load(current_app._get_current_object()).send(message)
+
 
 db = SQLAlchemy()
-migrate = Migrate()
+migrate = LazyMigrate()
 jwt = JWTManager()
 cors = CORS(
     origins=["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"],
@@ -14,4 +52,4 @@ cors = CORS(
     allow_headers=["Content-Type", "Authorization"],
     supports_credentials=True
 )
-mail = Mail()
\ No newline at end of file
+mail = LazyMail()
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Request instrumentation and Prometheus text exposition.
+
+Every request records its latency into a per-endpoint histogram, a status
+counter, and the number and total time of the SQL statements it ran
+(timed by app.sql_timer). Values live in a per-process registry; with
+METRICS_MULTIPROC_DIR set, each process also dumps its registry to
+<dir>/<pid>.json at most every METRICS_FLUSH_SECONDS and /metrics sums the
+files of all workers, the same scheme prometheus_client uses for pre-fork
+servers. Recording is a dict update under a lock, cheap enough to leave on.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Blueprint, Response, g, has_request_context, request
+
+from app import sql_timer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint"),
+    "http_requests_total": ("counter", "Requests by endpoint and status"),
+    "db_statements_total": ("counter", "SQL statements executed by endpoint"),
+    "db_time_seconds_total": ("counter", "Time spent in SQL statements by endpoint"),
+    "db_slow_queries_total": ("counter", "Statements over SQL_SLOW_QUERY_MS by endpoint"),
+    "db_n_plus_one_total": ("counter", "Requests repeating one statement over SQL_N_PLUS_ONE_THRESHOLD times"),
+    "appointment_sweep_runs_total": ("counter", "Appointment expiry sweeps run"),
+    "appointment_sweep_rows_total": ("counter", "Appointments marked expired by the sweeper"),
+    "appointment_sweep_duration_seconds": ("histogram", "Appointment expiry sweep duration"),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            entry = self.histograms.get(key)
+            if entry is None:
+                # Bucket counts (non-cumulative), then sum, then count
+                entry = self.histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0]
+            entry[bisect_left(LATENCY_BUCKETS, value)] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, list(labels), list(entry)] for (name, labels), entry in self.histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = Registry()
+# Set by init_metrics when METRICS_MULTIPROC_DIR is configured
+_multiproc = {"dir": None, "interval": 1.0, "last": 0.0, "pending": False}
+_flush_lock = threading.Lock()
+
+
+def merge_snapshots(snapshots):
+    counters, histograms = {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap.get("counters", []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, entry in snap.get("histograms", []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], entry)]
+            else:
+                histograms[key] = list(entry)
+    return counters, histograms
+
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render(counters, histograms):
+    """Prometheus text format 0.0.4"""
+    lines = []
+    by_name = {}
+    for (name, labels), value in counters.items():
+        by_name.setdefault(name, []).append(("counter", labels, value))
+    for (name, labels), entry in histograms.items():
+        by_name.setdefault(name, []).append(("histogram", labels, entry))
+    for name in sorted(by_name):
+        kind, text = HELP.get(name, (by_name[name][0][0], name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for kind, labels, value in sorted(by_name[name], key=lambda item: item[1]):
+            if kind == "counter":
+                lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), value[:-2]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {value[-2]}")
+            lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def flush(force=False):
+    """Write this process's registry to <dir>/<pid>.json (throttled unless forced)"""
+    directory = _multiproc["dir"]
+    if not directory:
+        return
+    with _flush_lock:
+        now = time.monotonic()
+        if not force and now - _multiproc["last"] < _multiproc["interval"]:
+            # Flush the tail later too, an idle worker may not see another request
+            if not _multiproc["pending"]:
+                _multiproc["pending"] = True
+                timer = threading.Timer(_multiproc["interval"], flush, kwargs={"force": True})
+                timer.daemon = True
+                timer.start()
+            return
+        _multiproc["last"] = now
+        _multiproc["pending"] = False
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(registry.snapshot(), fh)
+        os.replace(tmp, path)
+
+
+def collect():
+    """Merged (counters, histograms) of this process, or of every worker"""
+    directory = _multiproc["dir"]
+    if not directory:
+        return merge_snapshots([registry.snapshot()])
+    flush(force=True)
+    snapshots = []
+    # Files of exited workers stay, so counters never go backwards
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path) as fh:
+                snapshots.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    return merge_snapshots(snapshots)
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(render(*collect()), mimetype="text/plain; version=0.0.4")
+
+
+def _endpoint_label():
+    return request.endpoint or "unmatched"
+
+
+def _before_request():
+    g._metrics_started = time.perf_counter()
+    g._db_statements = 0
+    g._db_time = 0.0
+
+
+def _after_request(response):
+    g._metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    started = g.pop("_metrics_started", None)
+    if started is None:
+        return
+    endpoint = _endpoint_label()
+    if endpoint == "metrics.metrics_endpoint":
+        return
+    method = request.method
+    status = g.pop("_metrics_status", 500)
+    registry.observe("http_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint, method=method)
+    registry.inc("http_requests_total", endpoint=endpoint, method=method, status=status)
+    registry.inc("db_statements_total", g.pop("_db_statements", 0), endpoint=endpoint)
+    registry.inc("db_time_seconds_total", g.pop("_db_time", 0.0), endpoint=endpoint)
+    flush()
+
+
+def _observe_statement(statement, parameters, seconds):
+    if has_request_context() and "_db_statements" in g:
+        g._db_statements += 1
+        g._db_time += seconds
+
+
+def init_metrics(app, db):
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    directory = app.config.get("METRICS_MULTIPROC_DIR")
+    if directory and _multiproc["dir"] is None:
+        os.makedirs(directory, exist_ok=True)
+        _multiproc["dir"] = directory
+        _multiproc["interval"] = app.config.get("METRICS_FLUSH_SECONDS", 1.0)
+        atexit.register(flush, force=True)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.register_blueprint(metrics_bp)
+    sql_timer.add_observer(_observe_statement)
+    with app.app_context():
+        sql_timer.instrument_engine(db.engine)
@@ -1,6 +1,9 @@
 from .extensions import db
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+import re
 import secrets
 import random
 
@@ -103,9 +106,48 @@ class Patient(db.Model):
     age = db.Column(db.Integer, nullable=False)
     gender = db.Column(db.String(10), nullable=False)
     phone = db.Column(db.String(20), nullable=True)
+    phone_normalized = db.Column(db.String(20), nullable=True, index=True)  # normalize_phone(phone), for search
     address = db.Column(db.String(200), nullable=True)
     user = db.relationship('User', backref='patient_profile', uselist=False)
 
+    @validates('phone')
+    def _set_phone_normalized(self, key, value):
+        self.phone_normalized = normalize_phone(value)
+        return value
+
+
+def normalize_phone(phone):
+    """Digits only, without +880 / 0 prefix: '+880 1712-345678' and '01712345678' -> '1712345678'"""
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("880"):
+        digits = digits[3:]
+    return digits.lstrip("0") or None
+
+
+# Patient name search index: FTS5 trigram table synced by triggers (SQLite), trigram GIN index (Postgres).
+# Same statements as migration 0a7c3e5b9d21, here for databases made with create_all.
+PATIENT_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS patient_fts USING fts5("
+        "name, content='patient', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS patient_fts_insert AFTER INSERT ON patient BEGIN "
+        "INSERT INTO patient_fts(rowid, name) VALUES (new.id, new.name); END",
+        "CREATE TRIGGER IF NOT EXISTS patient_fts_delete AFTER DELETE ON patient BEGIN "
+        "INSERT INTO patient_fts(patient_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+        "CREATE TRIGGER IF NOT EXISTS patient_fts_update AFTER UPDATE OF name ON patient BEGIN "
+        "INSERT INTO patient_fts(patient_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO patient_fts(rowid, name) VALUES (new.id, new.name); END",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_patient_name_trgm ON patient USING gin (name gin_trgm_ops)",
+    ],
+}
+for _dialect, _statements in PATIENT_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Patient.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Patient.__table__, "after_drop", DDL("DROP TABLE IF EXISTS patient_fts").execute_if(dialect="sqlite"))
+
 # Doctor profile (linked with User)
 class Doctor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -115,25 +157,139 @@ class Doctor(db.Model):
     phone = db.Column(db.String(20), nullable=True)
     chamber = db.Column(db.String(200), nullable=True)
     available_days = db.Column(db.String(100), nullable=True)
+    working_hours = db.Column(db.Text, nullable=True)  # JSON: {"mon": ["09:00-12:00", "14:00-18:00"], ...}
+    slot_minutes = db.Column(db.Integer, nullable=True)  # None = DEFAULT_SLOT_MINUTES
     user = db.relationship('User', backref='doctor_profile', uselist=False)
 
+# Live queue: only the current service days stay here, serials restart every day
 class Queue(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('doctor_id', 'service_date', 'serial', name='uq_queue_doctor_date_serial'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
+    service_date = db.Column(db.Date, nullable=False, default=date.today, index=True)
     serial = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(20), default="waiting")  # waiting/served/canceled
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    served_at = db.Column(db.DateTime, nullable=True)  # UTC like created_at, wait = served_at - created_at
 
     patient = db.relationship('Patient', backref='queues')
     doctor = db.relationship('Doctor', backref='queues')
 
+# Closed service days are moved here in bulk by `flask queue archive`
+class QueueHistory(db.Model):
+    __tablename__ = 'queue_history'
+    __table_args__ = (
+        db.Index('ix_queue_history_doctor_date', 'doctor_id', 'service_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id as the live row
+    patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
+    service_date = db.Column(db.Date, nullable=False)
+    serial = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    served_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, server_default=db.func.now())
+
 class Appointment(db.Model):
+    __table_args__ = (
+        # One scheduled booking per doctor slot, enforced by the database across workers
+        db.Index(
+            'uq_appointment_doctor_time_scheduled', 'doctor_id', 'appointment_time', unique=True,
+            sqlite_where=db.text("status = 'scheduled'"),
+            postgresql_where=db.text("status = 'scheduled'"),
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
-    appointment_time = db.Column(db.DateTime, nullable=False)
-    status = db.Column(db.String(20), default="scheduled")  # scheduled/completed/canceled
+    appointment_time = db.Column(db.DateTime, nullable=False, index=True)
+    duration_minutes = db.Column(db.Integer, nullable=False, default=30)
+    status = db.Column(db.String(20), default="scheduled")  # scheduled/completed/canceled/expired
 
     patient = db.relationship('Patient', backref='appointments')
-    doctor = db.relationship('Doctor', backref='appointments')
\ No newline at end of file
+    doctor = db.relationship('Doctor', backref='appointments')
+
+# Progress of `flask backfill run <name>`, saved with every batch so runs can resume
+class BackfillCheckpoint(db.Model):
+    __tablename__ = 'backfill_checkpoint'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+# Per-user inbox. Fan-out writes one row per recipient in a single bulk insert
+class Notification(db.Model):
+    __table_args__ = (
+        # Inbox page: newest first for one user
+        db.Index('ix_notification_user_id_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)  # doctor_delayed/queue_advanced/...
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=True)
+    data = db.Column(db.Text, nullable=True)  # JSON payload (doctor_id, queue_id, ...)
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# Unread count per user, kept in step with the inbox instead of COUNT(*) per request
+class NotificationCounter(db.Model):
+    __tablename__ = 'notification_counter'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+
+# Prescription metadata is indexed; the notes/medication list is zlib-compressed
+# JSON in `body`, deferred so list queries never load it
+class Prescription(db.Model):
+    __table_args__ = (
+        db.Index('ix_prescription_patient_issued', 'patient_id', 'issued_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False, index=True)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'), nullable=True, index=True)
+    issued_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    diagnosis = db.Column(db.String(200), nullable=True)
+    medication_count = db.Column(db.Integer, nullable=False, default=0)
+    body_size = db.Column(db.Integer, nullable=False, default=0)  # Uncompressed bytes
+    body = db.deferred(db.Column(db.LargeBinary, nullable=False))
+
+    patient = db.relationship('Patient', backref='prescriptions')
+    doctor = db.relationship('Doctor', backref='prescriptions')
+
+# Per doctor per day totals, kept current from queue/appointment writes (see services/daily_stats.py)
+class DailyStats(db.Model):
+    __tablename__ = 'daily_stats'
+
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    enqueued = db.Column(db.Integer, nullable=False, default=0)
+    served = db.Column(db.Integer, nullable=False, default=0)
+    canceled = db.Column(db.Integer, nullable=False, default=0)
+    appointments_booked = db.Column(db.Integer, nullable=False, default=0)
+    appointments_completed = db.Column(db.Integer, nullable=False, default=0)
+    appointments_canceled = db.Column(db.Integer, nullable=False, default=0)
+    wait_seconds = db.Column(db.BigInteger, nullable=False, default=0)  # Sum over served entries with served_at
+    served_with_wait = db.Column(db.Integer, nullable=False, default=0)
+
+# Possible duplicate patients found by the dedupe job (patient_id < duplicate_id), reviewed before a merge
+class PatientDuplicate(db.Model):
+    __tablename__ = 'patient_duplicate'
+
+    patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), primary_key=True, autoincrement=False)
+    duplicate_id = db.Column(db.Integer, db.ForeignKey('patient.id'), primary_key=True, autoincrement=False)
+    score = db.Column(db.Float, nullable=False, index=True)
+    reason = db.Column(db.String(20), nullable=False)  # Blocking key that paired them: phone/name
+    found_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,189 @@
+"""
+Sampling profiler for live requests.
+
+On demand: an admin sends `X-Profile: 1` (or `?__profile=1`) and the request
+thread's stack is sampled every PROFILE_INTERVAL_MS while it runs. The samples
+are written in collapsed-stack format (one "frame;frame;leaf count" line per
+distinct stack, what flamegraph.pl and speedscope read) to PROFILE_DIR, and
+the file name comes back in the X-Profile-File header.
+
+Continuous: with PROFILE_CONTINUOUS_HZ > 0 one background thread per process
+samples every thread that is handling a request at that rate and aggregates
+the stacks per endpoint; GET /api/admin/profiles/continuous returns them.
+
+Nothing is registered unless PROFILING_ENABLED is set, so a disabled
+profiler adds no per-request work.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app, g, request
+
+from app.utils import role_required
+
+MAX_DEPTH = 128
+
+
+def collapse(frame):
+    """Stack of a frame as 'module:function;...' from the root down"""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def render_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class RequestSampler(threading.Thread):
+    """Samples one thread until stopped"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.stacks
+
+
+class ContinuousProfiler:
+    """Low-rate sampling of all in-flight requests, aggregated per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self._stacks = {}
+        self._pid = None
+        self.max_stacks = 5000
+
+    def ensure_running(self, hz):
+        # The thread does not survive fork, start one per worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._active.clear()
+            threading.Thread(target=self._loop, args=(1.0 / hz,), name="continuous-profiler", daemon=True).start()
+
+    def enter(self, endpoint):
+        with self._lock:
+            self._active[threading.get_ident()] = endpoint
+
+    def leave(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def _loop(self, interval):
+        while True:
+            time.sleep(interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, endpoint in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    stacks = self._stacks.setdefault(endpoint, Counter())
+                    stack = collapse(frame)
+                    if stack not in stacks and len(stacks) >= self.max_stacks:
+                        stack = "<truncated>"
+                    stacks[stack] += 1
+
+    def endpoints(self):
+        with self._lock:
+            return {endpoint: sum(stacks.values()) for endpoint, stacks in self._stacks.items()}
+
+    def collapsed(self, endpoint=None):
+        with self._lock:
+            if endpoint is not None:
+                return render_collapsed(self._stacks.get(endpoint, Counter()))
+            merged = Counter()
+            for name, stacks in self._stacks.items():
+                for stack, count in stacks.items():
+                    # Endpoint as the root frame keeps them apart in one graph
+                    merged[f"{name};{stack}"] += count
+            return render_collapsed(merged)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+
+
+continuous = ContinuousProfiler()
+
+
+def profile_dir(app=None):
+    app = app or current_app
+    return app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+
+
+@role_required("admin")
+def _require_admin():
+    return True
+
+
+def _before_request():
+    config = current_app.config
+    if config.get("PROFILE_CONTINUOUS_HZ", 0) > 0:
+        continuous.ensure_running(config["PROFILE_CONTINUOUS_HZ"])
+        continuous.enter(request.endpoint or "unmatched")
+    if request.headers.get("X-Profile") == "1" or request.args.get("__profile") == "1":
+        # Aborts with 403 for anyone but an admin
+        _require_admin()
+        sampler = RequestSampler(threading.get_ident(), config.get("PROFILE_INTERVAL_MS", 5) / 1000.0)
+        sampler.start()
+        g._profile_sampler = sampler
+
+
+def _write_profile(stacks):
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    name = f"{stamp}-{(request.endpoint or 'unmatched').replace('.', '_')}.folded"
+    with open(os.path.join(directory, name), "w") as fh:
+        fh.write(render_collapsed(stacks))
+    return name
+
+
+def _after_request(response):
+    sampler = g.pop("_profile_sampler", None)
+    if sampler is not None:
+        response.headers["X-Profile-File"] = _write_profile(sampler.stop())
+    return response
+
+
+def _teardown_request(exc):
+    # Request failed before after_request, still keep what was sampled
+    sampler = g.pop("_profile_sampler", None)
+    if sampler is not None:
+        _write_profile(sampler.stop())
+    if current_app.config.get("PROFILE_CONTINUOUS_HZ", 0) > 0:
+        continuous.leave()
+
+
+def init_profiler(app):
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+    continuous.max_stacks = app.config.get("PROFILE_MAX_STACKS", 5000)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
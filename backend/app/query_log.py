@@ -0,0 +1,129 @@
+"""
+SQL statement instrumentation.
+
+Every statement timed by app.sql_timer is folded into a per-process table
+keyed by statement shape (literals and IN-list lengths normalized away) and
+the Flask endpoint that ran it, which is what
+GET /api/admin/queries reports. Statements slower than SQL_SLOW_QUERY_MS
+are logged on the "app.sql" logger with their bound parameters replaced by
+type placeholders. A shape running more than SQL_N_PLUS_ONE_THRESHOLD times
+in one request is an N+1: logged as a warning in DEVELOPMENT_MODE and
+counted in db_n_plus_one_total either way.
+"""
+import logging
+import re
+import threading
+from functools import lru_cache
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from app import sql_timer
+from app.metrics import registry
+
+logger = logging.getLogger("app.sql")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,?)+\)", re.IGNORECASE)
+_VALUES = re.compile(r"\bVALUES\s*(\([^()]*\)\s*,?\s*)+", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement):
+    """Statement shape: same query with different values gives the same text"""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    shape = _VALUES.sub("VALUES (...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def redact(parameters):
+    """Bound parameters as type placeholders, never the values"""
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} rows>"
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return "<?>"
+
+
+class QueryStats:
+    """Per-process totals by (statement shape, endpoint)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, shape, endpoint, seconds, max_shapes):
+        key = (shape, endpoint)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= max_shapes:
+                    key = ("<other>", endpoint)
+                    entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def top(self, limit=20, sort="total"):
+        column = {"count": 0, "total": 1, "max": 2}[sort]
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        return [
+            {
+                "statement": shape,
+                "endpoint": endpoint,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / count, 3),
+                "max_ms": round(worst * 1000, 3),
+            }
+            for (shape, endpoint), (count, total, worst) in items
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return "-"
+
+
+def _observe_statement(statement, parameters, seconds):
+    config = current_app.config if has_app_context() else {}
+    shape = fingerprint(statement)
+    endpoint = _endpoint()
+    query_stats.record(shape, endpoint, seconds, config.get("SQL_STATS_MAX_SHAPES", 500))
+
+    if seconds * 1000 >= config.get("SQL_SLOW_QUERY_MS", 200):
+        registry.inc("db_slow_queries_total", endpoint=endpoint)
+        logger.warning(f"Slow query {seconds * 1000:.1f}ms [{endpoint}] {_SPACE.sub(' ', statement)} "
+                       f"params={redact(parameters)}")
+
+    if has_request_context():
+        seen = g.setdefault("_query_shapes", {})
+        seen[shape] = count = seen.get(shape, 0) + 1
+        # Report once per request, when the threshold is first crossed
+        if count == config.get("SQL_N_PLUS_ONE_THRESHOLD", 10) + 1:
+            registry.inc("db_n_plus_one_total", endpoint=endpoint)
+            if config.get("DEVELOPMENT_MODE"):
+                logger.warning(f"Possible N+1 in {endpoint}: same statement ran {count}+ times: {shape}")
+
+
+def init_query_log(app, db):
+    if not app.config.get("SQL_INSTRUMENTATION", True):
+        return
+    sql_timer.add_observer(_observe_statement)
+    with app.app_context():
+        sql_timer.instrument_engine(db.engine)
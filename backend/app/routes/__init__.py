@@ -1,5 +1,42 @@
-from .auth import auth_bp
-from .patient import patient_bp
-from .doctor import doctor_bp
-from .queue import queue_bp
-from .appointment import appointment_bp
\ No newline at end of file
+import threading
+from importlib import import_module
+
+# (module, blueprint, url prefix). Module gulo register korar somoy import hoy
+BLUEPRINTS = [
+    ("auth", "auth_bp", "/api/auth"),
+    ("patient", "patient_bp", "/api/patient"),
+    ("patient_profile", "patient_profile_bp", "/api/patient"),
+    ("doctor", "doctor_bp", "/api/doctor"),
+    ("queue", "queue_bp", "/api/queue"),
+    ("appointment", "appointment_bp", "/api/appointment"),
+    ("admin", "admin_bp", "/api/admin"),
+    ("notifications", "notifications_bp", "/api/notifications"),
+    ("prescription", "prescription_bp", "/api/prescription"),
+    ("analytics", "analytics_bp", "/api/analytics"),
+]
+
+
+def register_blueprints(app):
+    """Import every route module and register its blueprint (once per app)"""
+    if app.extensions.get("blueprints_loaded"):
+        return
+    for module, name, prefix in BLUEPRINTS:
+        blueprint = getattr(import_module(f"{__name__}.{module}"), name)
+        app.register_blueprint(blueprint, url_prefix=prefix)
+    app.extensions["blueprints_loaded"] = True
+
+
+class LazyBlueprints:
+    """WSGI wrapper that registers the blueprints right before the first request,
+    so processes that never serve HTTP (CLI, seed, workers) skip the route modules"""
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if not self.app.extensions.get("blueprints_loaded"):
+            with self._lock:
+                register_blueprints(self.app)
+        return self.wsgi_app(environ, start_response)
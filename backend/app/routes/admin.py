@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, Response, send_from_directory, stream_with_context
+from werkzeug.utils import secure_filename
+from app.utils import role_required
+from app.query_log import query_stats
+from app.profiler import continuous, profile_dir
+from app.services.export import TABLES, Export
+import os
+
+admin_bp = Blueprint("admin", __name__)
+
+# Kon SQL statement e shob theke beshi time jacche (ei process er hisab)
+@admin_bp.route("/queries", methods=["GET"])
+@role_required("admin")
+def top_queries():
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "count", "max"):
+        return jsonify({"msg": "sort must be total, count or max"}), 400
+    limit = min(request.args.get("limit", 20, type=int), 500)
+    return jsonify(query_stats.top(limit=limit, sort=sort)), 200
+
+# Statement stats reset koro
+@admin_bp.route("/queries", methods=["DELETE"])
+@role_required("admin")
+def reset_queries():
+    query_stats.reset()
+    return jsonify({"msg": "Query stats reset hoyeche"}), 200
+
+# Saved request profile gulo (collapsed stack, flamegraph.pl / speedscope e khola jay)
+@admin_bp.route("/profiles", methods=["GET"])
+@role_required("admin")
+def list_profiles():
+    directory = profile_dir()
+    names = sorted(os.listdir(directory), reverse=True) if os.path.isdir(directory) else []
+    return jsonify([
+        {"name": name, "size": os.path.getsize(os.path.join(directory, name))}
+        for name in names if name.endswith(".folded")
+    ]), 200
+
+# Continuous sampling er stack, ?endpoint= dile shudhu oi endpoint
+@admin_bp.route("/profiles/continuous", methods=["GET"])
+@role_required("admin")
+def continuous_profile():
+    if request.args.get("format") == "json":
+        return jsonify(continuous.endpoints()), 200
+    return Response(continuous.collapsed(request.args.get("endpoint")), mimetype="text/plain")
+
+@admin_bp.route("/profiles/continuous", methods=["DELETE"])
+@role_required("admin")
+def reset_continuous_profile():
+    continuous.reset()
+    return jsonify({"msg": "Continuous profile reset hoyeche"}), 200
+
+# Ekta profile file download
+@admin_bp.route("/profiles/<name>", methods=["GET"])
+@role_required("admin")
+def get_profile(name):
+    name = secure_filename(name)
+    if not name.endswith(".folded"):
+        return jsonify({"msg": "Profile not found"}), 404
+    return send_from_directory(profile_dir(), name, mimetype="text/plain")
+
+# Table export, chunk e stream hoy: ?format=parquet|csv&columns=id,status&start=YYYY-MM-DD&end=YYYY-MM-DD (end shoho)
+@admin_bp.route("/export/<table>", methods=["GET"])
+@role_required("admin")
+def export_table(table):
+    if table not in TABLES:
+        return jsonify({"msg": f"table hobe {', '.join(TABLES)}"}), 404
+    columns = [c.strip() for c in request.args.get("columns", "").split(",") if c.strip()]
+    try:
+        start = datetime.strptime(request.args["start"], "%Y-%m-%d").date() if request.args.get("start") else None
+        end = datetime.strptime(request.args["end"], "%Y-%m-%d").date() + timedelta(days=1) if request.args.get("end") else None
+    except ValueError:
+        return jsonify({"msg": "start/end YYYY-MM-DD format e dite hobe"}), 400
+    try:
+        export = Export(table, request.args.get("format"), columns or None, start, end)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return Response(
+        stream_with_context(iter(export)),
+        mimetype=export.mimetype,
+        headers={"Content-Disposition": f"attachment; filename={export.filename}"},
+    )
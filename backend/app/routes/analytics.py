@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from app.utils import role_required
+from app.services.analytics import REPORTS, default_range
+from app.services.daily_stats import trends
+
+analytics_bp = Blueprint("analytics", __name__)
+
+MAX_RANGE_DAYS = 3 * 366
+
+# ?start=YYYY-MM-DD&end=YYYY-MM-DD (end shoho), na dile last ?days= (default 30) din
+def report_range(args):
+    try:
+        if args.get("start") or args.get("end"):
+            start, end = default_range()
+            if args.get("start"):
+                start = datetime.strptime(args["start"], "%Y-%m-%d").date()
+            if args.get("end"):
+                end = datetime.strptime(args["end"], "%Y-%m-%d").date() + timedelta(days=1)
+        else:
+            start, end = default_range(max(1, args.get("days", 30, type=int)))
+    except ValueError:
+        raise ValueError("start/end YYYY-MM-DD format e dite hobe")
+    if start >= end:
+        raise ValueError("start end er age hote hobe")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f"Maximum {MAX_RANGE_DAYS} diner range")
+    return start, end
+
+# Din wise trend, daily_stats rollup theke (shudhu admin)
+@analytics_bp.route("/trends", methods=["GET"])
+@role_required("admin")
+def get_trends():
+    try:
+        start, end = report_range(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    doctor_id = request.args.get("doctor_id", type=int)
+    return jsonify({
+        "start": start.isoformat(),
+        "end": (end - timedelta(days=1)).isoformat(),
+        "doctor_id": doctor_id,
+        "days": trends(start, end, doctor_id),
+    }), 200
+
+# Doctor wise throughput, average wait, no-show rate, peak hours (shudhu admin)
+@analytics_bp.route("/<report>", methods=["GET"])
+@role_required("admin")
+def get_report(report):
+    if report not in REPORTS:
+        return jsonify({"msg": f"report hobe {', '.join(REPORTS)}"}), 404
+    try:
+        start, end = report_range(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify({
+        "report": report,
+        "start": start.isoformat(),
+        "end": (end - timedelta(days=1)).isoformat(),
+        "doctor_id": request.args.get("doctor_id", type=int),
+        "data": REPORTS[report](start, end, request.args.get("doctor_id", type=int)),
+    }), 200
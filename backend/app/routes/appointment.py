@@ -2,8 +2,11 @@ from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models import Appointment, Patient, Doctor
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 
 from app.utils import role_required
+from app.services.slots import slot_index, slot_minutes, BLOCKING_STATUSES
+from app.signals import appointment_changed, appointment_row, send
 from flask_jwt_extended import get_jwt_identity
 
 appointment_bp = Blueprint("appointment", __name__)
@@ -52,19 +55,60 @@ def create_appointment():
             appointment_dt = datetime.strptime(appointment_time, '%Y-%m-%dT%H:%M')
     except Exception as e:
         return jsonify({"msg": "appointment_time format thik na (ISO)"}), 400
+    # Slot gulo doctor er local wall clock e
+    appointment_dt = appointment_dt.replace(tzinfo=None)
 
+    # Check ar insert ek lock er moddhe, jate duijon eki slot na pay
+    with slot_index.lock:
+        error = slot_index.check(doctor, appointment_dt)
+        if error:
+            return jsonify({"msg": error[0]}), error[1]
+        try:
+            appointment = Appointment(
+                patient_id=patient.id,
+                doctor_id=doctor_id,
+                appointment_time=appointment_dt,
+                duration_minutes=slot_minutes(doctor),
+            )
+            db.session.add(appointment)
+            db.session.commit()
+        except IntegrityError:
+            # Onno worker same slot agei niye felse
+            db.session.rollback()
+            return jsonify({"msg": "Ei slot already booked"}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"msg": "Database error occurred"}), 500
+        slot_index.add(appointment)
+    send(appointment_changed, before=None, after=appointment_row(appointment))
+    return jsonify({"msg": "Appointment booked", "id": appointment.id}), 201
+
+# Doctor er ek diner slot, kon gulo khali
+@appointment_bp.route("/slots", methods=["GET"])
+def get_slots():
+    doctor_id = request.args.get("doctor_id", type=int)
+    day = request.args.get("date")
+    if not doctor_id or not day:
+        return jsonify({"msg": "doctor_id, date lagbe"}), 400
     try:
-        appointment = Appointment(
-            patient_id=patient.id,
-            doctor_id=doctor_id,
-            appointment_time=appointment_dt,
-        )
-        db.session.add(appointment)
-        db.session.commit()
-        return jsonify({"msg": "Appointment booked", "id": appointment.id}), 201
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"msg": "Database error occurred"}), 500
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "date format YYYY-MM-DD hobe"}), 400
+
+    doctor = Doctor.query.get(doctor_id)
+    if not doctor:
+        return jsonify({"msg": "Doctor not found"}), 404
+
+    slots = [
+        {"time": f"{start // 60:02d}:{start % 60:02d}", "available": available}
+        for start, available in slot_index.free_slots(doctor, day)
+    ]
+    return jsonify({
+        "doctor_id": doctor.id,
+        "date": day.isoformat(),
+        "slot_minutes": slot_minutes(doctor),
+        "slots": slots,
+    }), 200
 
 # List appointments based on user role and permissions
 @appointment_bp.route("/", methods=["GET"])
@@ -109,6 +153,10 @@ def list_appointments():
         q = q.filter_by(doctor_id=doctor_id)
     if patient_id and user.role == "admin":  # Only admins can filter by patient
         q = q.filter_by(patient_id=patient_id)
+    # ?status=scheduled,completed (expired gulo sweeper mark kore)
+    status = request.args.get("status")
+    if status:
+        q = q.filter(Appointment.status.in_([s.strip() for s in status.split(",") if s.strip()]))
     
     appts = q.order_by(Appointment.appointment_time).all()
     data = []
@@ -157,14 +205,40 @@ def update_appointment(appointment_id):
     data = request.get_json()
     status = data.get("status")
     appointment_time = data.get("appointment_time")
+    new_time = a.appointment_time
     if appointment_time:
         try:
-            a.appointment_time = datetime.fromisoformat(appointment_time)
+            new_time = datetime.fromisoformat(appointment_time.replace('Z', '+00:00')).replace(tzinfo=None)
         except Exception:
             return jsonify({"msg": "appointment_time format thik na (ISO)"}), 400
-    if status:
-        a.status = status
-    db.session.commit()
+    new_status = status or a.status
+
+    with slot_index.lock:
+        # Notun slot nile ba cancel/expired theke abar schedule korle slot check.
+        # Shudhu complete korle (expired visit o) time ar duration jemon chilo
+        takes_slot = new_status in BLOCKING_STATUSES and (
+            new_time != a.appointment_time
+            or (new_status == "scheduled" and a.status not in BLOCKING_STATUSES)
+        )
+        if takes_slot:
+            error = slot_index.check(a.doctor, new_time, ignore_id=a.id)
+            if error:
+                return jsonify({"msg": error[0]}), error[1]
+        before = appointment_row(a)
+        old_time = a.appointment_time
+        a.appointment_time = new_time
+        a.status = new_status
+        if takes_slot:
+            a.duration_minutes = slot_minutes(a.doctor)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"msg": "Ei slot already booked"}), 409
+        slot_index.remove(a.doctor_id, a.id, old_time)
+        if a.status in BLOCKING_STATUSES:
+            slot_index.add(a)
+        send(appointment_changed, before=before, after=appointment_row(a))
     return jsonify({"msg": "Appointment update hoyeche"}), 200
 
 # Delete appointment
@@ -197,6 +271,9 @@ def delete_appointment(appointment_id):
             return jsonify({"msg": "Access denied"}), 403
     # Admins can delete any appointment
     
+    before = appointment_row(a)
     db.session.delete(a)
     db.session.commit()
+    slot_index.remove(before["doctor_id"], appointment_id, before["appointment_time"])
+    send(appointment_changed, before=before, after=None)
     return jsonify({"msg": "Appointment delete hoyeche"}), 200
\ No newline at end of file
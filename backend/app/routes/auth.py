@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
 from app.models import User
-from app.email_utils import send_verification_email, send_account_locked_email, test_email_configuration
 from flask_jwt_extended import create_access_token
 from datetime import datetime
 import logging
@@ -87,6 +86,7 @@ def login():
         
         # Send lock notification if account gets locked
         if user.is_account_locked():
+            from app.email_utils import send_account_locked_email  # Email stack shudhu dorkar hole load hobe
             send_account_locked_email(user.email, user.username, user.account_locked_until)
             return jsonify({
                 "msg": "Too many failed attempts. Account has been locked for 30 minutes.",
@@ -134,6 +134,7 @@ def login():
         }), 200
 
     # Send verification email (production mode)
+    from app.email_utils import send_verification_email
     email_sent = send_verification_email(user.email, verification_code, user.username)
     
     if not email_sent:
@@ -202,6 +203,7 @@ def verify_2fa():
         
         # Send lock notification if account gets locked
         if user.is_account_locked():
+            from app.email_utils import send_account_locked_email
             send_account_locked_email(user.email, user.username, user.account_locked_until)
             return jsonify({
                 "msg": "Too many failed attempts. Account has been locked for 30 minutes.",
@@ -244,6 +246,7 @@ def resend_verification_code():
         }), 200
 
     # Send verification email
+    from app.email_utils import send_verification_email
     email_sent = send_verification_email(user.email, verification_code, user.username)
     
     if not email_sent:
@@ -259,6 +262,7 @@ def resend_verification_code():
 @auth_bp.route("/test-email", methods=["GET"])
 def test_email():
     """Test email configuration (for development)"""
+    from app.email_utils import test_email_configuration
     success, message = test_email_configuration()
     return jsonify({"success": success, "message": message}), 200 if success else 500
 
@@ -1,10 +1,36 @@
+from datetime import date
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
 from app.extensions import db
 from app.models import Doctor
 from app.utils import role_required
+from app.services.bulk_import import import_records, status_code, upload_records
+from app.services.doctor_day import doctor_days
+from app.services.queue_balancer import balancer
+from app.services.slots import clean_available_days, parse_working_hours
+import json
 
 doctor_bp = Blueprint("doctor", __name__)
 
+# working_hours validate kore JSON text banao (None thakle None)
+def working_hours_text(value):
+    if value is None or value == "":
+        return None
+    parse_working_hours(value)
+    return value if isinstance(value, str) else json.dumps(value)
+
+def serialize_doctor(d):
+    return {
+        "id": d.id,
+        "name": d.name,
+        "specialization": d.specialization,
+        "phone": d.phone,
+        "chamber": d.chamber,
+        "available_days": d.available_days,
+        "working_hours": json.loads(d.working_hours) if d.working_hours else None,
+        "slot_minutes": d.slot_minutes,
+    }
+
 # Doctor add koro
 @doctor_bp.route("/", methods=["POST"])
 @role_required("admin")
@@ -15,67 +41,113 @@ def add_doctor():
     specialization = data.get("specialization")
     phone = data.get("phone")
     chamber = data.get("chamber")
-    available_days = data.get("available_days")
+    slot_minutes = data.get("slot_minutes")
     if not name or not specialization:
         return jsonify({"msg": "Name & specialization lagbe"}), 400
+    try:
+        working_hours = working_hours_text(data.get("working_hours"))
+    except (ValueError, TypeError, AttributeError):
+        return jsonify({"msg": "working_hours format thik na"}), 400
+    try:
+        available_days = clean_available_days(data.get("available_days"))
+    except ValueError:
+        return jsonify({"msg": "available_days format thik na"}), 400
     doctor = Doctor(
         name=name,
         specialization=specialization,
         phone=phone,
         chamber=chamber,
-        available_days=available_days
+        available_days=available_days,
+        working_hours=working_hours,
+        slot_minutes=slot_minutes
     )
     db.session.add(doctor)
     db.session.commit()
+    balancer.invalidate(specialization)
     return jsonify({"msg": "Doctor add hoyeche", "id": doctor.id}), 201
 
+# CSV/NDJSON file theke onek doctor ekbare (shudhu admin), row wise error report
+@doctor_bp.route("/import", methods=["POST"])
+@role_required("admin")
+def import_doctors():
+    try:
+        records = upload_records(request)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    result = import_records(
+        "doctors", records,
+        on_insert=lambda rows: balancer.invalidate(*{row["specialization"] for row in rows}),
+    )
+    # Abort er age commit hoye jawa row thake, tai tokhon 200 + aborted + inserted
+    return jsonify(dict(result, msg=result.get("aborted") or "Import hoyeche")), status_code(result)
+
 # Shob doctor dekhao
 @doctor_bp.route("/", methods=["GET"])
 def get_doctors():
     doctors = Doctor.query.all()
     data = []
     for d in doctors:
-        data.append({
-            "id": d.id,
-            "name": d.name,
-            "specialization": d.specialization,
-            "phone": d.phone,
-            "chamber": d.chamber,
-            "available_days": d.available_days
-        })
+        data.append(serialize_doctor(d))
     return jsonify(data), 200
 
+# Doctor er ajker kaj: appointment ar queue ek list e, schedule order e
+@doctor_bp.route("/me/today", methods=["GET"])
+@role_required("doctor")
+def get_my_day():
+    doctor = Doctor.query.filter_by(user_id=int(get_jwt_identity())).first()
+    if not doctor:
+        return jsonify({"msg": "Doctor profile not found"}), 404
+    today = date.today()
+    items = doctor_days.worklist(doctor.id, today)
+    return jsonify({
+        "doctor_id": doctor.id,
+        "date": today.isoformat(),
+        "items": items,
+        "counts": {
+            "appointments": sum(1 for i in items if i["type"] == "appointment"),
+            "scheduled": sum(1 for i in items if i["type"] == "appointment" and i["status"] == "scheduled"),
+            "waiting": sum(1 for i in items if i["type"] == "queue" and i["status"] == "waiting"),
+            "served": sum(1 for i in items if i["type"] == "queue" and i["status"] == "served"),
+        },
+    }), 200
+
 # Specific doctor dekhao
 @doctor_bp.route("/<int:doctor_id>", methods=["GET"])
 def get_doctor(doctor_id):
     d = Doctor.query.get_or_404(doctor_id)
-    data = {
-        "id": d.id,
-        "name": d.name,
-        "specialization": d.specialization,
-        "phone": d.phone,
-        "chamber": d.chamber,
-        "available_days": d.available_days
-    }
-    return jsonify(data), 200
+    return jsonify(serialize_doctor(d)), 200
 
 # Doctor update koro
 @doctor_bp.route("/<int:doctor_id>", methods=["PUT"])
 def update_doctor(doctor_id):
     d = Doctor.query.get_or_404(doctor_id)
     data = request.get_json()
+    try:
+        working_hours = working_hours_text(data.get("working_hours")) if "working_hours" in data else d.working_hours
+    except (ValueError, TypeError, AttributeError):
+        return jsonify({"msg": "working_hours format thik na"}), 400
+    try:
+        available_days = clean_available_days(data["available_days"]) if "available_days" in data else d.available_days
+    except ValueError:
+        return jsonify({"msg": "available_days format thik na"}), 400
+    old_specialization = d.specialization
     d.name = data.get("name", d.name)
     d.specialization = data.get("specialization", d.specialization)
     d.phone = data.get("phone", d.phone)
     d.chamber = data.get("chamber", d.chamber)
-    d.available_days = data.get("available_days", d.available_days)
+    d.available_days = available_days
+    d.slot_minutes = data.get("slot_minutes", d.slot_minutes)
+    d.working_hours = working_hours
     db.session.commit()
+    balancer.invalidate(old_specialization, d.specialization)
     return jsonify({"msg": "Doctor update hoyeche"}), 200
 
 # Doctor delete koro
 @doctor_bp.route("/<int:doctor_id>", methods=["DELETE"])
 def delete_doctor(doctor_id):
     d = Doctor.query.get_or_404(doctor_id)
+    specialization = d.specialization
     db.session.delete(d)
     db.session.commit()
+    balancer.invalidate(specialization)
     return jsonify({"msg": "Doctor delete hoyeche"}), 200
\ No newline at end of file
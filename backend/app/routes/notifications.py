@@ -0,0 +1,111 @@
+from datetime import datetime
+import json
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from app.models import Doctor, Notification, User
+from app.utils import role_required
+from app.services.notifications import (
+    fan_out, queue_recipients, appointment_recipients, unread_count, mark_read, mark_all_read,
+)
+
+notifications_bp = Blueprint("notifications", __name__)
+
+MAX_PAGE_SIZE = 100
+AUDIENCES = ["queue", "appointments"]
+# Notification column lengths, Postgres rejects longer values
+MAX_LENGTHS = {"kind": 30, "title": 200}
+
+def serialize_notification(n):
+    return {
+        "id": n.id,
+        "kind": n.kind,
+        "title": n.title,
+        "body": n.body,
+        "data": json.loads(n.data) if n.data else None,
+        "is_read": n.is_read,
+        "created_at": n.created_at.isoformat(),
+    }
+
+# Nijer inbox, notun theke purono. ?before=<id> diye porer page
+@notifications_bp.route("/", methods=["GET"])
+@role_required("patient", "doctor", "admin")
+def get_inbox():
+    user_id = int(get_jwt_identity())
+    limit = max(1, min(request.args.get("limit", 20, type=int), MAX_PAGE_SIZE))
+    before = request.args.get("before", type=int)
+    query = Notification.query.filter(Notification.user_id == user_id)
+    if before:
+        query = query.filter(Notification.id < before)
+    if request.args.get("unread", "").lower() in ["true", "1"]:
+        query = query.filter(Notification.is_read.is_(False))
+    rows = query.order_by(Notification.id.desc()).limit(limit + 1).all()
+    return jsonify({
+        "notifications": [serialize_notification(n) for n in rows[:limit]],
+        "next_before": rows[limit - 1].id if len(rows) > limit else None,
+        "unread_count": unread_count(user_id),
+    }), 200
+
+# Unread count (counter table theke, COUNT(*) na)
+@notifications_bp.route("/unread-count", methods=["GET"])
+@role_required("patient", "doctor", "admin")
+def get_unread_count():
+    return jsonify({"unread_count": unread_count(int(get_jwt_identity()))}), 200
+
+# Ekta notification read koro
+@notifications_bp.route("/<int:notification_id>/read", methods=["POST"])
+@role_required("patient", "doctor", "admin")
+def read_notification(notification_id):
+    user_id = int(get_jwt_identity())
+    if not mark_read(user_id, notification_id):
+        if not Notification.query.filter_by(id=notification_id, user_id=user_id).first():
+            return jsonify({"msg": "Notification not found"}), 404
+    return jsonify({"msg": "Notification read hoyeche", "unread_count": unread_count(user_id)}), 200
+
+# Shob read koro
+@notifications_bp.route("/read-all", methods=["POST"])
+@role_required("patient", "doctor", "admin")
+def read_all_notifications():
+    changed = mark_all_read(int(get_jwt_identity()))
+    return jsonify({"msg": f"{changed} notification read hoyeche", "unread_count": 0}), 200
+
+# Doctor er queue ba diner appointment er shob patient ke ekshathe janao
+@notifications_bp.route("/fan-out", methods=["POST"])
+@role_required("doctor", "admin")
+def fan_out_notification():
+    data = request.get_json() or {}
+    title = data.get("title")
+    kind = data.get("kind", "doctor_update")
+    audience = data.get("audience", "queue")
+    if not title:
+        return jsonify({"msg": "title lagbe"}), 400
+    for field, value in (("kind", kind), ("title", title)):
+        if not isinstance(value, str) or not value:
+            return jsonify({"msg": f"{field} text hote hobe"}), 400
+        if len(value) > MAX_LENGTHS[field]:
+            return jsonify({"msg": f"{field} {MAX_LENGTHS[field]} character er beshi hote parbe na"}), 400
+    if audience not in AUDIENCES:
+        return jsonify({"msg": f"audience {' ba '.join(AUDIENCES)} hote hobe"}), 400
+
+    # Doctor shudhu nijer patient der janate pare
+    user = User.query.get(int(get_jwt_identity()))
+    if user.role == "doctor":
+        doctor = Doctor.query.filter_by(user_id=user.id).first()
+    else:
+        doctor = Doctor.query.get(data.get("doctor_id")) if data.get("doctor_id") else None
+    if not doctor:
+        return jsonify({"msg": "Doctor not found"}), 404
+
+    try:
+        day = datetime.strptime(data["date"], "%Y-%m-%d").date() if data.get("date") else None
+    except ValueError:
+        return jsonify({"msg": "date YYYY-MM-DD format e dite hobe"}), 400
+
+    recipients = queue_recipients(doctor.id, day) if audience == "queue" else appointment_recipients(doctor.id, day)
+    sent = fan_out(
+        recipients,
+        kind=kind,
+        title=title,
+        body=data.get("body"),
+        data={"doctor_id": doctor.id, "audience": audience},
+    )
+    return jsonify({"msg": "Notification pathano hoyeche", "recipients": sent}), 201
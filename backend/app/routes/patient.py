@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
-from app.models import Patient
+from app.models import Patient, PatientDuplicate
 from app.utils import role_required
+from app.signals import patient_changed, send
+from app.services.bulk_import import import_records, status_code, upload_records
+from app.services.patient_dedupe import merge, remove_pairs
+from app.services.patient_search import search
 
 patient_bp = Blueprint("patient", __name__)
 
@@ -21,6 +25,18 @@ def add_patient():
     db.session.commit()
     return jsonify({"msg": "Patient add hoyeche", "id": patient.id}), 201
 
+# CSV/NDJSON file theke onek patient ekbare (shudhu admin), row wise error report
+@patient_bp.route("/import", methods=["POST"])
+@role_required("admin")
+def import_patients():
+    try:
+        records = upload_records(request)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    result = import_records("patients", records)
+    # Abort er age commit hoye jawa row thake, tai tokhon 200 + aborted + inserted
+    return jsonify(dict(result, msg=result.get("aborted") or "Import hoyeche")), status_code(result)
+
 # Shob patient dekhao
 @patient_bp.route("/", methods=["GET"])
 def get_patients():
@@ -37,6 +53,68 @@ def get_patients():
         })
     return jsonify(data), 200
 
+# Phone ba namer ongsho diye patient khojo: ?q=&limit=&offset= (ranked, page e page e)
+@patient_bp.route("/search", methods=["GET"])
+@role_required("admin", "doctor")
+def search_patients():
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    try:
+        mode, rows = search(request.args.get("q"), limit=limit + 1, offset=offset)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify({
+        "mode": mode,
+        "items": rows[:limit],
+        "next_offset": offset + limit if len(rows) > limit else None,
+    }), 200
+
+# Dedupe job (flask patients dedupe) er paowa possible duplicate pair, score onujayi (shudhu admin)
+@patient_bp.route("/duplicates", methods=["GET"])
+@role_required("admin")
+def get_duplicates():
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    min_score = request.args.get("min_score", 0, type=float)
+    pairs = (
+        PatientDuplicate.query.filter(PatientDuplicate.score >= min_score)
+        .order_by(PatientDuplicate.score.desc(), PatientDuplicate.patient_id, PatientDuplicate.duplicate_id)
+        .limit(limit + 1).offset(offset).all()
+    )
+    ids = {i for p in pairs[:limit] for i in (p.patient_id, p.duplicate_id)}
+    patients = {p.id: p for p in Patient.query.filter(Patient.id.in_(ids))} if ids else {}
+    def brief(patient_id):
+        p = patients[patient_id]
+        return {"id": p.id, "name": p.name, "age": p.age, "gender": p.gender, "phone": p.phone,
+                "address": p.address, "has_account": p.user_id is not None}
+    return jsonify({
+        "items": [
+            {"score": p.score, "reason": p.reason, "patient": brief(p.patient_id), "duplicate": brief(p.duplicate_id)}
+            for p in pairs[:limit]
+            # Dedupe run er pore delete hoye gele pair ta bad
+            if p.patient_id in patients and p.duplicate_id in patients
+        ],
+        "next_offset": offset + limit if len(pairs) > limit else None,
+    }), 200
+
+# Duplicate patient ke keep_id te merge koro: queue, history, appointment, prescription shob shoray (shudhu admin)
+@patient_bp.route("/merge", methods=["POST"])
+@role_required("admin")
+def merge_patients():
+    data = request.get_json() or {}
+    keep_id, duplicate_id = data.get("keep_id"), data.get("duplicate_id")
+    if not isinstance(keep_id, int) or not isinstance(duplicate_id, int):
+        return jsonify({"msg": "keep_id ar duplicate_id lagbe"}), 400
+    try:
+        moved = merge(keep_id, duplicate_id)
+    except LookupError as e:
+        return jsonify({"msg": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 409
+    send(patient_changed, patient_id=keep_id)
+    send(patient_changed, patient_id=duplicate_id)
+    return jsonify({"msg": "Patient merge hoyeche", "keep_id": keep_id, "moved": moved}), 200
+
 # Specific patient dekhao
 @patient_bp.route("/<int:patient_id>", methods=["GET"])
 def get_patient(patient_id):
@@ -62,12 +140,15 @@ def update_patient(patient_id):
     p.phone = data.get("phone", p.phone)
     p.address = data.get("address", p.address)
     db.session.commit()
+    send(patient_changed, patient_id=patient_id)
     return jsonify({"msg": "Patient update hoyeche"}), 200
 
 # Patient delete koro
 @patient_bp.route("/<int:patient_id>", methods=["DELETE"])
 def delete_patient(patient_id):
     p = Patient.query.get_or_404(patient_id)
+    remove_pairs(patient_id)
     db.session.delete(p)
     db.session.commit()
+    send(patient_changed, patient_id=patient_id)
     return jsonify({"msg": "Patient delete hoyeche"}), 200
\ No newline at end of file
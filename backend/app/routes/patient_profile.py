@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity
+from app.utils import role_required
+from app.services.patient_summary import summary_cache, with_positions
+
+patient_profile_bp = Blueprint("patient_profile", __name__)
+
+# Dashboard er jonno ek request e profile, upcoming appointment, queue position ar count
+@patient_profile_bp.route("/me/summary", methods=["GET"])
+@role_required("patient")
+def get_my_summary():
+    summary = summary_cache.get(int(get_jwt_identity()))
+    if summary is None:
+        return jsonify({"msg": "User not found"}), 404
+    return jsonify(with_positions(summary)), 200
@@ -0,0 +1,177 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import and_, or_
+from app.extensions import db
+from app.models import Appointment, Doctor, Patient, Prescription, User
+from app.utils import role_required
+from app.services.prescriptions import clean_medications, encode_body, decode_body
+
+prescription_bp = Blueprint("prescription", __name__)
+
+MAX_PAGE_SIZE = 100
+
+def serialize_prescription(p, body=None):
+    data = {
+        "id": p.id,
+        "patient_id": p.patient_id,
+        "doctor_id": p.doctor_id,
+        "appointment_id": p.appointment_id,
+        "issued_at": p.issued_at.isoformat(),
+        "diagnosis": p.diagnosis,
+        "medication_count": p.medication_count,
+    }
+    if body is not None:
+        data.update(body)
+    return data
+
+def _viewer():
+    user = User.query.get(int(get_jwt_identity()))
+    if user.role == "patient":
+        return user, Patient.query.filter_by(user_id=user.id).first()
+    if user.role == "doctor":
+        return user, Doctor.query.filter_by(user_id=user.id).first()
+    return user, None
+
+def _page(query):
+    """Metadata only, newest first. ?before=<id> diye porer page"""
+    limit = max(1, min(request.args.get("limit", 20, type=int), MAX_PAGE_SIZE))
+    before = request.args.get("before", type=int)
+    if before:
+        # (issued_at, id) order, ix_prescription_patient_issued theke sort lage na
+        issued_at = db.session.query(Prescription.issued_at).filter(Prescription.id == before).scalar()
+        if issued_at is None:
+            return jsonify({"msg": "before thik na"}), 400
+        query = query.filter(or_(
+            Prescription.issued_at < issued_at,
+            and_(Prescription.issued_at == issued_at, Prescription.id < before),
+        ))
+    # body deferred, list e kokhono load hoy na
+    rows = query.order_by(Prescription.issued_at.desc(), Prescription.id.desc()).limit(limit + 1).all()
+    return jsonify({
+        "prescriptions": [serialize_prescription(p) for p in rows[:limit]],
+        "next_before": rows[limit - 1].id if len(rows) > limit else None,
+    }), 200
+
+def _diagnosis(value):
+    # 200 character column, beshi hole kete rakha hoy
+    if value is not None and not isinstance(value, str):
+        raise ValueError("diagnosis text hote hobe")
+    return (value or "")[:200] or None
+
+def _read_body(data, required=False):
+    medications = clean_medications(data.get("medications"))
+    if required and not medications and not data.get("notes"):
+        raise ValueError("notes ba medications lagbe")
+    body, size = encode_body(data.get("notes"), medications)
+    return body, size, len(medications)
+
+# Prescription lekho (doctor). appointment_id dile patient oikhan theke ashe
+@prescription_bp.route("/", methods=["POST"])
+@role_required("doctor")
+def create_prescription():
+    doctor = Doctor.query.filter_by(user_id=int(get_jwt_identity())).first()
+    if not doctor:
+        return jsonify({"msg": "Doctor profile not found"}), 404
+
+    data = request.get_json() or {}
+    appointment_id = data.get("appointment_id")
+    patient_id = data.get("patient_id")
+    if appointment_id:
+        appointment = Appointment.query.get(appointment_id)
+        if not appointment or appointment.doctor_id != doctor.id:
+            return jsonify({"msg": "Appointment not found"}), 404
+        patient_id = appointment.patient_id
+    elif not patient_id:
+        return jsonify({"msg": "appointment_id ba patient_id lagbe"}), 400
+    elif not Patient.query.get(patient_id):
+        return jsonify({"msg": "Patient not found"}), 404
+
+    try:
+        diagnosis = _diagnosis(data.get("diagnosis"))
+        body, size, count = _read_body(data, required=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    prescription = Prescription(
+        patient_id=patient_id,
+        doctor_id=doctor.id,
+        appointment_id=appointment_id,
+        diagnosis=diagnosis,
+        medication_count=count,
+        body_size=size,
+        body=body,
+    )
+    db.session.add(prescription)
+    db.session.commit()
+    return jsonify({"msg": "Prescription create hoyeche", "prescription": serialize_prescription(prescription)}), 201
+
+# Nijer prescription history (patient)
+@prescription_bp.route("/me", methods=["GET"])
+@role_required("patient")
+def get_my_prescriptions():
+    patient = Patient.query.filter_by(user_id=int(get_jwt_identity())).first()
+    if not patient:
+        return jsonify({"prescriptions": [], "next_before": None}), 200
+    return _page(Prescription.query.filter(Prescription.patient_id == patient.id))
+
+# Ekjon patient er history (doctor/admin)
+@prescription_bp.route("/patient/<int:patient_id>", methods=["GET"])
+@role_required("doctor", "admin")
+def get_patient_prescriptions(patient_id):
+    if not Patient.query.get(patient_id):
+        return jsonify({"msg": "Patient not found"}), 404
+    return _page(Prescription.query.filter(Prescription.patient_id == patient_id))
+
+# Ekta appointment er prescription
+@prescription_bp.route("/appointment/<int:appointment_id>", methods=["GET"])
+@role_required("patient", "doctor", "admin")
+def get_appointment_prescriptions(appointment_id):
+    appointment = Appointment.query.get(appointment_id)
+    if not appointment:
+        return jsonify({"msg": "Appointment not found"}), 404
+    user, profile = _viewer()
+    if user.role == "patient" and (not profile or appointment.patient_id != profile.id):
+        return jsonify({"msg": "Access denied"}), 403
+    return _page(Prescription.query.filter(Prescription.appointment_id == appointment_id))
+
+# Details, shudhu ekhane body decompress hoy
+@prescription_bp.route("/<int:prescription_id>", methods=["GET"])
+@role_required("patient", "doctor", "admin")
+def get_prescription(prescription_id):
+    prescription = Prescription.query.get(prescription_id)
+    if not prescription:
+        return jsonify({"msg": "Prescription not found"}), 404
+    user, profile = _viewer()
+    if user.role == "patient" and (not profile or prescription.patient_id != profile.id):
+        return jsonify({"msg": "Access denied"}), 403
+    return jsonify(serialize_prescription(prescription, decode_body(prescription.body))), 200
+
+# Update (shudhu je doctor likhse)
+@prescription_bp.route("/<int:prescription_id>", methods=["PUT"])
+@role_required("doctor")
+def update_prescription(prescription_id):
+    prescription = Prescription.query.get(prescription_id)
+    if not prescription:
+        return jsonify({"msg": "Prescription not found"}), 404
+    doctor = Doctor.query.filter_by(user_id=int(get_jwt_identity())).first()
+    if not doctor or prescription.doctor_id != doctor.id:
+        return jsonify({"msg": "Access denied"}), 403
+
+    data = request.get_json() or {}
+    if "diagnosis" in data:
+        try:
+            prescription.diagnosis = _diagnosis(data["diagnosis"])
+        except ValueError as e:
+            return jsonify({"msg": str(e)}), 400
+    if "notes" in data or "medications" in data:
+        current = decode_body(prescription.body)
+        merged = {
+            "notes": data.get("notes", current["notes"]),
+            "medications": data.get("medications", current["medications"]),
+        }
+        try:
+            prescription.body, prescription.body_size, prescription.medication_count = _read_body(merged)
+        except ValueError as e:
+            return jsonify({"msg": str(e)}), 400
+    db.session.commit()
+    return jsonify({"msg": "Prescription update hoyeche", "prescription": serialize_prescription(prescription)}), 200
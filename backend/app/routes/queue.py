@@ -1,32 +1,97 @@
+from datetime import date, datetime
 from flask import Blueprint, request, jsonify
+from sqlalchemy import func, insert, update, delete
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models import Queue, Patient, Doctor
 from app.utils import role_required
+from app.services.queue_balancer import balancer
+from app.services.queue_positions import positions
+from app.signals import queue_changed, queue_row, send
 
 queue_bp = Blueprint("queue", __name__)
 
+# Concurrent enqueues can race for the same serial, unique constraint dhore retry
+SERIAL_RETRIES = 3
+VALID_STATUSES = ["waiting", "served", "canceled"]
+MAX_BATCH_OPERATIONS = 1000
+
+# Ajker partition e doctor er porer serial
+def next_serial(doctor_id, service_date):
+    last_serial = (
+        db.session.query(func.max(Queue.serial))
+        .filter(Queue.doctor_id == doctor_id, Queue.service_date == service_date)
+        .scalar()
+    )
+    return (last_serial or 0) + 1
+
+# Onek doctor er last serial ek query te
+def last_serials(doctor_ids, service_date):
+    rows = (
+        db.session.query(Queue.doctor_id, func.max(Queue.serial))
+        .filter(Queue.doctor_id.in_(doctor_ids), Queue.service_date == service_date)
+        .group_by(Queue.doctor_id)
+        .all()
+    )
+    last = dict.fromkeys(doctor_ids, 0)
+    last.update(rows)
+    return last
+
+# Live index gulo ke janao (previous None = notun entry, status None = delete)
+def track_transition(doctor_id, service_date, serial, previous, status):
+    if service_date != date.today() or previous == status:
+        return
+    positions.record(doctor_id, service_date, serial, previous, status)
+    if previous == "waiting":
+        balancer.record_left_waiting(doctor_id, served=status == "served")
+    elif status == "waiting":
+        balancer.record_enqueued(doctor_id)
+
 # Notun patient queue te add
 @queue_bp.route("/", methods=["POST"])
 def add_to_queue():
     data = request.get_json()
     patient_id = data.get("patient_id")
     doctor_id = data.get("doctor_id")
-    if not patient_id or not doctor_id:
-        return jsonify({"msg": "patient_id & doctor_id lagbe"}), 400
+    specialization = data.get("specialization")
+    if not patient_id or not (doctor_id or specialization):
+        return jsonify({"msg": "patient_id & doctor_id (ba specialization) lagbe"}), 400
+    if not doctor_id and not isinstance(specialization, str):
+        return jsonify({"msg": "specialization text hote hobe"}), 400
 
-    # Last serial check
-    last_queue = Queue.query.filter_by(doctor_id=doctor_id).order_by(Queue.serial.desc()).first()
-    next_serial = 1 if not last_queue else last_queue.serial + 1
+    # Specialization dile shobcheye kom wait er doctor er queue te pathao
+    expected_wait = None
+    if not doctor_id:
+        picked = balancer.pick_doctor(specialization)
+        if not picked:
+            return jsonify({"msg": "Ei specialization e kono doctor available nai"}), 404
+        doctor_id, expected_wait = picked
 
-    queue_entry = Queue(patient_id=patient_id, doctor_id=doctor_id, serial=next_serial)
-    db.session.add(queue_entry)
-    db.session.commit()
-    return jsonify({"msg": "Queue te add hoyeche", "serial": next_serial, "id": queue_entry.id}), 201
+    # Serial protidin 1 theke shuru hoy
+    today = date.today()
+    for attempt in range(SERIAL_RETRIES):
+        serial = next_serial(doctor_id, today)
+        queue_entry = Queue(patient_id=patient_id, doctor_id=doctor_id, service_date=today, serial=serial)
+        db.session.add(queue_entry)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == SERIAL_RETRIES - 1:
+                return jsonify({"msg": "Serial allocate kora jay nai, abar try koro"}), 409
+    track_transition(doctor_id, today, serial, None, "waiting")
+    send(queue_changed, before=None, after=queue_row(queue_entry))
 
-# Ek doctor er shob queue dekha
+    result = {"msg": "Queue te add hoyeche", "serial": serial, "id": queue_entry.id, "doctor_id": doctor_id}
+    if expected_wait is not None:
+        result["expected_wait_seconds"] = int(expected_wait)
+    return jsonify(result), 201
+
+# Ek doctor er ajker queue dekha (purono din queue_history te archive hoy)
 @queue_bp.route("/doctor/<int:doctor_id>", methods=["GET"])
 def get_queue_for_doctor(doctor_id):
-    qlist = Queue.query.filter_by(doctor_id=doctor_id).order_by(Queue.serial).all()
+    qlist = Queue.query.filter_by(doctor_id=doctor_id, service_date=date.today()).order_by(Queue.serial).all()
     data = []
     for q in qlist:
         data.append({
@@ -39,22 +104,198 @@ def get_queue_for_doctor(doctor_id):
         })
     return jsonify(data), 200
 
+# Patient nijer position dekhbe, onno patient er nam chara
+# Entry r position/ETA (position route ar ASGI stream dujon e use kore)
+def queue_position_data(q):
+    data = {
+        "queue_id": q.id,
+        "doctor_id": q.doctor_id,
+        "service_date": q.service_date.isoformat(),
+        "serial": q.serial,
+        "status": q.status,
+        "position_ahead": None,
+        "eta_seconds": None,
+    }
+    if q.status == "waiting":
+        ahead = positions.ahead_of(q.doctor_id, q.service_date, q.serial)
+        data["position_ahead"] = ahead
+        data["eta_seconds"] = int(ahead * balancer.expected_service_seconds(q.doctor_id))
+    return data
+
+@queue_bp.route("/<int:queue_id>/position", methods=["GET"])
+def get_queue_position(queue_id):
+    q = Queue.query.get_or_404(queue_id)
+    return jsonify(queue_position_data(q)), 200
+
 # Queue status update (served/canceled)
 @queue_bp.route("/<int:queue_id>", methods=["PUT"])
 def update_queue_status(queue_id):
     q = Queue.query.get_or_404(queue_id)
     data = request.get_json()
     status = data.get("status")
-    if status not in ["waiting", "served", "canceled"]:
+    if status not in VALID_STATUSES:
         return jsonify({"msg": "Invalid status"}), 400
+    before = queue_row(q)
     q.status = status
+    if status != before["status"]:
+        q.served_at = datetime.utcnow() if status == "served" else None
+    after = dict(before, status=status, served_at=q.served_at)
     db.session.commit()
+    track_transition(before["doctor_id"], before["service_date"], before["serial"], before["status"], status)
+    send(queue_changed, before=before, after=after)
     return jsonify({"msg": "Queue status update hoyeche"}), 200
 
 # Queue theke patient delete koro (optional)
 @queue_bp.route("/<int:queue_id>", methods=["DELETE"])
 def delete_queue(queue_id):
     q = Queue.query.get_or_404(queue_id)
+    before = queue_row(q)
     db.session.delete(q)
     db.session.commit()
-    return jsonify({"msg": "Queue theke delete hoyeche"}), 200
\ No newline at end of file
+    track_transition(before["doctor_id"], before["service_date"], before["serial"], before["status"], None)
+    send(queue_changed, before=before, after=None)
+    return jsonify({"msg": "Queue theke delete hoyeche"}), 200
+
+# Front desk er jonno: onek enqueue/status/delete ek request, ek transaction e
+@queue_bp.route("/batch", methods=["POST"])
+@role_required("admin", "doctor")
+def batch_queue_operations():
+    data = request.get_json() or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"msg": "operations list lagbe"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"msg": f"Ek batch e maximum {MAX_BATCH_OPERATIONS} ta operation"}), 400
+
+    results = [None] * len(operations)
+    enqueues = []  # (index, patient_id, doctor_id, routed)
+    changes = {}  # queue_id -> [(index, new status or None for delete)]
+
+    def fail(index, msg):
+        results[index] = {"index": index, "ok": False, "msg": msg}
+
+    for i, item in enumerate(operations):
+        item = item if isinstance(item, dict) else {}
+        op = item.get("op")
+        if op == "enqueue":
+            patient_id = item.get("patient_id")
+            doctor_id = item.get("doctor_id")
+            specialization = item.get("specialization")
+            if not patient_id or not (doctor_id or specialization):
+                fail(i, "patient_id & doctor_id (ba specialization) lagbe")
+                continue
+            routed = not doctor_id
+            if routed and not isinstance(specialization, str):
+                fail(i, "specialization text hote hobe")
+                continue
+            if routed:
+                picked = balancer.pick_doctor(specialization)
+                if not picked:
+                    fail(i, "Ei specialization e kono doctor available nai")
+                    continue
+                doctor_id = picked[0]
+                # Porer pick jeno ei patient keo dekhe
+                balancer.record_enqueued(doctor_id)
+            else:
+                try:
+                    doctor_id = int(doctor_id)
+                except (TypeError, ValueError):
+                    fail(i, "doctor_id number hote hobe")
+                    continue
+            enqueues.append((i, patient_id, doctor_id, routed))
+        elif op in ("status", "delete"):
+            try:
+                queue_id = int(item.get("queue_id"))
+            except (TypeError, ValueError):
+                fail(i, "queue_id lagbe")
+                continue
+            status = item.get("status") if op == "status" else None
+            if op == "status" and status not in VALID_STATUSES:
+                fail(i, "Invalid status")
+                continue
+            changes.setdefault(queue_id, []).append((i, status))
+        else:
+            fail(i, "op hobe enqueue, status ba delete")
+
+    # Existing entry gulo ek query te load, tarpor batch er order e final status
+    existing = {}
+    if changes:
+        for q in Queue.query.filter(Queue.id.in_(list(changes))).all():
+            existing[q.id] = queue_row(q)
+    status_updates, deletes, transitions = [], [], []
+    served_at = datetime.utcnow()
+    for queue_id, ops in changes.items():
+        if queue_id not in existing:
+            for index, _ in ops:
+                fail(index, "Queue entry pawa jay nai")
+            continue
+        previous = existing[queue_id]["status"]
+        final = previous
+        for index, status in ops:
+            if final is None:
+                fail(index, "Ei batch e agei delete hoyeche")
+                continue
+            final = status
+            results[index] = {"index": index, "ok": True, "queue_id": queue_id, "status": status or "deleted"}
+        if final is None:
+            deletes.append(queue_id)
+        elif final != previous:
+            status_updates.append({"id": queue_id, "status": final,
+                                   "served_at": served_at if final == "served" else None})
+        transitions.append((existing[queue_id], final))
+
+    today = date.today()
+    for attempt in range(SERIAL_RETRIES):
+        # Protiti doctor er serial ek bar e allocate
+        last = last_serials({e[2] for e in enqueues}, today) if enqueues else {}
+        rows = []
+        for index, patient_id, doctor_id, routed in enqueues:
+            last[doctor_id] += 1
+            rows.append({"patient_id": patient_id, "doctor_id": doctor_id, "service_date": today,
+                         "serial": last[doctor_id], "status": "waiting"})
+        try:
+            new_ids = {}
+            if rows:
+                # (doctor_id, serial) unique, tai returning row order er upor depend kori na
+                inserted = db.session.execute(
+                    insert(Queue).returning(Queue.id, Queue.doctor_id, Queue.serial), rows
+                )
+                new_ids = {(doctor_id, serial): queue_id for queue_id, doctor_id, serial in inserted}
+            if status_updates:
+                db.session.execute(update(Queue), status_updates)
+            if deletes:
+                db.session.execute(
+                    delete(Queue).where(Queue.id.in_(deletes)).execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == SERIAL_RETRIES - 1:
+                for index, patient_id, doctor_id, routed in enqueues:
+                    if routed:
+                        balancer.record_left_waiting(doctor_id)
+                return jsonify({"msg": "Serial allocate kora jay nai, abar try koro"}), 409
+
+    for (index, patient_id, doctor_id, routed), row in zip(enqueues, rows):
+        queue_id = new_ids[(doctor_id, row["serial"])]
+        results[index] = {"index": index, "ok": True, "queue_id": queue_id,
+                          "doctor_id": doctor_id, "serial": row["serial"]}
+        if routed:
+            positions.record(doctor_id, today, row["serial"], None, "waiting")
+        else:
+            track_transition(doctor_id, today, row["serial"], None, "waiting")
+        send(queue_changed, before=None, after=dict(row, id=queue_id, created_at=None, served_at=None))
+    for before, final in transitions:
+        track_transition(before["doctor_id"], before["service_date"], before["serial"], before["status"], final)
+        if final != before["status"]:
+            after = dict(before, status=final, served_at=served_at if final == "served" else None)
+            send(queue_changed, before=before, after=after if final else None)
+
+    failed = sum(1 for r in results if not r["ok"])
+    return jsonify({
+        "msg": "Batch process hoyeche",
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }), 200
@@ -0,0 +1,254 @@
+"""
+Operational analytics over queue and appointment history.
+
+Rows are read in primary key ranges of ANALYTICS_CHUNK_SIZE ids (the same
+batching as the queue archiver) through a raw cursor, and each chunk becomes a
+few integer columns: statuses are mapped to small codes and datetimes to epoch
+seconds in SQL, so no ORM objects, Row objects or datetime instances are
+built. The date range is a filter on that scan rather than a walk of the date
+index, which for a year of rows would cost a random table lookup per row.
+Aggregates are folded per chunk into per-doctor / per-hour totals, so memory
+is bounded by the chunk size whatever the date range.
+
+NumPy is optional. With it every chunk is one int64 matrix reduced with
+bincount; without it the same reductions run as plain Python loops, with the
+same results.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import case, func, literal, select
+
+from app.extensions import db
+from app.models import Appointment, Queue, QueueHistory
+from app.services.dialect import epoch_seconds
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DAY_SECONDS = 24 * 60 * 60
+# Status codes computed in SQL (anything else is 0)
+QUEUE_STATUS = {"served": 1, "canceled": 2}
+APPOINTMENT_STATUS = {"completed": 1, "canceled": 2, "expired": 3}
+
+
+def _status_code(column, codes):
+    return case(*[(column == status, code) for status, code in codes.items()], else_=0)
+
+
+def scan(stmt, id_column, chunk_size=None):
+    """Yield stmt's columns chunk by chunk, one primary key range at a time"""
+    chunk_size = chunk_size or current_app.config.get("ANALYTICS_CHUNK_SIZE", 50000)
+    connection = db.session.connection()
+    low, high = connection.execute(select(func.min(id_column), func.max(id_column))).one()
+    if low is None:
+        return
+    width = len(stmt.selected_columns)
+    for start in range(low, high + 1, chunk_size):
+        chunk = stmt.where(id_column >= start, id_column < start + chunk_size)
+        rows = connection.execute(chunk).cursor.fetchall()
+        if not rows:
+            continue
+        if np is not None:
+            matrix = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width)
+            yield matrix.reshape(-1, width).T
+        else:
+            yield list(zip(*rows))
+
+
+def _equals(column, value):
+    return column == value if np is not None else [v == value for v in column]
+
+
+def _hours(column, offset=0):
+    return (column + offset) // 3600 % 24 if np is not None else [(v + offset) // 3600 % 24 for v in column]
+
+
+class Totals:
+    """Sums keyed by small integers (doctor id, hour), accumulated chunk by chunk"""
+
+    def __init__(self):
+        self._sums = {}
+
+    def add(self, name, keys, weights=None, mask=None):
+        if np is not None:
+            if mask is not None:
+                keys = keys[mask]
+                weights = weights[mask] if weights is not None else None
+            counts = np.bincount(keys, weights=weights)
+            total = self._sums.get(name)
+            if total is None:
+                total = self._sums[name] = np.zeros(len(counts))
+            elif len(total) < len(counts):
+                total = self._sums[name] = np.concatenate([total, np.zeros(len(counts) - len(total))])
+            total[:len(counts)] += counts
+            return
+        total = self._sums.setdefault(name, defaultdict(float))
+        for i, key in enumerate(keys):
+            if mask is None or mask[i]:
+                total[key] += 1 if weights is None else weights[i]
+
+    def get(self, name):
+        total = self._sums.get(name)
+        if total is None:
+            return {}
+        if np is not None:
+            return {int(key): float(total[key]) for key in np.nonzero(total)[0]}
+        return {key: value for key, value in total.items() if value}
+
+
+def _queue_sources(start, end, doctor_id):
+    """Same column list over the live queue and the archive"""
+    for table in (Queue, QueueHistory):
+        stmt = select(
+            table.doctor_id,
+            epoch_seconds(table.service_date),
+            func.coalesce(epoch_seconds(table.created_at), epoch_seconds(table.service_date)),
+            _status_code(table.status, QUEUE_STATUS),
+            func.coalesce(epoch_seconds(table.served_at), literal(-1)),
+        ).where(table.service_date >= start, table.service_date < end)
+        if doctor_id:
+            stmt = stmt.where(table.doctor_id == doctor_id)
+        yield stmt, table.id
+
+
+def queue_totals(start, end, doctor_id=None, utc_offset=0):
+    """Per-doctor enqueued/served/canceled/wait totals, active days and arrival hours"""
+    totals = Totals()
+    active_days = set()
+    for stmt, id_column in _queue_sources(start, end, doctor_id):
+        for doctors, days, arrived, status, served_at in scan(stmt, id_column):
+            served = _equals(status, QUEUE_STATUS["served"])
+            # served_at is only set while the entry is served, -1 otherwise
+            if np is not None:
+                has_wait = served_at >= 0
+                waits = served_at - arrived
+            else:
+                has_wait = [t >= 0 for t in served_at]
+                waits = [t - a for t, a in zip(served_at, arrived)]
+            totals.add("enqueued", doctors)
+            totals.add("served", doctors, mask=served)
+            totals.add("canceled", doctors, mask=_equals(status, QUEUE_STATUS["canceled"]))
+            totals.add("wait_seconds", doctors, waits, mask=has_wait)
+            totals.add("wait_count", doctors, mask=has_wait)
+            totals.add("arrivals_by_hour", _hours(arrived, utc_offset))
+            if np is not None:
+                active_days.update(np.unique(doctors[served] * 100000 + days[served] // DAY_SECONDS).tolist())
+            else:
+                active_days.update(d * 100000 + day // DAY_SECONDS for d, day, s in zip(doctors, days, served) if s)
+    days_by_doctor = defaultdict(int)
+    for key in active_days:
+        days_by_doctor[key // 100000] += 1
+    return totals, dict(days_by_doctor)
+
+
+def appointment_totals(start, end, doctor_id=None):
+    """Per-doctor appointment counts by status and booked slots by hour of day"""
+    begin = datetime.combine(start, datetime.min.time())
+    stop = datetime.combine(end, datetime.min.time())
+    stmt = select(
+        Appointment.doctor_id,
+        epoch_seconds(Appointment.appointment_time),
+        _status_code(Appointment.status, APPOINTMENT_STATUS),
+    ).where(Appointment.appointment_time >= begin, Appointment.appointment_time < stop)
+    if doctor_id:
+        stmt = stmt.where(Appointment.doctor_id == doctor_id)
+    totals = Totals()
+    for doctors, times, status in scan(stmt, Appointment.id):
+        totals.add("booked", doctors)
+        totals.add("completed", doctors, mask=_equals(status, APPOINTMENT_STATUS["completed"]))
+        totals.add("canceled", doctors, mask=_equals(status, APPOINTMENT_STATUS["canceled"]))
+        totals.add("no_show", doctors, mask=_equals(status, APPOINTMENT_STATUS["expired"]))
+        # Appointment times are wall clock already
+        totals.add("appointments_by_hour", _hours(times))
+    return totals
+
+
+def _local_offset():
+    return int(datetime.now().astimezone().utcoffset().total_seconds())
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def throughput(start, end, doctor_id=None):
+    queue, active_days = queue_totals(start, end, doctor_id)
+    appointments = appointment_totals(start, end, doctor_id)
+    served, enqueued, completed = queue.get("served"), queue.get("enqueued"), appointments.get("completed")
+    doctors = sorted(set(enqueued) | set(completed))
+    return [
+        {
+            "doctor_id": d,
+            "enqueued": int(enqueued.get(d, 0)),
+            "served": int(served.get(d, 0)),
+            "active_days": active_days.get(d, 0),
+            "served_per_active_day": _rate(served.get(d, 0), active_days.get(d, 0)),
+            "appointments_completed": int(completed.get(d, 0)),
+        }
+        for d in doctors
+    ]
+
+
+def wait_times(start, end, doctor_id=None):
+    queue, _ = queue_totals(start, end, doctor_id)
+    seconds, count = queue.get("wait_seconds"), queue.get("wait_count")
+    per_doctor = [
+        {"doctor_id": d, "served_with_wait": int(count[d]), "average_wait_seconds": round(seconds.get(d, 0) / count[d], 1)}
+        for d in sorted(count)
+    ]
+    total = sum(count.values())
+    return {
+        "average_wait_seconds": round(sum(seconds.values()) / total, 1) if total else None,
+        "served_with_wait": int(total),
+        "doctors": per_doctor,
+    }
+
+
+def no_show_rates(start, end, doctor_id=None):
+    """No-show = expired (never completed) over appointments that were due"""
+    totals = appointment_totals(start, end, doctor_id)
+    booked, completed, canceled, no_show = (totals.get(name) for name in ("booked", "completed", "canceled", "no_show"))
+    per_doctor = [
+        {
+            "doctor_id": d,
+            "booked": int(booked[d]),
+            "completed": int(completed.get(d, 0)),
+            "canceled": int(canceled.get(d, 0)),
+            "no_show": int(no_show.get(d, 0)),
+            "no_show_rate": _rate(no_show.get(d, 0), completed.get(d, 0) + no_show.get(d, 0)),
+        }
+        for d in sorted(booked)
+    ]
+    total_no_show, total_completed = sum(no_show.values()), sum(completed.values())
+    return {"no_show_rate": _rate(total_no_show, total_no_show + total_completed), "doctors": per_doctor}
+
+
+def peak_hours(start, end, doctor_id=None):
+    queue, _ = queue_totals(start, end, doctor_id, utc_offset=_local_offset())
+    appointments = appointment_totals(start, end, doctor_id)
+    arrivals, booked = queue.get("arrivals_by_hour"), appointments.get("appointments_by_hour")
+    hours = [
+        {"hour": h, "queue_arrivals": int(arrivals.get(h, 0)), "appointments": int(booked.get(h, 0))}
+        for h in range(24)
+    ]
+    busiest = sorted(hours, key=lambda h: h["queue_arrivals"] + h["appointments"], reverse=True)
+    return {"hours": hours, "peak": [h["hour"] for h in busiest[:3] if h["queue_arrivals"] + h["appointments"]]}
+
+
+REPORTS = {
+    "throughput": throughput,
+    "wait-times": wait_times,
+    "no-show": no_show_rates,
+    "peak-hours": peak_hours,
+}
+
+
+def default_range(days=30):
+    """Last `days` days up to and including today, as [start, end)"""
+    end = datetime.now().date() + timedelta(days=1)
+    return end - timedelta(days=days), end
@@ -0,0 +1,100 @@
+"""
+Server-side expiry of past-due appointments.
+
+Scheduled appointments whose time passed more than
+APPOINTMENT_EXPIRY_GRACE_MINUTES ago are moved to "expired" with bounded
+set-based UPDATEs (at most APPOINTMENT_SWEEP_BATCH_SIZE rows per statement,
+selected through the appointment_time index), never by loading rows into
+Python. `start_sweeper(app)` runs it on a daemon thread every
+APPOINTMENT_SWEEP_INTERVAL_SECONDS; `flask appointments sweep` runs it once.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.extensions import db
+from app.metrics import registry
+from app.models import Appointment
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_STATUS = "expired"
+
+# Last run details for this process; /metrics gets the counters via the registry
+sweep_stats = {
+    "runs": 0,
+    "rows_swept_total": 0,
+    "last_rows_swept": 0,
+    "last_duration_seconds": 0.0,
+    "last_run_at": None,
+}
+_stats_lock = threading.Lock()
+
+
+def sweep_expired_appointments(now=None, grace_minutes=30, batch_size=1000):
+    """Expire past-due scheduled appointments, return number of rows changed"""
+    cutoff = (now or datetime.now()) - timedelta(minutes=grace_minutes)
+    started = time.perf_counter()
+    swept = 0
+    while True:
+        batch = (
+            select(Appointment.id)
+            .where(Appointment.appointment_time < cutoff, Appointment.status == "scheduled")
+            .order_by(Appointment.appointment_time)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(batch))
+            .values(status=EXPIRED_STATUS)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        swept += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+    duration = time.perf_counter() - started
+    with _stats_lock:
+        sweep_stats["runs"] += 1
+        sweep_stats["rows_swept_total"] += swept
+        sweep_stats["last_rows_swept"] = swept
+        sweep_stats["last_duration_seconds"] = duration
+        sweep_stats["last_run_at"] = datetime.utcnow().isoformat()
+    registry.inc("appointment_sweep_runs_total")
+    registry.inc("appointment_sweep_rows_total", swept)
+    registry.observe("appointment_sweep_duration_seconds", duration)
+    if swept:
+        logger.info(f"Expired {swept} appointments in {duration:.3f}s")
+    return swept
+
+
+def run_configured_sweep(app):
+    return sweep_expired_appointments(
+        grace_minutes=app.config.get("APPOINTMENT_EXPIRY_GRACE_MINUTES", 30),
+        batch_size=app.config.get("APPOINTMENT_SWEEP_BATCH_SIZE", 1000),
+    )
+
+
+def start_sweeper(app):
+    """Start the background sweeper thread (no-op if the interval is 0)"""
+    interval = app.config.get("APPOINTMENT_SWEEP_INTERVAL_SECONDS", 0)
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            try:
+                with app.app_context():
+                    run_configured_sweep(app)
+            except Exception:
+                logger.exception("Appointment sweep failed")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="appointment-sweeper", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,164 @@
+"""
+Batch backfill framework for data migrations.
+
+A backfill walks its model in primary key order (keyset pagination),
+computes new values for a batch in memory and writes them with one bulk
+UPDATE per batch. The last processed id is saved in backfill_checkpoint in
+the same transaction as the batch, so an interrupted run resumes where it
+stopped. Register new backfills with @register_backfill and run them with
+`flask backfill run <name>`.
+"""
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import BackfillCheckpoint, Doctor, Patient, User, normalize_phone
+from app.services.slots import normalize_days
+
+BACKFILLS = {}
+
+
+def register_backfill(cls):
+    BACKFILLS[cls.name] = cls
+    return cls
+
+
+class Backfill:
+    name = None
+    model = None
+    description = ""
+
+    def where(self):
+        """Extra filter selecting rows that need the backfill"""
+        return None
+
+    def columns(self):
+        return [self.model.id]
+
+    def prepare(self):
+        """Preload whatever compute() needs (runs once per run)"""
+
+    def compute(self, rows):
+        """Return [{"id": ..., column: new value}, ...] for a batch"""
+        raise NotImplementedError
+
+    def _query(self, after_id):
+        query = select(*self.columns()).where(self.model.id > after_id)
+        condition = self.where()
+        if condition is not None:
+            query = query.where(condition)
+        return query
+
+    def run(self, batch_size=1000, dry_run=False, reset=False, progress=print):
+        checkpoint = db.session.get(BackfillCheckpoint, self.name)
+        if checkpoint is None or reset:
+            checkpoint = checkpoint or BackfillCheckpoint(name=self.name)
+            checkpoint.last_id, checkpoint.rows_done, checkpoint.completed_at = 0, 0, None
+            db.session.add(checkpoint)
+        if dry_run:
+            # Nothing is written, so always start from the saved position without saving
+            db.session.expunge(checkpoint)
+
+        total = db.session.execute(
+            select(func.count()).select_from(self._query(checkpoint.last_id).subquery())
+        ).scalar()
+        progress(f"[{self.name}] {total} rows to process, resuming after id {checkpoint.last_id}")
+        self.prepare()
+
+        started, done, changed = time.perf_counter(), 0, 0
+        while True:
+            rows = db.session.execute(
+                self._query(checkpoint.last_id).order_by(self.model.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            updates = self.compute(rows)
+            if updates and not dry_run:
+                db.session.execute(update(self.model), updates)
+            checkpoint.last_id = rows[-1].id
+            checkpoint.rows_done += len(rows)
+            checkpoint.updated_at = datetime.utcnow()
+            if dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+            done += len(rows)
+            changed += len(updates)
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            progress(f"[{self.name}] {done}/{total} rows, {changed} changed, {rate:.0f} rows/s")
+
+        if not dry_run:
+            checkpoint.completed_at = datetime.utcnow()
+            db.session.commit()
+        return changed
+
+
+@register_backfill
+class UserIdBackfill(Backfill):
+    name = "user-ids"
+    model = User
+    description = "Assign USER0001-style login IDs to users without one"
+
+    def where(self):
+        return (User.user_id.is_(None)) | (User.user_id == "")
+
+    def prepare(self):
+        self.existing = set(db.session.execute(
+            select(User.user_id).where(User.user_id.is_not(None))
+        ).scalars())
+
+    def compute(self, rows):
+        updates = []
+        for row in rows:
+            user_id = candidate = f"USER{row.id:04d}"
+            counter = 1
+            while candidate in self.existing:
+                candidate = f"{user_id}_{counter}"
+                counter += 1
+            self.existing.add(candidate)
+            updates.append({"id": row.id, "user_id": candidate})
+        return updates
+
+
+@register_backfill
+class AvailableDaysBackfill(Backfill):
+    name = "available-days"
+    model = Doctor
+    description = "Normalize Doctor.available_days to 'Mon,Tue,...'"
+
+    def where(self):
+        return Doctor.available_days.is_not(None)
+
+    def columns(self):
+        return [Doctor.id, Doctor.available_days]
+
+    def compute(self, rows):
+        updates = []
+        for row in rows:
+            normalized = normalize_days(row.available_days)
+            if normalized != row.available_days:
+                updates.append({"id": row.id, "available_days": normalized})
+        return updates
+
+
+@register_backfill
+class PatientPhoneBackfill(Backfill):
+    name = "patient-phones"
+    model = Patient
+    description = "Fill Patient.phone_normalized for phone search"
+
+    def where(self):
+        return Patient.phone.is_not(None)
+
+    def columns(self):
+        return [Patient.id, Patient.phone, Patient.phone_normalized]
+
+    def compute(self, rows):
+        updates = []
+        for row in rows:
+            normalized = normalize_phone(row.phone)
+            if normalized != row.phone_normalized:
+                updates.append({"id": row.id, "phone_normalized": normalized})
+        return updates
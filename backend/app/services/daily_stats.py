@@ -0,0 +1,199 @@
+"""
+daily_stats rollup: per doctor per day queue and appointment totals.
+
+A row's contribution to its (doctor, day) totals depends only on the row
+itself (an entry counts as enqueued, plus served or canceled, plus its wait
+once served), so every write is applied as contribution(after) minus
+contribution(before) from the queue_changed / appointment_changed signals.
+Deltas are collected for the whole request and written after it with one
+additive upsert per touched (doctor, day), which is safe with any number of
+workers writing at once. `rebuild` recomputes a date range from the live
+queue, queue_history and appointments; run it after loading data behind the
+routes' back (seed, imports) or if an update was lost.
+
+Trend reads only ever touch this table.
+"""
+import logging
+from calendar import timegm
+from collections import Counter
+from datetime import datetime
+
+from flask import after_this_request, g, has_request_context
+from sqlalchemy import and_, case, delete, func, insert, select, update
+
+from app.extensions import db
+from app.models import Appointment, DailyStats, Queue, QueueHistory
+from app.services.dialect import day_of, epoch_seconds, upsert_insert
+from app.signals import appointment_changed, queue_changed
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    "enqueued", "served", "canceled",
+    "appointments_booked", "appointments_completed", "appointments_canceled",
+    "wait_seconds", "served_with_wait",
+)
+
+
+def _seconds(value):
+    # Whole UTC seconds, the same truncation the database applies in rebuild
+    return timegm(value.utctimetuple())
+
+
+def queue_contribution(row):
+    counts = {"enqueued": 1}
+    if row["status"] in ("served", "canceled"):
+        counts[row["status"]] = 1
+    if row["status"] == "served" and row.get("served_at") and row.get("created_at"):
+        counts["wait_seconds"] = _seconds(row["served_at"]) - _seconds(row["created_at"])
+        counts["served_with_wait"] = 1
+    return (row["doctor_id"], row["service_date"]), counts
+
+
+def appointment_contribution(row):
+    counts = {"appointments_booked": 1}
+    if row["status"] in ("completed", "canceled"):
+        counts[f"appointments_{row['status']}"] = 1
+    return (row["doctor_id"], row["appointment_time"].date()), counts
+
+
+def add_delta(deltas, contribution, before, after):
+    for row, sign in ((before, -1), (after, 1)):
+        if row is not None:
+            key, counts = contribution(row)
+            bucket = deltas.setdefault(key, Counter())
+            for name, value in counts.items():
+                bucket[name] += sign * value
+
+
+def apply(deltas):
+    """Add deltas {(doctor_id, day): Counter} to the rollup and commit"""
+    rows = [
+        dict({name: counts.get(name, 0) for name in COUNTERS}, doctor_id=doctor_id, day=day)
+        for (doctor_id, day), counts in sorted(deltas.items()) if any(counts.values())
+    ]
+    if not rows:
+        return
+    table = DailyStats.__table__
+    upsert = upsert_insert()
+    try:
+        if upsert is not None:
+            stmt = upsert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.doctor_id, table.c.day],
+                set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS},
+            )
+            db.session.execute(stmt, rows)
+        else:
+            for row in rows:
+                key = and_(table.c.doctor_id == row["doctor_id"], table.c.day == row["day"])
+                result = db.session.execute(
+                    update(table).where(key).values({name: table.c[name] + row[name] for name in COUNTERS})
+                )
+                if not result.rowcount:
+                    db.session.execute(insert(table), [row])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("daily_stats update failed, `flask analytics rebuild-daily` fixes the totals")
+
+
+def _flush(response):
+    apply(g.pop("_daily_stats_deltas", {}))
+    return response
+
+
+def record(contribution, before, after):
+    if not has_request_context():
+        deltas = {}
+        add_delta(deltas, contribution, before, after)
+        apply(deltas)
+        return
+    deltas = g.get("_daily_stats_deltas")
+    if deltas is None:
+        deltas = g._daily_stats_deltas = {}
+        after_this_request(_flush)
+    add_delta(deltas, contribution, before, after)
+
+
+@queue_changed.connect
+def _on_queue_changed(sender, before=None, after=None, **kwargs):
+    record(queue_contribution, before, after)
+
+
+@appointment_changed.connect
+def _on_appointment_changed(sender, before=None, after=None, **kwargs):
+    record(appointment_contribution, before, after)
+
+
+def _flag(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def rebuild(start=None, end=None):
+    """Recompute rollup rows for days in [start, end) (all days if None), return rows written"""
+    totals = {}
+
+    def merge(rows, names):
+        for doctor_id, day, *values in rows:
+            bucket = totals.setdefault((doctor_id, day), dict.fromkeys(COUNTERS, 0))
+            for name, value in zip(names, values):
+                bucket[name] += int(value or 0)
+
+    for table in (Queue, QueueHistory):
+        has_wait = (table.status == "served") & table.served_at.is_not(None) & table.created_at.is_not(None)
+        stmt = select(
+            table.doctor_id, table.service_date, func.count(),
+            _flag(table.status == "served"), _flag(table.status == "canceled"),
+            func.sum(case((has_wait, epoch_seconds(table.served_at) - epoch_seconds(table.created_at)), else_=0)),
+            _flag(has_wait),
+        ).group_by(table.doctor_id, table.service_date)
+        if start:
+            stmt = stmt.where(table.service_date >= start)
+        if end:
+            stmt = stmt.where(table.service_date < end)
+        merge(db.session.execute(stmt), ("enqueued", "served", "canceled", "wait_seconds", "served_with_wait"))
+
+    day = day_of(Appointment.appointment_time)
+    stmt = select(
+        Appointment.doctor_id, day, func.count(),
+        _flag(Appointment.status == "completed"), _flag(Appointment.status == "canceled"),
+    ).group_by(Appointment.doctor_id, day)
+    if start:
+        stmt = stmt.where(Appointment.appointment_time >= datetime.combine(start, datetime.min.time()))
+    if end:
+        stmt = stmt.where(Appointment.appointment_time < datetime.combine(end, datetime.min.time()))
+    merge(db.session.execute(stmt), ("appointments_booked", "appointments_completed", "appointments_canceled"))
+
+    # Replace the range in one transaction so trend reads never see it half done
+    condition = []
+    if start:
+        condition.append(DailyStats.day >= start)
+    if end:
+        condition.append(DailyStats.day < end)
+    db.session.execute(delete(DailyStats).where(*condition))
+    rows = [dict(values, doctor_id=doctor_id, day=day) for (doctor_id, day), values in sorted(totals.items())]
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(DailyStats), rows[offset:offset + 5000])
+    db.session.commit()
+    return len(rows)
+
+
+def trends(start, end, doctor_id=None):
+    """Per-day totals over [start, end), summed over doctors unless one is given"""
+    stmt = (
+        select(DailyStats.day, *(func.sum(getattr(DailyStats, name)) for name in COUNTERS))
+        .where(DailyStats.day >= start, DailyStats.day < end)
+        .group_by(DailyStats.day)
+        .order_by(DailyStats.day)
+    )
+    if doctor_id:
+        stmt = stmt.where(DailyStats.doctor_id == doctor_id)
+    days = []
+    for day, *values in db.session.execute(stmt):
+        row = dict(zip(COUNTERS, (int(value or 0) for value in values)))
+        row["average_wait_seconds"] = (
+            round(row["wait_seconds"] / row["served_with_wait"], 1) if row["served_with_wait"] else None
+        )
+        days.append(dict(row, date=day.isoformat()))
+    return days
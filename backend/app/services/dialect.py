@@ -0,0 +1,36 @@
+"""
+SQL that differs between the SQLite and PostgreSQL backends.
+"""
+from sqlalchemy import BigInteger, Date, Integer, cast, func
+
+from app.extensions import db
+
+
+def dialect_name():
+    return db.session.get_bind().dialect.name
+
+
+def upsert_insert():
+    """Dialect insert() with on_conflict_do_update, or None where there is none"""
+    dialect = dialect_name()
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        return None
+    return upsert
+
+
+def epoch_seconds(column):
+    """Seconds since 1970 computed by the database (naive datetimes read as UTC)"""
+    if dialect_name() == "postgresql":
+        return cast(func.extract("epoch", column), BigInteger)
+    return cast(func.strftime("%s", column), Integer)
+
+
+def day_of(column):
+    """Calendar date of a datetime column"""
+    if dialect_name() == "postgresql":
+        return cast(column, Date)
+    return func.date(column, type_=Date)
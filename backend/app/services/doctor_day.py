@@ -0,0 +1,210 @@
+"""
+Doctor's day worklist.
+
+Each doctor's day is kept in memory as one list of today's appointments and
+queue entries in schedule order: appointments at their slot time, walk-ins at
+their arrival time. The list is built from the database with two queries the
+first time the day is asked for, then maintained from the queue_changed /
+appointment_changed signals (a bisect insert, in-place status change or
+removal per write) instead of being re-queried on every refresh of the
+doctor's screen. Like the queue indexes it is rebuilt after
+QUEUE_INDEX_TTL_SECONDS to pick up writes handled by other workers, and queue
+positions are read live from the position index.
+
+Queue created_at comes from the database clock (CURRENT_TIMESTAMP, UTC) while
+appointment times are the doctor's wall clock, so arrivals are converted to
+local time before they are ordered against appointments.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta, timezone
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Appointment, Patient, Queue
+from app.services.queue_balancer import balancer
+from app.services.queue_positions import positions
+from app.signals import appointment_changed, patient_changed, queue_changed
+
+# Second field of a sort key; appointments go first when times tie
+KINDS = ("appointment", "queue")
+
+
+def local_time(utc_naive):
+    return utc_naive.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+class _DayView:
+    __slots__ = ("order", "items", "keys", "names", "built_at")
+
+    def __init__(self):
+        self.order = []  # Sorted (time, kind index, id)
+        self.items = {}  # ("appointment"|"queue", id) -> item
+        self.keys = {}  # ("appointment"|"queue", id) -> sort key
+        self.names = {}  # patient_id -> name
+        self.built_at = time.monotonic()
+
+    def put(self, ident, key, item):
+        self.remove(ident)
+        self.items[ident] = item
+        self.keys[ident] = key
+        insort(self.order, key)
+
+    def remove(self, ident):
+        key = self.keys.pop(ident, None)
+        if key is None:
+            return None
+        del self.order[bisect_left(self.order, key)]
+        return self.items.pop(ident)
+
+
+def _appointment_entry(row, name):
+    ident = ("appointment", row["id"])
+    key = (row["appointment_time"], 0, row["id"])
+    return ident, key, {
+        "type": "appointment",
+        "id": row["id"],
+        "patient_id": row["patient_id"],
+        "patient_name": name,
+        "time": row["appointment_time"].isoformat(),
+        "duration_minutes": row["duration_minutes"],
+        "status": row["status"],
+    }
+
+
+def _queue_entry(row, name, arrived_at):
+    ident = ("queue", row["id"])
+    key = (arrived_at, 1, row["id"])
+    return ident, key, {
+        "type": "queue",
+        "id": row["id"],
+        "patient_id": row["patient_id"],
+        "patient_name": name,
+        "time": arrived_at.isoformat(),
+        "serial": row["serial"],
+        "status": row["status"],
+    }
+
+
+class DoctorDays:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def worklist(self, doctor_id, day=None):
+        """Today's items in schedule order, with live queue positions"""
+        day = day or date.today()
+        with self._lock:
+            view = self._get(doctor_id, day)
+            items = [view.items[(KINDS[kind], item_id)] for _, kind, item_id in view.order]
+        result = []
+        for item in items:
+            if item["type"] == "queue" and item["status"] == "waiting":
+                ahead = positions.ahead_of(doctor_id, day, item["serial"])
+                item = dict(item, position_ahead=ahead,
+                            eta_seconds=int(ahead * balancer.expected_service_seconds(doctor_id)))
+            result.append(item)
+        return result
+
+    def _get(self, doctor_id, day):
+        key = (doctor_id, day)
+        ttl = current_app.config.get("QUEUE_INDEX_TTL_SECONDS", 60)
+        view = self._views.get(key)
+        if view is None or time.monotonic() - view.built_at > ttl:
+            view = self._build(doctor_id, day)
+            for old in [k for k in self._views if k[1] < day]:
+                del self._views[old]
+            self._views[key] = view
+        return view
+
+    @staticmethod
+    def _build(doctor_id, day):
+        view = _DayView()
+        start = datetime.combine(day, datetime.min.time())
+        appointments = db.session.execute(
+            db.select(Appointment.id, Appointment.patient_id, Patient.name, Appointment.appointment_time,
+                      Appointment.duration_minutes, Appointment.status)
+            .join(Patient, Patient.id == Appointment.patient_id)
+            .where(Appointment.doctor_id == doctor_id, Appointment.appointment_time >= start,
+                   Appointment.appointment_time < start + timedelta(days=1))
+        ).all()
+        for a in appointments:
+            view.names[a.patient_id] = a.name
+            view.put(*_appointment_entry({
+                "id": a.id, "patient_id": a.patient_id, "appointment_time": a.appointment_time,
+                "duration_minutes": a.duration_minutes, "status": a.status or "scheduled",
+            }, a.name))
+        entries = db.session.execute(
+            db.select(Queue.id, Queue.patient_id, Patient.name, Queue.serial, Queue.status, Queue.created_at)
+            .join(Patient, Patient.id == Queue.patient_id)
+            .where(Queue.doctor_id == doctor_id, Queue.service_date == day)
+        ).all()
+        for q in entries:
+            view.names[q.patient_id] = q.name
+            arrived_at = local_time(q.created_at) if q.created_at else start
+            view.put(*_queue_entry({
+                "id": q.id, "patient_id": q.patient_id, "serial": q.serial, "status": q.status or "waiting",
+            }, q.name, arrived_at))
+        return view
+
+    def _name(self, view, patient_id):
+        if patient_id not in view.names:
+            view.names[patient_id] = db.session.execute(
+                db.select(Patient.name).where(Patient.id == patient_id)
+            ).scalar()
+        return view.names[patient_id]
+
+    def queue_changed(self, before, after):
+        row = after or before
+        with self._lock:
+            view = self._views.get((row["doctor_id"], row["service_date"]))
+            if view is None:
+                # Not built yet, the row is picked up when it is
+                return
+            ident = ("queue", row["id"])
+            if after is None:
+                view.remove(ident)
+            elif ident in view.items:
+                view.items[ident] = dict(view.items[ident], status=after["status"])
+            else:
+                arrived_at = local_time(datetime.utcnow())
+                view.put(*_queue_entry(after, self._name(view, after["patient_id"]), arrived_at))
+
+    def appointment_changed(self, before, after):
+        with self._lock:
+            old_view = before and self._views.get((before["doctor_id"], before["appointment_time"].date()))
+            new_view = after and self._views.get((after["doctor_id"], after["appointment_time"].date()))
+            removed = old_view.remove(("appointment", before["id"])) if old_view else None
+            if new_view:
+                name = removed["patient_name"] if removed else self._name(new_view, after["patient_id"])
+                new_view.put(*_appointment_entry(after, name))
+
+    def patient_changed(self, patient_id):
+        # Renamed or deleted patient: rebuild the days they appear in
+        with self._lock:
+            for key in [k for k, view in self._views.items() if patient_id in view.names]:
+                del self._views[key]
+
+
+doctor_days = DoctorDays()
+
+
+@queue_changed.connect
+def _on_queue_changed(sender, before=None, after=None, **kwargs):
+    doctor_days.queue_changed(before, after)
+
+
+@appointment_changed.connect
+def _on_appointment_changed(sender, before=None, after=None, **kwargs):
+    doctor_days.appointment_changed(before, after)
+
+
+@patient_changed.connect
+def _on_patient_changed(sender, patient_id=None, **kwargs):
+    doctor_days.patient_changed(patient_id)
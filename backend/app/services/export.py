@@ -0,0 +1,180 @@
+"""
+Table extracts for compliance / BI, streamed as Parquet or CSV.
+
+Only the requested columns are selected and the date range is a WHERE clause,
+so the database does the projection and filtering. Rows are read in primary
+key ranges of EXPORT_CHUNK_SIZE ids through a raw cursor (like the analytics
+scan) and written out as soon as a chunk's worth has been collected: one
+Parquet row group or one block of CSV lines at a time. Memory stays at about
+two chunks whatever the table size, and the HTTP response starts streaming
+before the last row is read.
+
+pyarrow is optional. Without it only CSV is offered.
+"""
+import csv
+import io
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import Boolean, Date, DateTime, Integer, func, select
+
+from app.extensions import db
+from app.models import Appointment, Doctor, Patient, Queue, QueueHistory
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# name -> (model, date column for start/end or None)
+TABLES = {
+    "appointments": (Appointment, Appointment.appointment_time),
+    "queue": (Queue, Queue.service_date),
+    "queue_history": (QueueHistory, QueueHistory.service_date),
+    "patients": (Patient, None),
+    "doctors": (Doctor, None),
+}
+
+MIMETYPES = {"parquet": "application/vnd.apache.parquet", "csv": "text/csv"}
+
+
+def formats():
+    return ["parquet", "csv"] if pa is not None else ["csv"]
+
+
+def _arrow_type(column):
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def _arrow_array(values, arrow_type):
+    # SQLite hands dates back as ISO text through the raw cursor, Arrow parses those itself
+    if pa.types.is_temporal(arrow_type) and any(isinstance(v, str) for v in values):
+        return pa.array(values, pa.string()).cast(arrow_type)
+    return pa.array(values, arrow_type)
+
+
+class _Sink:
+    """Write-only file for ParquetWriter, drained after every row group"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class Export:
+    """One table extract; iterate it for the file's bytes, `rows` counts what was written"""
+
+    def __init__(self, table, fmt=None, columns=None, start=None, end=None, chunk_size=None):
+        if table not in TABLES:
+            raise ValueError(f"table must be one of {', '.join(TABLES)}")
+        fmt = fmt or formats()[0]
+        if fmt not in MIMETYPES:
+            raise ValueError("format must be parquet or csv")
+        if fmt not in formats():
+            raise ValueError("parquet export needs pyarrow installed")
+        model, date_column = TABLES[table]
+        available = model.__table__.columns
+        names = columns or list(available.keys())
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"unknown columns: {', '.join(unknown)}")
+        if (start or end) and date_column is None:
+            raise ValueError(f"{table} has no date column to filter on")
+
+        self.table = table
+        self.format = fmt
+        self.columns = [available[name] for name in names]
+        self.chunk_size = chunk_size or current_app.config.get("EXPORT_CHUNK_SIZE", 50000)
+        self.rows = 0
+        self._id_column = available["id"]
+        self._stmt = select(*self.columns)
+        if date_column is not None:
+            to_bound = (lambda d: datetime.combine(d, datetime.min.time())) if isinstance(date_column.type, DateTime) else (lambda d: d)
+            if start:
+                self._stmt = self._stmt.where(date_column >= to_bound(start))
+            if end:
+                self._stmt = self._stmt.where(date_column < to_bound(end))
+
+    @property
+    def mimetype(self):
+        return MIMETYPES[self.format]
+
+    @property
+    def filename(self):
+        return f"{self.table}.{self.format}"
+
+    def chunks(self):
+        """Lists of row tuples, about chunk_size rows each"""
+        connection = db.session.connection()
+        low, high = connection.execute(select(func.min(self._id_column), func.max(self._id_column))).one()
+        if low is None:
+            return
+        pending = []
+        for first in range(low, high + 1, self.chunk_size):
+            stmt = self._stmt.where(self._id_column >= first, self._id_column < first + self.chunk_size)
+            pending.extend(connection.execute(stmt).cursor.fetchall())
+            # A narrow date range leaves most id ranges nearly empty, merge them into full row groups
+            if len(pending) >= self.chunk_size:
+                yield pending
+                pending = []
+        if pending:
+            yield pending
+
+    def __iter__(self):
+        return self._parquet() if self.format == "parquet" else self._csv()
+
+    def _csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([c.name for c in self.columns])
+        for rows in self.chunks():
+            writer.writerows(rows)
+            self.rows += len(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _parquet(self):
+        types = [_arrow_type(c) for c in self.columns]
+        schema = pa.schema([(c.name, t) for c, t in zip(self.columns, types)])
+        sink = _Sink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for rows in self.chunks():
+                arrays = [_arrow_array(values, t) for values, t in zip(zip(*rows), types)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                self.rows += len(rows)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
@@ -0,0 +1,150 @@
+"""
+Notification fan-out and unread counters.
+
+`fan_out` writes one inbox row per recipient with a bulk INSERT (chunked
+executemany) and bumps every recipient's notification_counter row with a
+single upsert, all in one transaction, so telling a whole queue that the
+doctor is late is a handful of statements regardless of its size. Reads of
+the unread count hit the counter row, never COUNT(*) over the inbox; the
+counter only moves through the functions here.
+"""
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.extensions import db
+from app.models import Appointment, Notification, NotificationCounter, Patient, Queue
+from app.services.dialect import upsert_insert
+
+CHUNK_SIZE = 5000
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bump_unread(user_ids, delta=1):
+    """Add delta to the unread counter of every user, creating missing rows"""
+    table = NotificationCounter.__table__
+    upsert = upsert_insert()
+    for chunk in _chunks(list(user_ids)):
+        if upsert is not None:
+            stmt = upsert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={"unread": table.c.unread + stmt.excluded.unread},
+            )
+            db.session.execute(stmt, [{"user_id": user_id, "unread": delta} for user_id in chunk])
+            continue
+        # No upsert on this database: update existing rows, insert the rest
+        db.session.execute(update(table).where(table.c.user_id.in_(chunk)).values(unread=table.c.unread + delta))
+        existing = set(db.session.execute(select(table.c.user_id).where(table.c.user_id.in_(chunk))).scalars())
+        missing = [{"user_id": user_id, "unread": delta} for user_id in chunk if user_id not in existing]
+        if missing:
+            db.session.execute(insert(table), missing)
+
+
+def fan_out(user_ids, kind, title, body=None, data=None, commit=True):
+    """Send one notification to many users, return number of recipients"""
+    user_ids = sorted({user_id for user_id in user_ids if user_id})
+    if not user_ids:
+        return 0
+    now = datetime.utcnow()
+    payload = json.dumps(data) if data is not None else None
+    table = Notification.__table__
+    for chunk in _chunks(user_ids):
+        db.session.execute(insert(table), [
+            {"user_id": user_id, "kind": kind, "title": title, "body": body, "data": payload,
+             "is_read": False, "created_at": now}
+            for user_id in chunk
+        ])
+    bump_unread(user_ids, 1)
+    if commit:
+        db.session.commit()
+    return len(user_ids)
+
+
+def queue_recipients(doctor_id, service_date=None):
+    """Users of the patients still waiting in a doctor's queue"""
+    return db.session.execute(
+        select(Patient.user_id).distinct()
+        .join(Queue, Queue.patient_id == Patient.id)
+        .where(
+            Queue.doctor_id == doctor_id,
+            Queue.service_date == (service_date or date.today()),
+            Queue.status == "waiting",
+            Patient.user_id.is_not(None),
+        )
+    ).scalars().all()
+
+
+def appointment_recipients(doctor_id, day=None):
+    """Users of the patients with a scheduled appointment with the doctor on a day"""
+    start = datetime.combine(day or date.today(), datetime.min.time())
+    return db.session.execute(
+        select(Patient.user_id).distinct()
+        .join(Appointment, Appointment.patient_id == Patient.id)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.appointment_time >= start,
+            Appointment.appointment_time < start + timedelta(days=1),
+            Appointment.status == "scheduled",
+            Patient.user_id.is_not(None),
+        )
+    ).scalars().all()
+
+
+def unread_count(user_id):
+    return db.session.execute(
+        select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ).scalar() or 0
+
+
+def mark_read(user_id, notification_id):
+    """Mark one notification read, return False if it is not this user's unread one"""
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.id == notification_id, Notification.user_id == user_id,
+               Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        db.session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id, NotificationCounter.unread > 0)
+            .values(unread=NotificationCounter.unread - 1)
+        )
+    db.session.commit()
+    return bool(result.rowcount)
+
+
+def mark_all_read(user_id):
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(NotificationCounter).where(NotificationCounter.user_id == user_id).values(unread=0)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def rebuild_counters():
+    """Recount every user's unread notifications from the inbox"""
+    db.session.execute(delete(NotificationCounter))
+    db.session.execute(
+        insert(NotificationCounter).from_select(
+            ["user_id", "unread"],
+            select(Notification.user_id, func.count(Notification.id))
+            .where(Notification.is_read.is_(False))
+            .group_by(Notification.user_id),
+        )
+    )
+    db.session.commit()
+    return db.session.execute(select(func.count()).select_from(NotificationCounter)).scalar()
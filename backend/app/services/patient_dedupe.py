@@ -0,0 +1,210 @@
+"""
+Duplicate patient detection and merge.
+
+Comparing every patient with every other is quadratic, so patients are
+grouped by blocking keys and only patients that share a key are compared:
+
+    phone  same Patient.phone_normalized (grouped in SQL, on its index)
+    name   soundex of the first and last name word + 5 year age bucket; every
+           patient is put in the bucket of its age and of age + 2, so two ages
+           either side of a bucket edge still meet
+
+A block of up to MAX_BLOCK patients is compared all-pairs. A bigger block
+(a common name) is sorted by name and age and each patient is only compared
+with the next WINDOW ones (sorted neighbourhood), so the work stays linear.
+A pair's score (0..1) is mostly name similarity, moved up by a shared phone and
+close age, down by different phones, genders or ages. Pairs at or above
+min_score replace the patient_duplicate table for review.
+
+`merge` repoints the duplicate's queue, queue_history, appointment and
+prescription rows to the kept patient with one UPDATE per table, fills blank
+contact fields, moves the login link if only the duplicate had one and
+deletes the duplicate. Deleting a patient any other way must call
+`remove_pairs` first.
+"""
+import re
+import time
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from sqlalchemy import delete, func, insert, or_, select, update
+
+from app.extensions import db
+from app.models import Appointment, Patient, PatientDuplicate, Prescription, Queue, QueueHistory
+
+MAX_BLOCK = 100
+WINDOW = 8
+DEFAULT_MIN_SCORE = 0.6
+NAME_WEIGHT = 0.55
+BATCH_SIZE = 50000
+TITLES = {"mr", "mrs", "ms", "miss", "dr", "md", "mst"}
+
+_SOUNDEX_CODES = {
+    letter: str(code)
+    for code, letters in enumerate(("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"))
+    for letter in letters
+}
+
+
+def soundex(word):
+    """American soundex ('Robert' -> 'R163'); non-latin words fall back to their first 4 letters"""
+    letters = [ch for ch in word.lower() if ch in _SOUNDEX_CODES]
+    if not letters:
+        return word[:4]
+    code, last = [letters[0].upper()], _SOUNDEX_CODES[letters[0]]
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES[letter]
+        if digit != "0" and digit != last:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # h and w do not separate two letters with the same code, vowels do
+        if letter not in "hw":
+            last = digit
+    return "".join(code).ljust(4, "0")
+
+
+def normalize_name(name):
+    words = re.sub(r"[^\w\s]", " ", (name or "").lower()).split()
+    return " ".join(word for word in words if word not in TITLES)
+
+
+def name_keys(name, age):
+    words = name.split()
+    if not words:
+        return []
+    names = soundex(words[0]) + soundex(words[-1])
+    return [("name", names, bucket) for bucket in {age // 5, (age + 2) // 5}]
+
+
+def _context_score(a, b):
+    """Phone, age and gender part of the score of two (normalized name, age, gender, phone) records"""
+    value = 0.0
+    if a[3] and b[3]:
+        value += 0.35 if a[3] == b[3] else -0.2
+    age_gap = abs(a[1] - b[1])
+    value += {0: 0.1, 1: 0.08, 2: 0.05}.get(age_gap, 0 if age_gap <= 5 else -0.2)
+    if a[2] != b[2]:
+        value -= 0.3
+    return value
+
+
+def _name_score(a, b):
+    return NAME_WEIGHT * (1.0 if a[0] == b[0] else SequenceMatcher(None, a[0], b[0]).ratio())
+
+
+def _records():
+    """{id: (normalized name, age, gender, phone)} for every patient, read in id ranges"""
+    records = {}
+    names = {}  # Normalized once per distinct name, most of them repeat
+    connection = db.session.connection()
+    low, high = connection.execute(select(func.min(Patient.id), func.max(Patient.id))).one()
+    if low is None:
+        return records
+    stmt = select(Patient.id, Patient.name, Patient.age, Patient.gender, Patient.phone_normalized)
+    for start in range(low, high + 1, BATCH_SIZE):
+        chunk = stmt.where(Patient.id >= start, Patient.id < start + BATCH_SIZE)
+        for patient_id, name, age, gender, phone in connection.execute(chunk).cursor.fetchall():
+            name = names.setdefault(name, normalize_name(name))
+            records[patient_id] = (name, age or 0, (gender or "").strip().lower()[:1], phone)
+    return records
+
+
+def _blocks(records):
+    # Phone blocks first, a pair found by both keys is reported as a phone match
+    blocks = {}
+    shared = select(Patient.phone_normalized).where(Patient.phone_normalized.is_not(None)) \
+        .group_by(Patient.phone_normalized).having(func.count() > 1)
+    rows = db.session.execute(
+        select(Patient.phone_normalized, Patient.id).where(Patient.phone_normalized.in_(shared))
+    )
+    for phone, patient_id in rows:
+        blocks.setdefault(("phone", phone), []).append(patient_id)
+    for patient_id, (name, age, _, _) in records.items():
+        for key in name_keys(name, age):
+            blocks.setdefault(key, []).append(patient_id)
+    return blocks
+
+
+def _pairs(ids, records):
+    if len(ids) <= MAX_BLOCK:
+        yield from combinations(ids, 2)
+        return
+    ids = sorted(ids, key=lambda i: (records[i][0], records[i][1]))
+    for position, first in enumerate(ids):
+        for second in ids[position + 1:position + 1 + WINDOW]:
+            yield first, second
+
+
+def find_duplicates(min_score=DEFAULT_MIN_SCORE, log=None):
+    """Score candidate pairs and replace patient_duplicate with those >= min_score, return the count"""
+    started = time.perf_counter()
+    records = _records()
+    blocks = _blocks(records)
+    if log:
+        log(f"{len(records)} patients in {len(blocks)} blocks ({time.perf_counter() - started:.1f}s)")
+    found, compared = {}, 0
+    for (reason, *_), ids in blocks.items():
+        if len(ids) < 2:
+            continue
+        for a, b in _pairs(ids, records):
+            pair = (a, b) if a < b else (b, a)
+            if pair in found:
+                continue
+            compared += 1
+            context = _context_score(records[a], records[b])
+            # Skip the string comparison when even identical names cannot reach min_score
+            if context + NAME_WEIGHT < min_score:
+                continue
+            total = min(1.0, context + _name_score(records[a], records[b]))
+            if total >= min_score:
+                found[pair] = (round(total, 3), reason)
+    if log:
+        log(f"{compared} pairs compared, {len(found)} possible duplicates ({time.perf_counter() - started:.1f}s)")
+
+    db.session.execute(delete(PatientDuplicate))
+    rows = [
+        {"patient_id": a, "duplicate_id": b, "score": value, "reason": reason}
+        for (a, b), (value, reason) in found.items()
+    ]
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(PatientDuplicate), rows[offset:offset + 5000])
+    db.session.commit()
+    return len(rows)
+
+
+def remove_pairs(patient_id):
+    """Drop the patient_duplicate rows of a patient that is about to be deleted (not committed)"""
+    db.session.execute(delete(PatientDuplicate).where(or_(
+        PatientDuplicate.patient_id == patient_id, PatientDuplicate.duplicate_id == patient_id,
+    )))
+
+
+def merge(keep_id, duplicate_id):
+    """Fold duplicate_id into keep_id, return rows moved per table"""
+    if keep_id == duplicate_id:
+        raise ValueError("cannot merge a patient into itself")
+    keep, duplicate = db.session.get(Patient, keep_id), db.session.get(Patient, duplicate_id)
+    if keep is None or duplicate is None:
+        raise LookupError("Patient not found")
+    if keep.user_id and duplicate.user_id:
+        raise ValueError("both patients are linked to login accounts")
+
+    moved = {}
+    for model in (Queue, QueueHistory, Appointment, Prescription):
+        result = db.session.execute(
+            update(model.__table__).where(model.patient_id == duplicate_id).values(patient_id=keep_id)
+        )
+        moved[model.__tablename__] = result.rowcount
+    for field in ("phone", "address"):
+        if not getattr(keep, field) and getattr(duplicate, field):
+            setattr(keep, field, getattr(duplicate, field))
+    user_id = duplicate.user_id
+    remove_pairs(duplicate_id)
+    db.session.expunge(duplicate)
+    db.session.execute(delete(Patient.__table__).where(Patient.id == duplicate_id))
+    if user_id:
+        # Unique column, only free once the duplicate row is gone
+        keep.user_id = user_id
+    db.session.commit()
+    return moved
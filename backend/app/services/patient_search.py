@@ -0,0 +1,99 @@
+"""
+Patient lookup for the front desk.
+
+A query made only of phone characters (digits, spaces, + - ( )) with at least
+MIN_QUERY_LENGTH digits is a phone lookup. It is normalized the same way as
+Patient.phone_normalized and matched as a prefix with a range on that
+column's index, so '01712', '+880 1712' and '1712' find the same patients,
+shortest (exact) numbers first.
+
+Anything else is a name lookup. Every word of MIN_QUERY_LENGTH or more
+characters must appear somewhere in the name (substring, any case). SQLite
+finds the matches through the patient_fts trigram table. Postgres uses ILIKE
+served by the pg_trgm GIN index, and other databases get the same ILIKE as a
+scan. Matches are ranked exact name first, then names starting with the
+query, then by how many words match from their start, then shortest name.
+"""
+import re
+
+from sqlalchemy import select, text
+
+from app.extensions import db
+from app.models import Patient, normalize_phone
+from app.services.dialect import dialect_name
+
+MIN_QUERY_LENGTH = 3  # Trigram indexes cannot match anything shorter
+PHONE_QUERY = re.compile(r"[\d\s+\-()]+")
+RANK_WINDOW = 200  # Name matches ranked per window, see _name_rows
+COLUMNS = ("id", "name", "age", "gender", "phone", "address")
+
+
+def _like_pattern(word):
+    return "%" + re.sub(r"([\\%_])", r"\\\1", word) + "%"
+
+
+def _phone_rows(prefix, limit, offset):
+    # ':' sorts right after '9', so this range is exactly "starts with prefix"
+    stmt = (
+        select(*(getattr(Patient, c) for c in COLUMNS))
+        .where(Patient.phone_normalized >= prefix, Patient.phone_normalized < prefix + ":")
+        .order_by(Patient.phone_normalized, Patient.id)
+        .limit(limit).offset(offset)
+    )
+    return db.session.execute(stmt).all()
+
+
+def _name_candidates(words, count):
+    """First `count` patients whose name contains every word, in id order"""
+    if dialect_name() == "sqlite":
+        # Each word a quoted phrase (trigram substring match), phrases are ANDed
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+        stmt = text(
+            f"SELECT {', '.join('patient.' + c for c in COLUMNS)} FROM patient_fts "
+            "JOIN patient ON patient.id = patient_fts.rowid "
+            "WHERE patient_fts MATCH :match ORDER BY patient_fts.rowid LIMIT :count"
+        )
+        return db.session.execute(stmt, {"match": match, "count": count}).all()
+    # On Postgres the pg_trgm GIN index serves these ILIKEs
+    stmt = select(*(getattr(Patient, c) for c in COLUMNS)).where(
+        *(Patient.name.ilike(_like_pattern(word), escape="\\") for word in words)
+    )
+    return db.session.execute(stmt.order_by(Patient.id).limit(count)).all()
+
+
+def _rank_key(query, words):
+    def key(row):
+        name = row.name.lower()
+        return (
+            name != query,  # The exact name first
+            not name.startswith(query),  # Then names starting with what was typed
+            -sum(1 for part in name.split() if part.startswith(words)),  # Then more words matched from their start
+            len(name),  # Then the closest (shortest) names
+            row.id,
+        )
+    return key
+
+
+def _name_rows(query, words, limit, offset):
+    # Ranking every match (bm25 or similarity) costs ~20us a row, far too slow for a name shared by
+    # 50k patients. Rank a window of the first matches instead; pages inside one window are consistent.
+    window = RANK_WINDOW * (1 + (offset + limit - 1) // RANK_WINDOW)
+    rows = _name_candidates(words, window)
+    rows.sort(key=_rank_key(" ".join(query.lower().split()), tuple(w.lower() for w in words)))
+    return rows[offset:offset + limit]
+
+
+def search(query, limit=20, offset=0):
+    """Return (mode, rows): mode is "phone" or "name", rows are dicts of COLUMNS"""
+    query = (query or "").strip()
+    if PHONE_QUERY.fullmatch(query) and sum(ch.isdigit() for ch in query) >= MIN_QUERY_LENGTH:
+        prefix = normalize_phone(query)
+        rows = _phone_rows(prefix, limit, offset) if prefix else []
+        mode = "phone"
+    else:
+        words = [word for word in query.split() if len(word) >= MIN_QUERY_LENGTH]
+        if not words:
+            raise ValueError(f"search needs a word of at least {MIN_QUERY_LENGTH} characters or a phone number")
+        rows = _name_rows(query, words, limit, offset)
+        mode = "name"
+    return mode, [dict(zip(COLUMNS, row)) for row in rows]
@@ -0,0 +1,186 @@
+"""
+Patient dashboard summary.
+
+`build_summary(user_id)` assembles profile, upcoming appointments, today's
+active queue entries and counts with four queries whatever the history size:
+user+profile, upcoming appointments joined with the doctor, waiting queue
+entries joined with the doctor, and one conditional-aggregate over the
+patient's appointments for the counts.
+
+`summary_cache` keeps the result per user for PATIENT_SUMMARY_TTL_SECONDS and
+drops it when a queue, appointment or profile write for that patient is
+signalled. Queue positions and ETAs move with other patients' writes, so they
+are not cached: they are filled in from the in-memory position index on
+every read.
+"""
+import threading
+import time
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import case, func, select
+
+from app.extensions import db
+from app.models import Appointment, Doctor, Patient, Queue, User
+from app.services.queue_balancer import balancer
+from app.services.queue_positions import positions
+from app.signals import appointment_changed, patient_changed, queue_changed
+
+UPCOMING_LIMIT = 20
+MAX_CACHED_USERS = 10000
+APPOINTMENT_STATUSES = ["scheduled", "completed", "canceled", "expired"]
+
+
+def build_summary(user_id, now=None):
+    now = now or datetime.now()
+    row = db.session.execute(
+        select(User, Patient).outerjoin(Patient, Patient.user_id == User.id).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    user, patient = row
+    summary = {
+        "user": {"id": user.id, "user_id": user.user_id, "username": user.username, "email": user.email},
+        "profile": None,
+        "upcoming_appointments": [],
+        "queue": [],
+        "counts": {"appointments": dict.fromkeys(APPOINTMENT_STATUSES, 0), "upcoming": 0, "in_queue": 0},
+    }
+    if patient is None:
+        return summary
+    summary["profile"] = {
+        "id": patient.id,
+        "name": patient.name,
+        "age": patient.age,
+        "gender": patient.gender,
+        "phone": patient.phone,
+        "address": patient.address,
+    }
+
+    upcoming = db.session.execute(
+        select(Appointment.id, Appointment.doctor_id, Doctor.name, Doctor.specialization,
+               Appointment.appointment_time, Appointment.duration_minutes, Appointment.status)
+        .join(Doctor, Doctor.id == Appointment.doctor_id)
+        .where(Appointment.patient_id == patient.id, Appointment.status == "scheduled",
+               Appointment.appointment_time >= now)
+        .order_by(Appointment.appointment_time)
+        .limit(UPCOMING_LIMIT)
+    ).all()
+    summary["upcoming_appointments"] = [
+        {
+            "id": a.id,
+            "doctor_id": a.doctor_id,
+            "doctor_name": a.name,
+            "specialization": a.specialization,
+            "appointment_time": a.appointment_time.isoformat(),
+            "duration_minutes": a.duration_minutes,
+            "status": a.status,
+        }
+        for a in upcoming
+    ]
+
+    waiting = db.session.execute(
+        select(Queue.id, Queue.doctor_id, Doctor.name, Queue.service_date, Queue.serial, Queue.status)
+        .join(Doctor, Doctor.id == Queue.doctor_id)
+        .where(Queue.patient_id == patient.id, Queue.service_date == now.date(), Queue.status == "waiting")
+        .order_by(Queue.serial)
+    ).all()
+    summary["queue"] = [
+        {
+            "queue_id": q.id,
+            "doctor_id": q.doctor_id,
+            "doctor_name": q.name,
+            "service_date": q.service_date.isoformat(),
+            "serial": q.serial,
+            "status": q.status,
+        }
+        for q in waiting
+    ]
+
+    counts = db.session.execute(
+        select(
+            *[func.coalesce(func.sum(case((Appointment.status == status, 1), else_=0)), 0)
+              for status in APPOINTMENT_STATUSES],
+            func.coalesce(func.sum(case(((Appointment.status == "scheduled") & (Appointment.appointment_time >= now), 1),
+                                        else_=0)), 0),
+        ).where(Appointment.patient_id == patient.id)
+    ).one()
+    summary["counts"] = {
+        "appointments": dict(zip(APPOINTMENT_STATUSES, counts[:-1])),
+        "upcoming": counts[-1],
+        "in_queue": len(waiting),
+    }
+    return summary
+
+
+def with_positions(summary):
+    """Copy of a summary with live position/ETA on each queue entry"""
+    queue = []
+    for entry in summary["queue"]:
+        ahead = positions.ahead_of(entry["doctor_id"], date.fromisoformat(entry["service_date"]), entry["serial"])
+        queue.append(dict(entry, position_ahead=ahead,
+                          eta_seconds=int(ahead * balancer.expected_service_seconds(entry["doctor_id"]))))
+    return dict(summary, queue=queue)
+
+
+class SummaryCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # user_id -> (built_at, summary)
+        self._users = {}  # patient_id -> user_id
+        self._generation = 0  # Bumped by every invalidation
+
+    def get(self, user_id):
+        ttl = current_app.config.get("PATIENT_SUMMARY_TTL_SECONDS", 30)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[0] <= ttl:
+                return entry[1]
+            generation = self._generation
+        summary = build_summary(user_id)
+        # Profile-less users are one query away, and nothing would invalidate them
+        if ttl > 0 and summary is not None and summary["profile"] is not None:
+            with self._lock:
+                # A write landed while building, this result may already be stale
+                if generation != self._generation:
+                    return summary
+                if len(self._entries) >= MAX_CACHED_USERS:
+                    self._prune(ttl)
+                self._entries[user_id] = (time.monotonic(), summary)
+                self._users[summary["profile"]["id"]] = user_id
+        return summary
+
+    def invalidate(self, patient_id):
+        with self._lock:
+            self._generation += 1
+            user_id = self._users.pop(patient_id, None)
+            if user_id is not None:
+                self._entries.pop(user_id, None)
+
+    def _prune(self, ttl):
+        now = time.monotonic()
+        for user_id, (built_at, summary) in list(self._entries.items()):
+            if now - built_at > ttl:
+                del self._entries[user_id]
+                self._users.pop(summary["profile"]["id"], None)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._users.clear()
+
+
+summary_cache = SummaryCache()
+
+
+@queue_changed.connect
+@appointment_changed.connect
+def _on_row_changed(sender, before=None, after=None, **kwargs):
+    for row in (before, after):
+        if row is not None:
+            summary_cache.invalidate(row["patient_id"])
+
+
+@patient_changed.connect
+def _on_patient_changed(sender, patient_id=None, **kwargs):
+    summary_cache.invalidate(patient_id)
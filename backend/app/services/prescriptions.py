@@ -0,0 +1,37 @@
+"""
+Prescription body encoding.
+
+The free text and medication list are stored as zlib-compressed JSON;
+prescriptions are mostly repetitive text (drug names, dosing phrases) and
+shrink several times over. Only the detail endpoint calls `decode_body`.
+"""
+import json
+import zlib
+
+COMPRESSION_LEVEL = 6
+MEDICATION_FIELDS = ("name", "dose", "frequency", "duration", "instructions")
+
+
+def clean_medications(medications):
+    """Keep the known medication fields, raise ValueError on bad input"""
+    if medications is None:
+        return []
+    if not isinstance(medications, list):
+        raise ValueError("medications must be a list")
+    cleaned = []
+    for item in medications:
+        if not isinstance(item, dict) or not item.get("name"):
+            raise ValueError("every medication needs a name")
+        cleaned.append({key: item[key] for key in MEDICATION_FIELDS if item.get(key) not in (None, "")})
+    return cleaned
+
+
+def encode_body(notes, medications):
+    """Return (compressed bytes, uncompressed size)"""
+    raw = json.dumps({"notes": notes or "", "medications": medications},
+                     separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+
+def decode_body(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
@@ -0,0 +1,46 @@
+"""
+Archival of closed queue days.
+
+Rows of every service day before the cutoff are copied into queue_history
+and deleted from the live table with one INSERT ... SELECT and one DELETE
+per batch, so the live queue only ever holds the current days.
+"""
+from datetime import date
+
+from sqlalchemy import and_, delete, insert, select
+
+from app.extensions import db
+from app.models import Queue, QueueHistory
+
+ARCHIVED_COLUMNS = ("id", "patient_id", "doctor_id", "service_date", "serial", "status", "created_at", "served_at")
+
+
+def archive_closed_days(before=None, batch_size=5000):
+    """Move queue rows with service_date < before (default today) to history, return rows moved"""
+    before = before or date.today()
+    source = Queue.__table__
+    moved = 0
+    while True:
+        # Upper id of the next batch; batches are contiguous in id order
+        upper = db.session.execute(
+            select(source.c.id)
+            .where(source.c.service_date < before)
+            .order_by(source.c.id)
+            .offset(batch_size - 1)
+            .limit(1)
+        ).scalar()
+        condition = source.c.service_date < before
+        if upper is not None:
+            condition = and_(condition, source.c.id <= upper)
+
+        db.session.execute(
+            insert(QueueHistory.__table__).from_select(
+                ARCHIVED_COLUMNS,
+                select(*(source.c[name] for name in ARCHIVED_COLUMNS)).where(condition),
+            )
+        )
+        result = db.session.execute(delete(source).where(condition))
+        db.session.commit()
+        moved += result.rowcount
+        if upper is None or result.rowcount == 0:
+            return moved
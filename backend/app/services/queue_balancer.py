@@ -0,0 +1,201 @@
+"""
+Specialization load index for routing walk-in patients.
+
+Every specialization keeps a min-heap of its doctors keyed by expected wait
+(waiting patients x rolling service time), so picking the least loaded
+doctor is O(log d) instead of counting queue rows per doctor on each request.
+Heap entries are invalidated lazily: every change pushes a fresh entry and
+stale ones are discarded when they surface at the top.
+
+The index lives in process memory. Each specialization is rebuilt from the
+database with a single grouped query when first used, when the day changes,
+and after QUEUE_INDEX_TTL_SECONDS so that several workers cannot drift apart
+for long.
+"""
+import heapq
+import threading
+import time
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Doctor, Queue
+from app.services.slots import available_weekdays
+
+# Weight of the newest observation in the rolling service time
+SERVICE_TIME_ALPHA = 0.2
+# Gaps longer than this between two served patients are breaks, not service
+MAX_SERVICE_SECONDS = 60 * 60
+
+
+def specialization_key(specialization):
+    return (specialization or "").strip().lower()
+
+
+def _available_today(available_days, today):
+    # None means the doctor has not restricted their days
+    weekdays = available_weekdays(available_days)
+    return weekdays is None or today.weekday() in weekdays
+
+
+class _DoctorLoad:
+    __slots__ = ("doctor_id", "specialization", "waiting", "service_seconds",
+                 "last_served_at", "version")
+
+    def __init__(self, doctor_id, specialization, service_seconds):
+        self.doctor_id = doctor_id
+        self.specialization = specialization
+        self.waiting = 0
+        self.service_seconds = service_seconds
+        self.last_served_at = None
+        self.version = 0
+
+    @property
+    def expected_wait(self):
+        return self.waiting * self.service_seconds
+
+
+class _SpecializationHeap:
+    def __init__(self, built_on):
+        self.heap = []
+        self.doctors = {}
+        self.built_on = built_on
+        self.built_at = time.monotonic()
+
+    def push(self, load):
+        load.version += 1
+        heapq.heappush(self.heap, (load.expected_wait, load.waiting, load.doctor_id, load.version))
+        # Drop stale entries once they dominate the heap
+        if len(self.heap) > 4 * len(self.doctors) + 64:
+            self.heap = [(l.expected_wait, l.waiting, l.doctor_id, l.version) for l in self.doctors.values()]
+            heapq.heapify(self.heap)
+
+    def peek(self):
+        while self.heap:
+            _, _, doctor_id, version = self.heap[0]
+            load = self.doctors.get(doctor_id)
+            if load is not None and load.version == version:
+                return load
+            heapq.heappop(self.heap)
+        return None
+
+
+class QueueBalancer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._specializations = {}
+        self._doctors = {}
+        # Rolling service times survive rebuilds, they are not stored in the DB
+        self._service_seconds = {}
+
+    def reset(self):
+        with self._lock:
+            self._specializations.clear()
+            self._doctors.clear()
+            self._service_seconds.clear()
+
+    def invalidate(self, *specializations):
+        """Forget specializations so they are rebuilt on next use"""
+        with self._lock:
+            for spec in specializations:
+                index = self._specializations.pop(specialization_key(spec), None)
+                if index:
+                    for doctor_id in index.doctors:
+                        self._doctors.pop(doctor_id, None)
+
+    def pick_doctor(self, specialization):
+        """Return (doctor_id, expected_wait_seconds) or None if nobody is available"""
+        key = specialization_key(specialization)
+        with self._lock:
+            index = self._get_index(key)
+            load = index.peek()
+            if load is None:
+                return None
+            return load.doctor_id, load.expected_wait
+
+    def expected_service_seconds(self, doctor_id):
+        with self._lock:
+            return self._service_seconds.get(doctor_id, self._default_service_seconds())
+
+    def record_enqueued(self, doctor_id, count=1):
+        self._adjust(doctor_id, count)
+
+    def record_left_waiting(self, doctor_id, served=False, count=1):
+        self._adjust(doctor_id, -count, served=served)
+
+    def _adjust(self, doctor_id, delta, served=False):
+        with self._lock:
+            if served:
+                self._observe_service(doctor_id)
+            load = self._doctors.get(doctor_id)
+            if load is None:
+                # Specialization not indexed yet, it will be counted on build
+                return
+            load.waiting = max(0, load.waiting + delta)
+            if served:
+                load.service_seconds = self._service_seconds[doctor_id]
+            self._specializations[load.specialization].push(load)
+
+    def _observe_service(self, doctor_id):
+        now = time.monotonic()
+        load = self._doctors.get(doctor_id)
+        current = self._service_seconds.get(doctor_id, self._default_service_seconds())
+        if load is not None and load.last_served_at is not None:
+            gap = now - load.last_served_at
+            if 0 < gap <= MAX_SERVICE_SECONDS:
+                current = (1 - SERVICE_TIME_ALPHA) * current + SERVICE_TIME_ALPHA * gap
+        self._service_seconds[doctor_id] = current
+        if load is not None:
+            load.last_served_at = now
+
+    def _default_service_seconds(self):
+        return current_app.config.get("QUEUE_DEFAULT_SERVICE_MINUTES", 10) * 60
+
+    def _get_index(self, key):
+        today = date.today()
+        ttl = current_app.config.get("QUEUE_INDEX_TTL_SECONDS", 60)
+        index = self._specializations.get(key)
+        if index is None or index.built_on != today or time.monotonic() - index.built_at > ttl:
+            index = self._build(key, today, index)
+        return index
+
+    def _build(self, key, today, previous):
+        doctors = Doctor.query.filter(func.lower(func.trim(Doctor.specialization)) == key).all()
+        doctors = [d for d in doctors if _available_today(d.available_days, today)]
+        counts = {}
+        if doctors:
+            rows = (
+                db.session.query(Queue.doctor_id, func.count(Queue.id))
+                .filter(
+                    Queue.doctor_id.in_([d.id for d in doctors]),
+                    Queue.service_date == today,
+                    Queue.status == "waiting",
+                )
+                .group_by(Queue.doctor_id)
+                .all()
+            )
+            counts = dict(rows)
+
+        if previous:
+            for doctor_id in previous.doctors:
+                self._doctors.pop(doctor_id, None)
+
+        index = _SpecializationHeap(today)
+        default = self._default_service_seconds()
+        for d in doctors:
+            old = previous.doctors.get(d.id) if previous else None
+            load = _DoctorLoad(d.id, key, self._service_seconds.get(d.id, default))
+            load.waiting = counts.get(d.id, 0)
+            if old is not None:
+                load.last_served_at = old.last_served_at
+            index.doctors[d.id] = load
+            self._doctors[d.id] = load
+        index.heap = [(l.expected_wait, l.waiting, l.doctor_id, l.version) for l in index.doctors.values()]
+        heapq.heapify(index.heap)
+        self._specializations[key] = index
+        return index
+
+
+balancer = QueueBalancer()
@@ -0,0 +1,118 @@
+"""
+Order-statistics index for "how many patients are ahead of me".
+
+Each doctor's queue for a service day is a Fenwick (binary indexed) tree
+over serials holding 1 for every waiting entry, so the number of waiting
+patients ahead of a serial is a prefix sum in O(log n) instead of a COUNT
+over the queue on every poll. Trees are built from the database on first
+use and kept current from queue status transitions; like the balancer they
+are rebuilt after QUEUE_INDEX_TTL_SECONDS to absorb writes from other
+workers.
+"""
+import threading
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Queue
+
+
+class FenwickTree:
+    def __init__(self, size=64):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, position, delta):
+        if position > self.size:
+            self._grow(position)
+        while position <= self.size:
+            self.tree[position] += delta
+            position += position & -position
+
+    def prefix_sum(self, position):
+        position = min(position, self.size)
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def _grow(self, needed):
+        # Rebuild at double size; the tree is rebuilt from its point values
+        values = [self.prefix_sum(i) - self.prefix_sum(i - 1) for i in range(1, self.size + 1)]
+        size = self.size
+        while size < needed:
+            size *= 2
+        self.size = size
+        self.tree = [0] * (size + 1)
+        for i, value in enumerate(values, start=1):
+            if value:
+                self.add(i, value)
+
+
+class _DayQueue:
+    __slots__ = ("tree", "waiting", "built_at")
+
+    def __init__(self, serials):
+        self.tree = FenwickTree(max(64, max(serials, default=0)))
+        self.waiting = 0
+        self.built_at = time.monotonic()
+        for serial in serials:
+            self.tree.add(serial, 1)
+            self.waiting += 1
+
+
+class QueuePositions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days = {}
+
+    def reset(self):
+        with self._lock:
+            self._days.clear()
+
+    def ahead_of(self, doctor_id, service_date, serial):
+        """Waiting entries with a smaller serial on the same doctor's day"""
+        with self._lock:
+            return self._get(doctor_id, service_date).tree.prefix_sum(serial - 1)
+
+    def waiting_count(self, doctor_id, service_date):
+        with self._lock:
+            return self._get(doctor_id, service_date).waiting
+
+    def record(self, doctor_id, service_date, serial, previous, status):
+        """Apply a status transition; previous/status None mean created/deleted"""
+        with self._lock:
+            day = self._days.get((doctor_id, service_date))
+            if day is None:
+                # Not indexed yet, the row is picked up when the tree is built
+                return
+            if previous == "waiting":
+                day.tree.add(serial, -1)
+                day.waiting -= 1
+            if status == "waiting":
+                day.tree.add(serial, 1)
+                day.waiting += 1
+
+    def _get(self, doctor_id, service_date):
+        key = (doctor_id, service_date)
+        ttl = current_app.config.get("QUEUE_INDEX_TTL_SECONDS", 60)
+        day = self._days.get(key)
+        if day is None or time.monotonic() - day.built_at > ttl:
+            serials = db.session.execute(
+                db.select(Queue.serial).where(
+                    Queue.doctor_id == doctor_id,
+                    Queue.service_date == service_date,
+                    Queue.status == "waiting",
+                )
+            ).scalars().all()
+            day = _DayQueue(serials)
+            # Previous days are never asked about again once archived
+            for old in [k for k in self._days if k[1] < service_date]:
+                del self._days[old]
+            self._days[key] = day
+        return day
+
+
+positions = QueuePositions()
@@ -0,0 +1,222 @@
+"""
+Synthetic data generator for load testing.
+
+Rows are generated in Python from a seeded random.Random (same seed, same
+data) and written with Core executemany inserts in chunks, bypassing the
+ORM unit of work. Primary keys are assigned up front from the current
+MAX(id) so that child rows can reference parents without reading them
+back, and every synthetic account shares one precomputed password hash.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, text
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import Appointment, Doctor, Patient, Queue, User, normalize_phone
+from app.services.slots import parse_windows
+
+SPECIALIZATIONS = [
+    "General Medicine", "Cardiology", "Pediatrics", "Orthopedics", "Dermatology",
+    "Neurology", "Gynecology", "ENT", "Ophthalmology", "Psychiatry",
+]
+FIRST_NAMES = ["Rahim", "Karim", "Ayesha", "Fatima", "John", "Sarah", "Nusrat", "Tanvir",
+               "Maria", "David", "Sadia", "Imran", "Emma", "Arif", "Lina", "Omar"]
+LAST_NAMES = ["Ahmed", "Hossain", "Rahman", "Islam", "Smith", "Khan", "Chowdhury",
+              "Brown", "Akter", "Uddin", "Garcia", "Sarkar", "Das", "Roy"]
+DAY_SETS = ["Mon,Tue,Wed,Thu,Fri", "Sat,Sun,Mon,Tue,Wed", "Sun,Tue,Thu", "Mon,Wed,Fri,Sat", None]
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _weights(count, skew):
+    """Cumulative Zipf-like weights; skew 0 = uniform"""
+    total, cumulative = 0.0, []
+    for rank in range(count):
+        total += 1.0 / (rank + 1) ** skew
+        cumulative.append(total)
+    return cumulative
+
+
+class Seeder:
+    def __init__(self, seed=42, chunk_size=10000, password="password123", log=print):
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.password_hash = generate_password_hash(password)
+        self.log = log
+        self.counts = {}
+
+    def _insert(self, table, rows):
+        """Insert an iterable of dicts in chunks, return number of rows"""
+        written, chunk = 0, []
+        with db.engine.connect() as conn:
+            synchronous = None
+            if conn.dialect.name == "sqlite":
+                # Only for this bulk load, the connection goes back to the pool afterwards
+                synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+                conn.exec_driver_sql("PRAGMA synchronous = OFF")
+                conn.commit()
+            try:
+                with conn.begin():
+                    for row in rows:
+                        chunk.append(row)
+                        if len(chunk) >= self.chunk_size:
+                            conn.execute(table.insert(), chunk)
+                            written += len(chunk)
+                            chunk = []
+                    if chunk:
+                        conn.execute(table.insert(), chunk)
+                        written += len(chunk)
+                    if conn.dialect.name == "postgresql":
+                        conn.execute(text(
+                            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                            f"(SELECT MAX(id) FROM \"{table.name}\"))"
+                        ))
+            finally:
+                if synchronous is not None:
+                    conn.exec_driver_sql(f"PRAGMA synchronous = {int(synchronous)}")
+                    conn.commit()
+        self.counts[table.name] = self.counts.get(table.name, 0) + written
+        return written
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _users(self, first_id, count, role, prefix):
+        now = datetime.utcnow()
+        for i in range(count):
+            uid = f"{prefix}{first_id + i:07d}"
+            yield {
+                "id": first_id + i, "user_id": uid, "username": self._name(),
+                "email": f"{uid}@seed.local", "password_hash": self.password_hash, "role": role,
+                "is_email_verified": True, "two_factor_enabled": False,
+                "failed_login_attempts": 0, "created_at": now,
+            }
+
+    def seed_doctors(self, count):
+        user_id, doctor_id = _next_id(User), _next_id(Doctor)
+        self._insert(User.__table__, self._users(user_id, count, "doctor", "sd"))
+        self._insert(Doctor.__table__, (
+            {
+                "id": doctor_id + i, "user_id": user_id + i, "name": f"Dr. {self._name()}",
+                "specialization": self.rng.choice(SPECIALIZATIONS),
+                "phone": f"01{self.rng.randrange(10**9):09d}",
+                "chamber": f"Room {100 + i % 900}", "available_days": self.rng.choice(DAY_SETS),
+            }
+            for i in range(count)
+        ))
+        return list(range(doctor_id, doctor_id + count))
+
+    def seed_patients(self, count):
+        user_id, patient_id = _next_id(User), _next_id(Patient)
+        self._insert(User.__table__, self._users(user_id, count, "patient", "sp"))
+        rng = self.rng
+
+        def rows():
+            for i in range(count):
+                row = {
+                    "id": patient_id + i, "user_id": user_id + i, "name": self._name(),
+                    "age": rng.randint(1, 90), "gender": rng.choice(("Male", "Female")),
+                    "phone": f"01{rng.randrange(10**9):09d}", "address": f"{rng.randint(1, 999)} Road {rng.randint(1, 40)}",
+                }
+                row["phone_normalized"] = normalize_phone(row["phone"])
+                yield row
+
+        self._insert(Patient.__table__, rows())
+        return list(range(patient_id, patient_id + count))
+
+    def seed_appointments(self, count, doctor_ids, patient_ids, days=365, future_days=30,
+                          doctor_skew=1.0, cancel_rate=0.1, no_show_rate=0.1,
+                          working_hours="09:00-12:00,14:00-18:00,19:00-21:00", slot_minutes=30):
+        rng = self.rng
+        slots = [start for s, e in parse_windows(working_hours) for start in range(s, e - slot_minutes + 1, slot_minutes)]
+        weights = _weights(len(doctor_ids), doctor_skew)
+        today = datetime.combine(date.today(), datetime.min.time())
+        now = datetime.now()
+        taken = set()  # Scheduled (doctor, time) pairs must be unique
+
+        def rows():
+            doctors = rng.choices(doctor_ids, cum_weights=weights, k=count)
+            for doctor_id in doctors:
+                for _ in range(20):
+                    day = rng.randint(-days, future_days)
+                    start = today + timedelta(days=day, minutes=rng.choice(slots))
+                    if start < now:
+                        roll = rng.random()
+                        status = "canceled" if roll < cancel_rate else "expired" if roll < cancel_rate + no_show_rate else "completed"
+                    else:
+                        status = "canceled" if rng.random() < cancel_rate else "scheduled"
+                    if status != "scheduled" or (doctor_id, start) not in taken:
+                        break
+                else:
+                    continue  # Doctor fully booked, drop this one
+                if status == "scheduled":
+                    taken.add((doctor_id, start))
+                yield {
+                    "patient_id": rng.choice(patient_ids), "doctor_id": doctor_id,
+                    "appointment_time": start, "duration_minutes": slot_minutes, "status": status,
+                }
+
+        return self._insert(Appointment.__table__, rows())
+
+    def seed_queue(self, count, doctor_ids, patient_ids, days=1, doctor_skew=1.0, served_rate=0.6, cancel_rate=0.05):
+        rng = self.rng
+        weights = _weights(len(doctor_ids), doctor_skew)
+        today = date.today()
+        last_serial = {}
+        for doctor_id, service_date, serial in db.session.execute(
+            select(Queue.doctor_id, Queue.service_date, func.max(Queue.serial))
+            .where(Queue.service_date > today - timedelta(days=days))
+            .group_by(Queue.doctor_id, Queue.service_date)
+        ):
+            last_serial[(doctor_id, service_date)] = serial
+
+        def rows():
+            doctors = rng.choices(doctor_ids, cum_weights=weights, k=count)
+            for doctor_id in doctors:
+                service_date = today - timedelta(days=rng.randrange(days))
+                key = (doctor_id, service_date)
+                last_serial[key] = last_serial.get(key, 0) + 1
+                roll = rng.random()
+                # Earlier days are closed, today still has people waiting
+                if service_date < today or roll < served_rate:
+                    status = "canceled" if roll < cancel_rate else "served"
+                else:
+                    status = "waiting"
+                created_at = datetime.combine(service_date, datetime.min.time()) + timedelta(minutes=rng.randrange(8 * 60, 20 * 60))
+                yield {
+                    "patient_id": rng.choice(patient_ids), "doctor_id": doctor_id,
+                    "service_date": service_date, "serial": last_serial[key], "status": status,
+                    "created_at": created_at,
+                    "served_at": created_at + timedelta(minutes=rng.randrange(5, 120)) if status == "served" else None,
+                }
+
+        return self._insert(Queue.__table__, rows())
+
+
+def seed_database(doctors=100, patients=10000, appointments=100000, queue=5000, seed=42,
+                  chunk_size=10000, days=365, future_days=30, queue_days=1, doctor_skew=1.0,
+                  cancel_rate=0.1, no_show_rate=0.1, working_hours=None, slot_minutes=30, log=print):
+    """Generate a full synthetic dataset, return {table: rows written}"""
+    started = time.perf_counter()
+    seeder = Seeder(seed=seed, chunk_size=chunk_size, log=log)
+
+    def done(name, rows):
+        log(f"{name}: {rows} rows ({time.perf_counter() - started:.1f}s)")
+
+    doctor_ids = seeder.seed_doctors(doctors)
+    done("doctors", doctors)
+    patient_ids = seeder.seed_patients(patients)
+    done("patients", patients)
+    if doctor_ids and patient_ids:
+        done("appointments", seeder.seed_appointments(
+            appointments, doctor_ids, patient_ids, days=days, future_days=future_days,
+            doctor_skew=doctor_skew, cancel_rate=cancel_rate, no_show_rate=no_show_rate,
+            working_hours=working_hours or "09:00-12:00,14:00-18:00,19:00-21:00", slot_minutes=slot_minutes,
+        ))
+        done("queue", seeder.seed_queue(queue, doctor_ids, patient_ids, days=queue_days, doctor_skew=doctor_skew))
+    return seeder.counts
@@ -0,0 +1,260 @@
+"""
+Appointment slot engine.
+
+A doctor's bookable slots come from their working hours (Doctor.working_hours,
+a JSON object like {"mon": ["09:00-12:00", "14:00-18:00"]}), falling back to
+DEFAULT_WORKING_HOURS on their available_days. Booked intervals are kept per
+doctor per day in sorted arrays, so checking a slot is a bisect instead of a
+query over every appointment. Bookings go through `slot_index.lock` and the
+partial unique index on (doctor_id, appointment_time) for scheduled rows, so
+two requests cannot take the same slot.
+"""
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Appointment
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+DAY_FULL_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+# Statuses that keep a slot taken
+BLOCKING_STATUSES = ("scheduled", "completed")
+
+
+def _minutes(text):
+    hours, minutes = text.strip().split(":")
+    value = int(hours) * 60 + int(minutes)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"Invalid time {text}")
+    return value
+
+
+def parse_windows(spec):
+    """'09:00-12:00,14:00-18:00' or a list of such ranges -> [(540, 720), ...]"""
+    if isinstance(spec, str):
+        spec = [part for part in spec.split(",") if part.strip()]
+    windows = []
+    for item in spec:
+        start, end = item.split("-")
+        start, end = _minutes(start), _minutes(end)
+        if start >= end:
+            raise ValueError(f"Invalid working hours range {item}")
+        windows.append((start, end))
+    return sorted(windows)
+
+
+def parse_working_hours(raw):
+    """Validate a working hours definition, return {weekday index: windows}"""
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    if not isinstance(raw, dict):
+        raise ValueError("working_hours must be an object keyed by weekday")
+    hours = {}
+    for day, spec in raw.items():
+        key = day.strip().lower()[:3]
+        if key not in WEEKDAYS:
+            raise ValueError(f"Unknown weekday {day}")
+        hours[WEEKDAYS.index(key)] = parse_windows(spec)
+    return hours
+
+
+def _day_index(word):
+    # 'Mon', 'monday', 'Tues', 'Thurs.' -> weekday index, None if not a weekday
+    word = word.strip(".").lower()
+    for index, name in enumerate(DAY_FULL_NAMES):
+        if len(word) >= 3 and name.startswith(word):
+            return index
+    return None
+
+
+def _parse_days(value):
+    """(weekday indexes in the order written, True if every part of the text was understood)"""
+    text = (value or "").strip()
+    # 'Mon - Fri', 'Monday–Friday', 'Sunday to Thursday' are all one range
+    text = re.sub(r"\s*[-\u2013\u2014]\s*", "-", text)
+    text = re.sub(r"\s+to\s+", "-", text, flags=re.IGNORECASE)
+    days, clean = [], True
+    for part in re.split(r"[,/;&\s]+", text):
+        if not part or part.lower() == "and":
+            continue
+        bounds = [_day_index(b) for b in part.split("-")]
+        if None in bounds or len(bounds) > 2:
+            clean = False
+            days.extend(b for b in bounds if b is not None)
+        elif len(bounds) == 2:
+            start, end = bounds
+            span = (end - start) % 7
+            days.extend((start + i) % 7 for i in range(span + 1))
+        else:
+            days.append(bounds[0])
+    return days, clean
+
+
+def normalize_days(value):
+    """'monday, WED' / 'Sun to Thu' / 'mon tue' -> 'Mon,Wed' / 'Sun,Mon,Tue,Wed,Thu' / 'Mon,Tue'"""
+    if not value:
+        return value
+    days, clean = _parse_days(value)
+    if not days or not clean:
+        return value  # Text we do not fully understand is left alone
+    # Keep the order the doctor wrote them in, drop duplicates
+    return ",".join(DAY_NAMES[d] for d in dict.fromkeys(days))
+
+
+def available_weekdays(value):
+    """Set of weekday indexes from available_days, None if the doctor has not restricted their days"""
+    days, _ = _parse_days(value)
+    # Old free text: go by the days it does name; none at all restricts nothing
+    return set(days) if days else None
+
+
+def clean_available_days(value):
+    """Normalized available_days for storing, None if blank; ValueError unless every part is a weekday or range"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if not isinstance(value, str):
+        raise ValueError("available_days must be text")
+    days, clean = _parse_days(value)
+    if not days or not clean:
+        raise ValueError("available_days must name weekdays, e.g. 'Mon,Wed' or 'Monday-Friday'")
+    return normalize_days(value)
+
+
+def windows_for(doctor, day):
+    if doctor.working_hours:
+        return parse_working_hours(doctor.working_hours).get(day.weekday(), [])
+    weekdays = available_weekdays(doctor.available_days)
+    if weekdays is not None and day.weekday() not in weekdays:
+        return []
+    return parse_windows(current_app.config.get("DEFAULT_WORKING_HOURS", "09:00-17:00"))
+
+
+def slot_minutes(doctor):
+    return doctor.slot_minutes or current_app.config.get("DEFAULT_SLOT_MINUTES", 30)
+
+
+def slot_grid(doctor, day):
+    """Start minute of every bookable slot on a day"""
+    length = slot_minutes(doctor)
+    starts = []
+    for start, end in windows_for(doctor, day):
+        while start + length <= end:
+            starts.append(start)
+            start += length
+    return starts
+
+
+class _DayBookings:
+    __slots__ = ("starts", "ends", "ids", "built_at")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.built_at = time.monotonic()
+
+    def add(self, start, end, appointment_id):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, appointment_id)
+
+    def remove(self, appointment_id):
+        if appointment_id in self.ids:
+            i = self.ids.index(appointment_id)
+            del self.starts[i], self.ends[i], self.ids[i]
+
+    def overlaps(self, start, end, ignore_id=None):
+        # Bookings never overlap each other, so only the nearest earlier
+        # starts can reach into [start, end)
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.ends[i] > start:
+            if self.ids[i] != ignore_id:
+                return True
+            i -= 1
+        return False
+
+
+class SlotIndex:
+    def __init__(self):
+        # Held across check + insert + commit of a booking
+        self.lock = threading.RLock()
+        self._days = {}
+
+    def reset(self):
+        with self.lock:
+            self._days.clear()
+
+    def check(self, doctor, start_dt, ignore_id=None):
+        """Return (msg, status code) if start_dt is not a free slot, else None"""
+        day = start_dt.date()
+        start = start_dt.hour * 60 + start_dt.minute
+        if start_dt <= datetime.now():
+            return "Past time e appointment hoy na", 400
+        if start_dt.second or start_dt.microsecond or start not in slot_grid(doctor, day):
+            return "Ei time doctor er kono slot na", 400
+        end = start + slot_minutes(doctor)
+        with self.lock:
+            if self._get(doctor.id, day).overlaps(start, end, ignore_id):
+                return "Ei slot already booked", 409
+        return None
+
+    def free_slots(self, doctor, day, now=None):
+        """[(start_minute, available)] for every slot of the day"""
+        length = slot_minutes(doctor)
+        now = now or datetime.now()
+        with self.lock:
+            bookings = self._get(doctor.id, day)
+            slots = []
+            for start in slot_grid(doctor, day):
+                past = datetime.combine(day, datetime.min.time()) + timedelta(minutes=start) <= now
+                slots.append((start, not past and not bookings.overlaps(start, start + length)))
+            return slots
+
+    def add(self, appointment):
+        with self.lock:
+            day = self._days.get((appointment.doctor_id, appointment.appointment_time.date()))
+            if day is not None:
+                start = appointment.appointment_time.hour * 60 + appointment.appointment_time.minute
+                day.add(start, start + appointment.duration_minutes, appointment.id)
+
+    def remove(self, doctor_id, appointment_id, start_dt):
+        with self.lock:
+            day = self._days.get((doctor_id, start_dt.date()))
+            if day is not None:
+                day.remove(appointment_id)
+
+    def _get(self, doctor_id, day):
+        key = (doctor_id, day)
+        ttl = current_app.config.get("SLOT_INDEX_TTL_SECONDS", 60)
+        bookings = self._days.get(key)
+        if bookings is None or time.monotonic() - bookings.built_at > ttl:
+            day_start = datetime.combine(day, datetime.min.time())
+            rows = db.session.execute(
+                db.select(Appointment.id, Appointment.appointment_time, Appointment.duration_minutes).where(
+                    Appointment.doctor_id == doctor_id,
+                    Appointment.appointment_time >= day_start,
+                    Appointment.appointment_time < day_start + timedelta(days=1),
+                    Appointment.status.in_(BLOCKING_STATUSES),
+                )
+            ).all()
+            bookings = _DayBookings()
+            default = current_app.config.get("DEFAULT_SLOT_MINUTES", 30)
+            for appointment_id, start_dt, duration in rows:
+                start = start_dt.hour * 60 + start_dt.minute
+                bookings.add(start, start + (duration or default), appointment_id)
+            # Past days are not booked any more
+            for old in [k for k in self._days if k[1] < date.today()]:
+                del self._days[old]
+            self._days[key] = bookings
+        return bookings
+
+
+slot_index = SlotIndex()
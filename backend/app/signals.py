@@ -0,0 +1,54 @@
+"""
+Write events for read-side caches and rollups.
+
+Routes send these after the change is committed; derived state (patient
+summary cache, doctor day view, daily_stats rollup) connects to them instead
+of every route having to know about every consumer. Payloads are plain dicts so that
+receivers never touch ORM state of the sender's session:
+
+    queue_changed        before, after: {id, patient_id, doctor_id, service_date, serial, status,
+                                         created_at, served_at}
+    appointment_changed  before, after: {id, patient_id, doctor_id, appointment_time, duration_minutes, status}
+    patient_changed      patient_id
+
+`before` is None for a new row and `after` is None for a deleted one. Signals
+only reach the current process: in-memory receivers keep a TTL to pick up
+writes made by other workers, the rollup applies each process's own deltas
+to the database.
+"""
+from blinker import Namespace
+from flask import current_app
+
+_signals = Namespace()
+
+queue_changed = _signals.signal("queue-changed")
+appointment_changed = _signals.signal("appointment-changed")
+patient_changed = _signals.signal("patient-changed")
+
+
+def queue_row(q):
+    return {
+        "id": q.id,
+        "patient_id": q.patient_id,
+        "doctor_id": q.doctor_id,
+        "service_date": q.service_date,
+        "serial": q.serial,
+        "status": q.status or "waiting",
+        "created_at": q.created_at,
+        "served_at": q.served_at,
+    }
+
+
+def appointment_row(a):
+    return {
+        "id": a.id,
+        "patient_id": a.patient_id,
+        "doctor_id": a.doctor_id,
+        "appointment_time": a.appointment_time,
+        "duration_minutes": a.duration_minutes,
+        "status": a.status or "scheduled",
+    }
+
+
+def send(signal, **kwargs):
+    signal.send(current_app._get_current_object(), **kwargs)
@@ -0,0 +1,49 @@
+"""
+Shared SQL statement timer.
+
+One pair of cursor events per engine times every statement and passes
+(statement, parameters, seconds) to each registered observer; metrics and
+the query log both read from it instead of installing their own timers.
+Start times are kept on the DBAPI connection keyed by cursor, and a
+statement that raises is dropped in handle_error, so a failed statement can
+never leave a start time behind for a later one to pick up.
+"""
+import time
+
+from sqlalchemy import event
+
+_STARTED = "_sql_timer_started"
+_observers = []
+
+
+def add_observer(observer):
+    """observer(statement, parameters, seconds) is called after every timed statement"""
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED, {})[id(cursor)] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED, {}).pop(id(cursor), None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    for observer in _observers:
+        observer(statement, parameters, seconds)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    cursor = getattr(exception_context.execution_context, "cursor", None)
+    if conn is not None and cursor is not None and not conn.closed:
+        conn.info.get(_STARTED, {}).pop(id(cursor), None)
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
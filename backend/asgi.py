@@ -0,0 +1,5 @@
+# ASGI entrypoint (asgiref lagbe): uvicorn asgi:app --workers 4
+from app import create_app
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(create_app())
@@ -0,0 +1 @@
+# Offline load test & benchmark suite, see benchmarks/run.py
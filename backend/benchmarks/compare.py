@@ -0,0 +1,40 @@
+"""
+Diff two benchmark reports per endpoint.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import json
+import sys
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(old, new):
+    if not old:
+        return "   n/a"
+    return f"{100.0 * (new - old) / old:+6.1f}%"
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        raise SystemExit("usage: python -m benchmarks.compare BEFORE.json AFTER.json")
+    with open(argv[0]) as fh:
+        before = json.load(fh)
+    with open(argv[1]) as fh:
+        after = json.load(fh)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    rows = [("TOTAL", before["total"], after["total"])]
+    for endpoint in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        rows.append((endpoint, before["endpoints"].get(endpoint, {}), after["endpoints"].get(endpoint, {})))
+    print(f"{'endpoint':42}" + "".join(f"{m:>24}" for m in METRICS))
+    for name, old, new in rows:
+        cells = []
+        for metric in METRICS:
+            o, n = old.get(metric), new.get(metric)
+            cells.append(f"{n if n is not None else '-':>12} {change(o, n) if o is not None and n is not None else '':>10}")
+        print(f"{name:42}" + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
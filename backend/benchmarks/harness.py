@@ -0,0 +1,349 @@
+"""
+Benchmark harness: boots create_app() on a seeded database and drives
+scenarios through in-process test clients, one per worker thread.
+
+Nothing leaves the process: Flask-Mail runs with MAIL_SUPPRESS_SEND and the
+2FA code is read back from the database instead of an inbox.
+"""
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from json import dumps
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+BENCH_PASSWORD = "bench-password"
+
+
+class BenchmarkConfig(Config):
+    TESTING = False
+    DEVELOPMENT_MODE = False
+    MAIL_SUPPRESS_SEND = True
+    MAIL_DEFAULT_SENDER = "bench@localhost"
+    JWT_SECRET_KEY = "benchmark-jwt-secret-key-not-for-production"
+    APPOINTMENT_SWEEP_INTERVAL_SECONDS = 0
+    # Threads share one SQLite file, wait for the write lock instead of failing
+    SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
+
+
+def build_app(database_url=None, config_overrides=None):
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="hqs-bench-"), "bench.db")
+    attrs = {"SQLALCHEMY_DATABASE_URI": database_url}
+    attrs.update(config_overrides or {})
+    app = create_app(type("BenchmarkRunConfig", (BenchmarkConfig,), attrs))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(app, doctors=50, patients=2000, appointments=20000, queue=2000, accounts=50, seed=7):
+    """Bulk seed an empty database, then load() it with doctor logins linked to seeded doctors"""
+    from app.services.seed import seed_database
+
+    with app.app_context():
+        seed_database(doctors=doctors, patients=patients, appointments=appointments, queue=queue,
+                      seed=seed, log=lambda msg: None)
+    return load(app, accounts, link_doctors=True)
+
+
+def has_data(app):
+    from app.models import Doctor, Patient
+
+    with app.app_context():
+        return db.session.query(Doctor.query.exists()).scalar() or db.session.query(Patient.query.exists()).scalar()
+
+
+def load(app, accounts=50, link_doctors=False):
+    """Read benchmark ids from the rows already in the database, adding the
+    `accounts` logins per role with a known password unless a previous run did"""
+    from werkzeug.security import generate_password_hash
+    from app.models import Doctor, Patient, User
+
+    with app.app_context():
+        existing = {user.user_id: user for user in User.query.filter(User.user_id.like("bench%"))}
+        password_hash = None
+        doctor_ids = [d.id for d in Doctor.query.with_entities(Doctor.id).limit(accounts)] if link_doctors else []
+        users = {"patient": [], "doctor": [], "admin": []}
+        for role in users:
+            for i in range(accounts if role != "admin" else 1):
+                uid = f"bench{role[0]}{i:04d}"
+                user = existing.get(uid)
+                if user is None:
+                    password_hash = password_hash or generate_password_hash(BENCH_PASSWORD)
+                    user = User(user_id=uid, username=uid, email=f"{uid}@bench.local", role=role,
+                                password_hash=password_hash, two_factor_enabled=True)
+                    db.session.add(user)
+                    db.session.flush()
+                    if role == "patient":
+                        db.session.add(Patient(user_id=user.id, name=uid, age=30, gender="Male", phone=""))
+                    elif role == "doctor" and i < len(doctor_ids):
+                        Doctor.query.get(doctor_ids[i]).user_id = user.id
+                users[role].append({"id": user.id, "user_id": uid})
+        db.session.commit()
+        return {
+            "users": users,
+            "doctor_ids": [d.id for d in Doctor.query.with_entities(Doctor.id)],
+            "patient_ids": [p.id for p in Patient.query.with_entities(Patient.id).limit(5000)],
+            "specializations": [s for (s,) in db.session.query(Doctor.specialization).distinct()],
+        }
+
+
+class Recorder:
+    """Collects (endpoint, latency, status) samples from all workers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.scenarios = {}
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if status >= 500 or status == 0:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def scenario_done(self, name, seconds, ok):
+        with self._lock:
+            entry = self.scenarios.setdefault(name, {"count": 0, "failed": 0, "samples": []})
+            entry["count"] += 1
+            entry["failed"] += 0 if ok else 1
+            entry["samples"].append(seconds)
+
+
+class Client:
+    """Test client wrapper timing every call under a stable endpoint label"""
+
+    def __init__(self, app, recorder, index=0):
+        self.client = app.test_client()
+        self.recorder = recorder
+        self.index = index
+        self.token = None
+        self.tokens = {}
+
+    def open(self, url, method, headers, **kwargs):
+        return self.client.open(url, method=method, headers=headers, **kwargs)
+
+    def call(self, label, method, url, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        started = time.perf_counter()
+        try:
+            response = self.open(url, method, headers, **kwargs)
+            status = response.status_code
+        except Exception:
+            response, status = None, 0
+        self.recorder.record(f"{method} {label}", time.perf_counter() - started, status)
+        return response
+
+
+class RawResponse:
+    def __init__(self, status, headers, body):
+        self.status_code = status
+        self.headers = headers
+        self.data = body
+
+    def get_json(self):
+        return json.loads(self.data) if self.data else None
+
+
+class AsgiClient(Client):
+    """Client that drives the ASGI entry point on its own event loop, so the
+    same scenarios run against both servers"""
+
+    def __init__(self, asgi_app, recorder, index=0):
+        self.asgi_app = asgi_app
+        self.loop = asyncio.new_event_loop()
+        self.recorder = recorder
+        self.index = index
+        self.token = None
+        self.tokens = {}
+
+    def open(self, url, method, headers, **kwargs):
+        from werkzeug.test import EnvironBuilder
+        builder = EnvironBuilder(path=url, method=method, headers=headers, **kwargs)
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+        body = environ["wsgi.input"].read()
+        scope_headers = [(key[5:].replace("_", "-").lower().encode("latin-1"), value.encode("latin-1"))
+                         for key, value in environ.items() if key.startswith("HTTP_")]
+        for key, name in (("CONTENT_TYPE", b"content-type"), ("CONTENT_LENGTH", b"content-length")):
+            if environ.get(key):
+                scope_headers.append((name, environ[key].encode("latin-1")))
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": environ["PATH_INFO"], "raw_path": environ["PATH_INFO"].encode("latin-1"),
+            "query_string": environ["QUERY_STRING"].encode("latin-1"), "root_path": "",
+            "headers": scope_headers, "server": ("localhost", 80), "client": ("127.0.0.1", 40000 + self.index),
+        }
+        return self.loop.run_until_complete(self._exchange(scope, body))
+
+    async def _exchange(self, scope, body):
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status, headers, chunks = 0, {}, []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.asgi_app(scope, receive, send)
+        return RawResponse(status, headers, b"".join(chunks))
+
+
+class HttpClient(Client):
+    """Client that sends real HTTP requests (one keep-alive connection per
+    worker) to a running server, e.g. gunicorn"""
+
+    def __init__(self, base_url, recorder, index=0):
+        from urllib.parse import urlsplit
+        self.address = urlsplit(base_url)
+        self.connection = None
+        self.recorder = recorder
+        self.index = index
+        self.token = None
+        self.tokens = {}
+
+    def open(self, url, method, headers, json=None, query_string=None):
+        import http.client
+        from urllib.parse import urlencode
+        if query_string:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(query_string)}"
+        body = None
+        if json is not None:
+            body = dumps(json).encode()
+            headers = dict(headers, **{"Content-Type": "application/json"})
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.address.hostname, self.address.port, timeout=60)
+            try:
+                self.connection.request(method, url, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return RawResponse(response.status, dict(response.getheaders()), response.read())
+            except (http.client.HTTPException, ConnectionError):
+                # Worker recycled (max_requests) and closed the keep-alive connection
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 3),
+        "p95_ms": round(1000 * percentile(values, 95), 3),
+        "p99_ms": round(1000 * percentile(values, 99), 3),
+        "max_ms": round(1000 * values[-1], 3) if values else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def run(app, data, scenarios, mix, concurrency=8, duration=10.0, iterations=None, seed=7, entry="wsgi",
+        base_url=None):
+    """Run weighted scenarios on `concurrency` threads for `duration` seconds
+    (or `iterations` scenarios per thread) and return the JSON-ready report.
+    entry="asgi" sends every request through app.asgi instead of the WSGI app,
+    entry="http" sends them over the network to a server at base_url."""
+    recorder = Recorder()
+    if entry == "asgi":
+        from app.asgi import create_asgi_app
+        asgi_app = create_asgi_app(app)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        if entry == "http":
+            client = HttpClient(base_url, recorder, index)
+        elif entry == "asgi":
+            client = AsgiClient(asgi_app, recorder, index)
+        else:
+            client = Client(app, recorder, index)
+        done = 0
+        while (iterations is None and time.perf_counter() < deadline) or (iterations is not None and done < iterations):
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = scenarios[name](client, app, data, rng)
+            except Exception:
+                ok = False
+            recorder.scenario_done(name, time.perf_counter() - started, ok)
+            done += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_samples = [s for samples in recorder.samples.values() for s in samples]
+    endpoints = {}
+    for endpoint in sorted(recorder.samples):
+        endpoints[endpoint] = summarize(recorder.samples[endpoint], elapsed)
+        endpoints[endpoint]["errors"] = recorder.errors.get(endpoint, 0)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+            "concurrency": concurrency,
+            "entry": entry,
+            "elapsed_seconds": round(elapsed, 3),
+            "mix": mix,
+        },
+        "total": dict(summarize(all_samples, elapsed), errors=sum(recorder.errors.values())),
+        "endpoints": endpoints,
+        "scenarios": {
+            name: dict(summarize(entry["samples"], elapsed), failed=entry["failed"])
+            for name, entry in sorted(recorder.scenarios.items())
+        },
+    }
+
+
+def write_report(report, path=None):
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as fh:
+            fh.write(text + "\n")
+    return text
@@ -0,0 +1,89 @@
+"""
+Run the HTTP benchmark suite and print/write a JSON report.
+
+    cd backend
+    python -m benchmarks.run --concurrency 8 --duration 20 --output bench.json
+    python -m benchmarks.run --scenario queue_churn=1 --iterations 200
+    python -m benchmarks.run --set METRICS_ENABLED=false --output no-metrics.json
+    python -m benchmarks.run --entry asgi --output asgi.json
+    python -m benchmarks.servers --config workers=1,threads=4 --config workers=3,threads=2
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import sys
+
+from benchmarks.harness import build_app, has_data, load, run, seed, write_report
+from benchmarks.scenarios import DEFAULT_MIX, SCENARIOS
+
+
+def parse_mix(values):
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name}, choose from: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_overrides(values):
+    """KEY=VALUE config overrides; true/false and numbers are converted"""
+    overrides = {}
+    for value in values or []:
+        key, _, raw = value.partition("=")
+        if raw.lower() in ("true", "false"):
+            overrides[key] = raw.lower() == "true"
+        else:
+            try:
+                overrides[key] = int(raw)
+            except ValueError:
+                try:
+                    overrides[key] = float(raw)
+                except ValueError:
+                    overrides[key] = raw
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url",
+                        help="Benchmark this database instead of a fresh seeded one. An empty database is seeded, "
+                             "one with data is used as it is, only the bench* logins are added if missing")
+    parser.add_argument("--scenario", action="append", metavar="NAME[=WEIGHT]",
+                        help="Scenario mix entry, repeatable (default: all scenarios)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--iterations", type=int, help="Scenarios per worker instead of --duration")
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--queue", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--entry", choices=["wsgi", "asgi"], default="wsgi",
+                        help="Serve through the Flask WSGI app or the ASGI entry point")
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE", dest="overrides",
+                        help="Override an app config value, repeatable")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.scenario)
+    overrides = parse_overrides(args.overrides)
+    app = build_app(args.database_url, overrides)
+    if args.database_url and has_data(app):
+        print("Using the existing data...", file=sys.stderr)
+        data = load(app)
+    else:
+        print("Seeding...", file=sys.stderr)
+        data = seed(app, doctors=args.doctors, patients=args.patients, appointments=args.appointments,
+                    queue=args.queue, seed=args.seed)
+    print(f"Running {', '.join(mix)} on {args.concurrency} workers...", file=sys.stderr)
+    report = run(app, data, SCENARIOS, mix, concurrency=args.concurrency, duration=args.duration,
+                 iterations=args.iterations, seed=args.seed, entry=args.entry)
+    report["meta"]["overrides"] = overrides
+    print(write_report(report, args.output))
+
+
+if __name__ == "__main__":
+    main()
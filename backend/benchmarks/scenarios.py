@@ -0,0 +1,123 @@
+"""
+Benchmark scenarios. Each takes (client, app, data, rng), performs a short
+user journey through the API and returns True when it completed as a real
+user would expect (expected 4xx like a lost slot race still count as ok).
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import User
+from benchmarks.harness import BENCH_PASSWORD
+
+
+def _account(client, data, role):
+    # Every worker thread owns its accounts so 2FA codes never race
+    accounts = data["users"][role]
+    return accounts[client.index % len(accounts)]
+
+
+def login_2fa(client, app, data, rng, role="patient"):
+    account = _account(client, data, role)
+    client.token = None
+    response = client.call("/api/auth/login", "POST", "/api/auth/login",
+                           json={"user_id": account["user_id"], "password": BENCH_PASSWORD})
+    if response is None or response.status_code != 200:
+        return False
+    # The email is suppressed, read the code the user would have received
+    with app.app_context():
+        code = db.session.execute(
+            select(User.email_verification_code).where(User.id == account["id"])
+        ).scalar()
+    response = client.call("/api/auth/verify-2fa", "POST", "/api/auth/verify-2fa",
+                           json={"user_id": account["id"], "verification_code": code})
+    if response is None or response.status_code != 200:
+        return False
+    client.tokens[role] = response.get_json()["access_token"]
+    return True
+
+
+def _as(client, app, data, rng, role):
+    if role not in client.tokens and not login_2fa(client, app, data, rng, role):
+        return False
+    client.token = client.tokens[role]
+    return True
+
+
+def doctor_browse(client, app, data, rng):
+    client.token = None
+    response = client.call("/api/doctor/", "GET", "/api/doctor/")
+    if response is None or response.status_code != 200:
+        return False
+    doctor_id = rng.choice(data["doctor_ids"])
+    client.call("/api/doctor/<id>", "GET", f"/api/doctor/{doctor_id}")
+    day = date.today() + timedelta(days=rng.randint(1, 14))
+    response = client.call("/api/appointment/slots", "GET",
+                           f"/api/appointment/slots?doctor_id={doctor_id}&date={day.isoformat()}")
+    return response is not None and response.status_code == 200
+
+
+def appointment_booking(client, app, data, rng):
+    if not _as(client, app, data, rng, "patient"):
+        return False
+    doctor_id = rng.choice(data["doctor_ids"])
+    day = date.today() + timedelta(days=rng.randint(1, 14))
+    response = client.call("/api/appointment/slots", "GET", "/api/appointment/slots",
+                           query_string={"doctor_id": doctor_id, "date": day.isoformat()})
+    if response is None or response.status_code != 200:
+        return False
+    free = [slot["time"] for slot in response.get_json()["slots"] if slot["available"]]
+    if free:
+        response = client.call("/api/appointment/", "POST", "/api/appointment/",
+                               json={"doctor_id": doctor_id, "appointment_time": f"{day.isoformat()}T{rng.choice(free)}:00"})
+        if response is None or response.status_code not in (201, 409):
+            return False
+        if response.status_code == 201 and rng.random() < 0.3:
+            appointment_id = response.get_json()["id"]
+            client.call("/api/appointment/<id>", "PUT", f"/api/appointment/{appointment_id}",
+                        json={"status": "canceled"})
+    response = client.call("/api/appointment/", "GET", "/api/appointment/")
+    return response is not None and response.status_code == 200
+
+
+def queue_churn(client, app, data, rng):
+    """Busy OPD: walk-ins join, poll their position, the doctor serves them"""
+    client.token = None
+    patient_id = rng.choice(data["patient_ids"])
+    if rng.random() < 0.5:
+        payload = {"patient_id": patient_id, "specialization": rng.choice(data["specializations"])}
+    else:
+        payload = {"patient_id": patient_id, "doctor_id": rng.choice(data["doctor_ids"])}
+    response = client.call("/api/queue/", "POST", "/api/queue/", json=payload)
+    if response is None or response.status_code != 201:
+        return response is not None and response.status_code == 404  # nobody on shift today
+    entry = response.get_json()
+    for _ in range(3):
+        client.call("/api/queue/<id>/position", "GET", f"/api/queue/{entry['id']}/position")
+    client.call("/api/queue/doctor/<id>", "GET", f"/api/queue/doctor/{entry['doctor_id']}")
+    if rng.random() < 0.1 and _as(client, app, data, rng, "admin"):
+        client.call("/api/queue/batch", "POST", "/api/queue/batch", json={"operations": [
+            {"op": "enqueue", "patient_id": rng.choice(data["patient_ids"]), "doctor_id": entry["doctor_id"]}
+            for _ in range(20)
+        ]})
+        client.token = None
+    response = client.call("/api/queue/<id>", "PUT", f"/api/queue/{entry['id']}",
+                           json={"status": rng.choice(["served", "served", "canceled"])})
+    return response is not None and response.status_code == 200
+
+
+SCENARIOS = {
+    "login_2fa": login_2fa,
+    "doctor_browse": doctor_browse,
+    "appointment_booking": appointment_booking,
+    "queue_churn": queue_churn,
+}
+
+# Rough shape of a weekday morning
+DEFAULT_MIX = {
+    "login_2fa": 1,
+    "doctor_browse": 3,
+    "appointment_booking": 2,
+    "queue_churn": 4,
+}
@@ -0,0 +1,137 @@
+"""
+Compare gunicorn configurations under the same HTTP load.
+
+Seeds one SQLite database, then for every --config starts
+`gunicorn -c gunicorn.conf.py wsgi:app` with those settings, drives the
+scenario mix over real sockets, stops the server and moves on. Prints one
+summary line per configuration and writes all reports as JSON.
+
+    cd backend
+    python -m benchmarks.servers --config workers=1,threads=1 \\
+        --config workers=1,threads=8 --config workers=4,threads=2 \\
+        --config workers=4,threads=2,preload=false --duration 20 --output servers.json
+
+Config keys: workers, threads, worker_class, preload, max_requests.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import build_app, run, seed
+from benchmarks.run import parse_mix
+from benchmarks.scenarios import SCENARIOS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_KEYS = {
+    "workers": "GUNICORN_WORKERS",
+    "threads": "GUNICORN_THREADS",
+    "worker_class": "GUNICORN_WORKER_CLASS",
+    "preload": "GUNICORN_PRELOAD",
+    "max_requests": "GUNICORN_MAX_REQUESTS",
+}
+
+
+def parse_config(text):
+    config = {}
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key not in ENV_KEYS:
+            raise SystemExit(f"Unknown config key {key}, choose from: {', '.join(ENV_KEYS)}")
+        config[key] = value
+    return config
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("gunicorn did not start in time")
+
+
+def start_server(config, database_url, port, metrics_dir):
+    env = dict(os.environ)
+    env.update({ENV_KEYS[key]: value for key, value in config.items()})
+    env.update({
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "DATABASE_URL": database_url,
+        "JWT_SECRET_KEY": "benchmark-jwt-secret-key-not-for-production",
+        "MAIL_SUPPRESS_SEND": "true",
+        "MAIL_DEFAULT_SENDER": "bench@localhost",
+        "APPOINTMENT_SWEEP_INTERVAL_SECONDS": "0",
+        "METRICS_MULTIPROC_DIR": metrics_dir,
+    })
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                               cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port, process)
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", action="append", required=True, metavar="KEY=VALUE,...",
+                        help="Server configuration to measure, repeatable")
+    parser.add_argument("--scenario", action="append", metavar="NAME[=WEIGHT]")
+    parser.add_argument("--concurrency", type=int, default=16, help="Client connections")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--queue", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    configs = [parse_config(text) for text in args.config]
+    mix = parse_mix(args.scenario)
+    workdir = tempfile.mkdtemp(prefix="hqs-servers-")
+    database_url = "sqlite:///" + os.path.join(workdir, "bench.db")
+    app = build_app(database_url)
+    print("Seeding...", file=sys.stderr)
+    data = seed(app, doctors=args.doctors, patients=args.patients, appointments=args.appointments,
+                queue=args.queue, seed=args.seed)
+
+    reports = []
+    for index, config in enumerate(configs):
+        port = free_port()
+        process = start_server(config, database_url, port, os.path.join(workdir, f"metrics-{index}"))
+        try:
+            print(f"Running {config} ...", file=sys.stderr)
+            report = run(app, data, SCENARIOS, mix, concurrency=args.concurrency, duration=args.duration,
+                         seed=args.seed, entry="http", base_url=f"http://127.0.0.1:{port}")
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+        report["meta"]["server"] = config
+        reports.append(report)
+
+    print(f"{'config':50} {'rps':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'errors':>7}")
+    for report in reports:
+        total = report["total"]
+        label = ",".join(f"{k}={v}" for k, v in report["meta"]["server"].items()) or "defaults"
+        print(f"{label:50} {total['throughput_rps']:9.1f} {total['p50_ms']:9.1f} {total['p95_ms']:9.1f} "
+              f"{total['p99_ms']:9.1f} {total['errors']:7d}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(reports, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Cold start benchmark: runs each target in a fresh interpreter under
+`python -X importtime`, several times, and reports wall time plus the
+modules with the largest import cost.
+
+    cd backend
+    python -m benchmarks.startup --runs 5 --output startup.json
+    python -m benchmarks.startup --baseline startup.json --max-regression 15
+
+With --baseline the run fails (exit 1) when a target's median wall time is
+more than --max-regression percent slower than in the baseline report.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import git_commit
+
+# Code run in the child interpreter for each target
+TARGETS = {
+    "import": "import app",
+    "create_app": "from app import create_app; create_app()",
+    "first_request": (
+        "from app import create_app; app = create_app(); "
+        "app.test_client().get('/api/doctor/', headers={'Authorization': 'Bearer x'})"
+    ),
+    "cli": "from app import create_app; from app.services.seed import seed_database; create_app()",
+}
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(code, env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"Target failed:\n{result.stderr[-2000:]}")
+    return elapsed, parse_importtime(result.stderr)
+
+
+def run_target(code, runs, env, top):
+    walls, imports, last = [], [], []
+    for _ in range(runs):
+        elapsed, modules = measure(code, env)
+        walls.append(elapsed)
+        imports.append(sum(self_us for _, self_us, _ in modules))
+        last = modules
+    packages = {}
+    for name, self_us, _ in last:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    return {
+        "runs": runs,
+        "wall_ms_median": round(1000 * statistics.median(walls), 1),
+        "wall_ms_min": round(1000 * min(walls), 1),
+        "import_ms_median": round(statistics.median(imports) / 1000, 1),
+        "modules_imported": len(last),
+        "top_modules_ms": {name: round(self_us / 1000, 2) for name, self_us, _ in
+                           sorted(last, key=lambda m: m[1], reverse=True)[:top]},
+        "top_packages_ms": {name: round(us / 1000, 2) for name, us in
+                            sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]},
+    }
+
+
+def check_regressions(report, baseline, max_regression):
+    failures = []
+    for name, result in report["targets"].items():
+        before = baseline.get("targets", {}).get(name)
+        if not before:
+            continue
+        change = 100.0 * (result["wall_ms_median"] - before["wall_ms_median"]) / before["wall_ms_median"]
+        print(f"{name:15} {before['wall_ms_median']:9.1f}ms -> {result['wall_ms_median']:9.1f}ms  {change:+6.1f}%",
+              file=sys.stderr)
+        if change > max_regression:
+            failures.append(name)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS),
+                        help="Target to measure, repeatable (default: all)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules/packages to list")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=15.0, help="Allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET_KEY", "startup-benchmark-jwt-secret-not-for-production")
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    targets = args.target or list(TARGETS)
+    report = {
+        "meta": {"commit": git_commit(), "python": platform.python_version(), "runs": args.runs},
+        "targets": {name: run_target(TARGETS[name], args.runs, env, args.top) for name in targets},
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            failures = check_regressions(report, json.load(fh), args.max_regression)
+        if failures:
+            raise SystemExit(f"Startup regression over {args.max_regression}%: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Gunicorn settings for production.
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every value can be overridden from the environment (GUNICORN_WORKERS,
+GUNICORN_THREADS, GUNICORN_BIND, ...). Defaults are sized from the CPU
+count: 2 x cores + 1 processes with 2 threads each, since handlers spend
+most of their time waiting on the database.
+
+The app is preloaded in the master and workers fork from it, sharing the
+imported code copy-on-write. Each worker drops the inherited connection pool
+right after fork and is replaced after max_requests (+ jitter, so they do not
+all restart together) to bound memory growth.
+
+Reloading: `kill -HUP <master>` restarts workers gracefully with the new
+settings. Preloaded code is not re-imported on HUP; to deploy new code
+without dropping connections send USR2 (starts a new master) and then QUIT
+to the old master.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, "") else default
+
+
+def _flag(name, default):
+    return _env(name, default, lambda v: v.lower() in ("true", "on", "1"))
+
+
+cores = multiprocessing.cpu_count()
+
+bind = _env("GUNICORN_BIND", f"0.0.0.0:{_env('PORT', 8000, int)}")
+workers = _env("GUNICORN_WORKERS", 2 * cores + 1, int)
+threads = _env("GUNICORN_THREADS", 2, int)
+worker_class = _env("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+preload_app = _flag("GUNICORN_PRELOAD", True)
+max_requests = _env("GUNICORN_MAX_REQUESTS", 1000, int)
+max_requests_jitter = _env("GUNICORN_MAX_REQUESTS_JITTER", max(1, max_requests // 10), int)
+timeout = _env("GUNICORN_TIMEOUT", 30, int)
+graceful_timeout = _env("GUNICORN_GRACEFUL_TIMEOUT", 30, int)
+keepalive = _env("GUNICORN_KEEPALIVE", 5, int)
+accesslog = _env("GUNICORN_ACCESSLOG", None)
+loglevel = _env("GUNICORN_LOGLEVEL", "info")
+# Worker heartbeat file on tmpfs so a slow disk cannot make workers look dead
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# /metrics sums all workers from here; must be set before the app is loaded
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), f"hqs-metrics-{bind.rsplit(':', 1)[-1]}"),
+)
+SWEEPER_LOCK = os.path.join(os.environ["METRICS_MULTIPROC_DIR"], "sweeper.lock")
+
+
+def _flask_app(server):
+    return server.app.wsgi()
+
+
+def on_starting(server):
+    # Counters start over with the server, drop files of the previous run
+    for path in glob.glob(os.path.join(os.environ["METRICS_MULTIPROC_DIR"], "*.json")):
+        os.remove(path)
+
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared with the children
+    from app.extensions import db
+    with _flask_app(server).app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # One worker at a time runs the appointment sweeper; when it is recycled
+    # its lock is released and the replacement worker takes over
+    import fcntl
+    from app.services.appointment_sweeper import start_sweeper
+    os.makedirs(os.path.dirname(SWEEPER_LOCK), exist_ok=True)
+    handle = open(SWEEPER_LOCK, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return
+    worker.sweeper_lock = handle
+    start_sweeper(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    from app.metrics import flush
+    flush(force=True)
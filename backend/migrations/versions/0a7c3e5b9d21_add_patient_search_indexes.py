@@ -0,0 +1,62 @@
+"""Add patient phone_normalized and name search index
+
+Revision ID: 0a7c3e5b9d21
+Revises: f6b3d8e2a154
+Create Date: 2026-10-19 21:04:37.118204
+
+Existing rows get phone_normalized from `flask backfill run patient-phones`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7c3e5b9d21'
+down_revision = 'f6b3d8e2a154'
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS patient_fts USING fts5("
+    "name, content='patient', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS patient_fts_insert AFTER INSERT ON patient BEGIN "
+    "INSERT INTO patient_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS patient_fts_delete AFTER DELETE ON patient BEGIN "
+    "INSERT INTO patient_fts(patient_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS patient_fts_update AFTER UPDATE OF name ON patient BEGIN "
+    "INSERT INTO patient_fts(patient_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO patient_fts(rowid, name) VALUES (new.id, new.name); END",
+    # Index the rows that are already there
+    "INSERT INTO patient_fts(patient_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS patient_fts_update",
+    "DROP TRIGGER IF EXISTS patient_fts_delete",
+    "DROP TRIGGER IF EXISTS patient_fts_insert",
+    "DROP TABLE IF EXISTS patient_fts",
+]
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_patient_name_trgm ON patient USING gin (name gin_trgm_ops)",
+]
+POSTGRES_DOWNGRADE = ["DROP INDEX IF EXISTS ix_patient_name_trgm"]
+
+
+def upgrade():
+    with op.batch_alter_table('patient', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('phone_normalized', sa.String(length=20), nullable=True))
+        batch_op.create_index(batch_op.f('ix_patient_phone_normalized'), ['phone_normalized'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}.get(dialect, []):
+        op.execute(statement)
+
+    with op.batch_alter_table('patient', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_patient_phone_normalized'))
+        batch_op.drop_column('phone_normalized')
@@ -0,0 +1,57 @@
+"""Add queue service_date partition and queue_history table
+
+Revision ID: 4b1e7c2a9f10
+Revises: 2d58f85f9b92
+Create Date: 2026-10-19 09:12:40.311402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e7c2a9f10'
+down_revision = '2d58f85f9b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('queue_history',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('service_date', sa.Date(), nullable=False),
+    sa.Column('serial', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patient.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('queue_history', schema=None) as batch_op:
+        batch_op.create_index('ix_queue_history_doctor_date', ['doctor_id', 'service_date'], unique=False)
+
+    with op.batch_alter_table('queue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('service_date', sa.Date(), nullable=True))
+
+    # Existing rows belong to the day they were created on
+    op.execute("UPDATE queue SET service_date = DATE(COALESCE(created_at, CURRENT_TIMESTAMP))")
+
+    with op.batch_alter_table('queue', schema=None) as batch_op:
+        batch_op.alter_column('service_date', existing_type=sa.Date(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_queue_service_date'), ['service_date'], unique=False)
+        batch_op.create_unique_constraint('uq_queue_doctor_date_serial', ['doctor_id', 'service_date', 'serial'])
+
+
+def downgrade():
+    with op.batch_alter_table('queue', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_queue_doctor_date_serial', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_queue_service_date'))
+        batch_op.drop_column('service_date')
+
+    with op.batch_alter_table('queue_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_queue_history_doctor_date')
+
+    op.drop_table('queue_history')
@@ -0,0 +1,50 @@
+"""Add doctor working hours and appointment slot uniqueness
+
+Revision ID: 7e3a91c4d5b2
+Revises: 4b1e7c2a9f10
+Create Date: 2026-10-19 11:03:27.584119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3a91c4d5b2'
+down_revision = '4b1e7c2a9f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('working_hours', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('slot_minutes', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duration_minutes', sa.Integer(), server_default='30', nullable=False))
+
+    # Existing double bookings: keep the earliest booking of each slot scheduled,
+    # cancel the rest so the unique index can be created
+    op.execute("""
+        UPDATE appointment SET status = 'canceled'
+        WHERE status = 'scheduled' AND id NOT IN (
+            SELECT MIN(id) FROM appointment WHERE status = 'scheduled'
+            GROUP BY doctor_id, appointment_time
+        )
+    """)
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_index('uq_appointment_doctor_time_scheduled', ['doctor_id', 'appointment_time'], unique=True,
+                              sqlite_where=sa.text("status = 'scheduled'"),
+                              postgresql_where=sa.text("status = 'scheduled'"))
+
+
+def downgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('uq_appointment_doctor_time_scheduled')
+        batch_op.drop_column('duration_minutes')
+
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.drop_column('slot_minutes')
+        batch_op.drop_column('working_hours')
@@ -0,0 +1,99 @@
+"""Add daily_stats rollup table
+
+Revision ID: f6b3d8e2a154
+Revises: e4a1c7b9d302
+Create Date: 2026-10-19 18:05:44.170392
+
+The table is filled from the existing queue, queue_history and appointment
+rows (same totals as `flask analytics rebuild-daily`), so the signal
+receivers start from correct rows. Databases other than SQLite and Postgres
+need that command run once after the upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b3d8e2a154'
+down_revision = 'e4a1c7b9d302'
+branch_labels = None
+depends_on = None
+
+# {epoch} / {day} are filled per dialect, see EXPRESSIONS
+FILL = """
+INSERT INTO daily_stats (doctor_id, day, enqueued, served, canceled, appointments_booked,
+                         appointments_completed, appointments_canceled, wait_seconds, served_with_wait)
+SELECT doctor_id, day, SUM(enqueued), SUM(served), SUM(canceled), SUM(appointments_booked),
+       SUM(appointments_completed), SUM(appointments_canceled), SUM(wait_seconds), SUM(served_with_wait)
+FROM ({queue} UNION ALL {history} UNION ALL
+    SELECT doctor_id, {day} AS day, 0 AS enqueued, 0 AS served, 0 AS canceled,
+           COUNT(*) AS appointments_booked,
+           SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS appointments_completed,
+           SUM(CASE WHEN status = 'canceled' THEN 1 ELSE 0 END) AS appointments_canceled,
+           0 AS wait_seconds, 0 AS served_with_wait
+    FROM appointment GROUP BY doctor_id, {day}
+) AS totals
+GROUP BY doctor_id, day
+"""
+QUEUE_TOTALS = """
+    SELECT doctor_id, service_date AS day, COUNT(*) AS enqueued,
+           SUM(CASE WHEN status = 'served' THEN 1 ELSE 0 END) AS served,
+           SUM(CASE WHEN status = 'canceled' THEN 1 ELSE 0 END) AS canceled,
+           0 AS appointments_booked, 0 AS appointments_completed, 0 AS appointments_canceled,
+           SUM(CASE WHEN {waited} THEN {served_at} - {created_at} ELSE 0 END) AS wait_seconds,
+           SUM(CASE WHEN {waited} THEN 1 ELSE 0 END) AS served_with_wait
+    FROM {table} GROUP BY doctor_id, service_date
+"""
+EXPRESSIONS = {
+    "sqlite": {"epoch": "CAST(strftime('%s', {}) AS INTEGER)", "day": "date(appointment_time)"},
+    "postgresql": {"epoch": "CAST(extract(epoch FROM {}) AS BIGINT)", "day": "CAST(appointment_time AS DATE)"},
+}
+
+
+def fill_daily_stats():
+    expressions = EXPRESSIONS.get(op.get_bind().dialect.name)
+    if expressions is None:
+        return
+    epoch = expressions["epoch"]
+    queue = {
+        "waited": "status = 'served' AND served_at IS NOT NULL AND created_at IS NOT NULL",
+        "served_at": epoch.format("served_at"),
+        "created_at": epoch.format("created_at"),
+    }
+    op.execute(FILL.format(
+        queue=QUEUE_TOTALS.format(table="queue", **queue),
+        history=QUEUE_TOTALS.format(table="queue_history", **queue),
+        day=expressions["day"],
+    ))
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('daily_stats',
+    sa.Column('doctor_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('enqueued', sa.Integer(), nullable=False),
+    sa.Column('served', sa.Integer(), nullable=False),
+    sa.Column('canceled', sa.Integer(), nullable=False),
+    sa.Column('appointments_booked', sa.Integer(), nullable=False),
+    sa.Column('appointments_completed', sa.Integer(), nullable=False),
+    sa.Column('appointments_canceled', sa.Integer(), nullable=False),
+    sa.Column('wait_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('served_with_wait', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor.id'], ),
+    sa.PrimaryKeyConstraint('doctor_id', 'day')
+    )
+    with op.batch_alter_table('daily_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_daily_stats_day'), ['day'], unique=False)
+
+    # ### end Alembic commands ###
+    fill_daily_stats()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('daily_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_daily_stats_day'))
+
+    op.drop_table('daily_stats')
+    # ### end Alembic commands ###
@@ -1,7 +1,12 @@
-# Main entrypoint, app run korbe
+# Main entrypoint, app run korbe (dev server; production e: gunicorn -c gunicorn.conf.py wsgi:app)
+import os
 from app import create_app
+from app.services.appointment_sweeper import start_sweeper
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Debug reloader e shudhu child process sweeper chalabe
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_sweeper(app)
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,8 @@
+# Production WSGI entrypoint: gunicorn -c gunicorn.conf.py wsgi:app
+from app import create_app
+from app.routes import register_blueprints
+
+app = create_app()
+# preload_app e master process ei import kore, route module gulo fork er age load
+# kore rakhle worker ra copy-on-write e share kore
+register_blueprints(app)
@@ -260,7 +260,7 @@ const AppointmentList = () => {
       ) : (
         <div className="appointments-grid">
           {appointments.map((appointment) => {
-            const isExpired = isAppointmentExpired(appointment.appointment_time);
+            const isExpired = appointment.status === 'expired' || isAppointmentExpired(appointment.appointment_time);
             const isDeleting = deletingAppointment === appointment.id;
             
             return (